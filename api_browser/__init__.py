@@ -1,72 +1,231 @@
 import click
-import flask.cli
+import functools
+import json
 import logging
 import os
 import sys
-import webbrowser
-import yaml
-from flask import Flask, render_template
-from threading import Timer
-from tabulate import tabulate
-from typing import Optional
-from .openapi import is_ref, get_with_refs, get_schema_name
-from openapi_spec_validator import validate
+import threading
+from typing import Iterator, Optional
+from .openapi import is_ref, get_with_refs, get_schema_name, iter_operations, SpecIndex, RefCycleError, HTTP_METHODS
+from .operations import PathTrie, split_path
+from .model import LiveModel, SpecModel, load_model
+from .render import render_schema_tree, render_url_tree
+from . import instrument
+from .instrument import phase, profile
+from .loader import cache_dir, clear_cache
+from .sources import is_spec_collection, DEFAULT_REGISTRY_SIZE, DEFAULT_THREADS
+from .tables import TableWriter, STREAMING_FORMATS
+from .batch import expand_filenames, run_batch, timed, BatchReport
+from .validation import iter_file_errors, validate_file
+
+# Flask, tabulate and openapi-spec-validator are slow to import, so they're
+# only imported by the commands that use them. The Flask app is loaded the
+# first time `api_browser.app` is used.
+
+
+def __getattr__(name):
+    if name == "app":
+        from .server import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-####### Server
-
-current_dir = os.path.dirname(__file__)
-template_dir = os.path.abspath(os.path.join(current_dir, "templates"))
-
-app = Flask(__name__, template_folder=template_dir)
+####### CLI
 
-# Flask shows some stuff during boot I don't want to show
-# This disables that. We'll improve this later by maybe
-# moving to a different HTTP app.
-log = logging.getLogger("werkzeug")
-log.disabled = True
-flask.cli.show_server_banner = lambda *args: None
 
+@click.group()
+@click.option("--timings", is_flag=True, help="Print how long each phase took, and peak memory, to stderr.")
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write a cProfile of the run to this file, for pstats or snakeviz.",
+)
+@click.pass_context
+def cli(ctx, timings, profile_path):
+    report_warnings()
+    if profile_path:
+        ctx.with_resource(profile(profile_path))
+    if timings:
+        instrument.start()
+        ctx.call_on_close(report_timings)
 
-@app.route("/openapi")
-def read_openapi():
-    with open(app.config["OPENAPI_FILENAME"]) as f:
-        content = f.read()
-    return content
 
+class EchoHandler(logging.Handler):
+    """Print library log messages to stderr with `click.echo`, like the commands' own errors."""
 
-@app.route("/openapi-documentation")
-def openapi_documentation():
-    return render_template("redoc.html")
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            click.echo(self.format(record), err=True)
+        except Exception:
+            self.handleError(record)
 
 
-####### CLI
+def report_warnings():
+    logger = logging.getLogger(__name__)
+    if not any(isinstance(handler, EchoHandler) for handler in logger.handlers):
+        logger.addHandler(EchoHandler())
 
 
-@click.group()
-def cli():
-    pass
+def report_timings():
+    timings = instrument.stop()
+    if timings is not None:
+        click.echo(timings.report(), err=True)
 
 
 @cli.command()
 @click.argument("filename")
-def openapi(filename):
-    click.echo("Running API Browser server at 127.0.0.1:5000")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to listen on.")
+@click.option("--port", default=5000, show_default=True, type=click.IntRange(0, 65535), help="Port to listen on, or 0 for any free port.")
+@click.option("--production", is_flag=True, help="Serve with waitress, a multi-threaded production WSGI server.")
+@click.option(
+    "--threads",
+    default=DEFAULT_THREADS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Worker threads for --production.",
+)
+@click.option("--no-browser", is_flag=True, help="Don't open the documentation in a web browser.")
+@click.option(
+    "--reload/--no-reload",
+    default=None,
+    help="Watch the file and reload open pages when it changes. On by default, except with --production.",
+)
+@click.option(
+    "--events-port",
+    default=0,
+    show_default=True,
+    type=click.IntRange(0, 65535),
+    help="Port for the live reload streams with --production, or 0 for any free port.",
+)
+@click.option(
+    "--max-memory",
+    default=DEFAULT_REGISTRY_SIZE // (1024 * 1024),
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Megabytes of specs to keep in memory when serving a directory or glob.",
+)
+@click.option("--google-fonts", is_flag=True, help="Load Redoc's web fonts from Google Fonts instead of using system fonts.")
+def openapi(filename, host, port, production, threads, no_browser, reload, events_port, max_memory, google_fonts):
+    """
+    Serve the OpenAPI documentation with Redoc.
+
+    FILENAME can also be a directory or a quoted glob pattern such as
+    'specs/**/*.yaml', to browse many specs from one server. They're loaded
+    the first time they're opened.
+    """
+    import webbrowser
+    from .server import app, get_registry, make_server, start_live_reload
+
+    # With --timings, the server logs each request's timings
+    app.config["LOG_TIMINGS"] = instrument.current() is not None
+    if is_spec_collection(filename):
+        app.config["OPENAPI_SOURCE"] = filename
+        app.config["SPEC_CACHE_SIZE"] = max_memory * 1024 * 1024
+        paths = get_registry().paths()
+        if not paths:
+            raise click.ClickException(f"No OpenAPI files found in {filename}")
+        page = "/"
+    else:
+        app.config["OPENAPI_FILENAME"] = filename
+        paths = [filename]
+        page = "/openapi-documentation"
+    app.config["GOOGLE_FONTS"] = google_fonts
+    try:
+        server = make_server(host, port, production=production, threads=threads)
+    except (RuntimeError, OSError) as e:
+        raise click.ClickException(str(e))
+    if reload is None:
+        reload = not production
+    if reload:
+        # Streams from the app would each hold one of waitress's worker threads
+        start_live_reload(paths, host, events_port=events_port if production else None)
+
+    click.echo(f"Running API Browser server at {server.url}")
     click.echo("Press Ctrl+c to stop the server")
-    app.config["OPENAPI_FILENAME"] = filename
-    # We use a Timer so we can wait on the server to start since it blocks the thread
-    Timer(0.5, _open_browser).start()
-    app.run(host="127.0.0.1", port="5000", debug=False, use_reloader=False)
-
-
-def _open_browser():
-    webbrowser.open_new("http://127.0.0.1:5000/openapi-documentation")
-
-
-def get_response_schema_name(responses: dict) -> str:
+    # The socket is already listening, so the browser can connect right away
+    if not no_browser:
+        url = f"{server.url}{page}"
+        threading.Thread(target=webbrowser.open_new, args=(url,), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+no_cache_option = click.option(
+    "--no-cache", is_flag=True, help="Parse the file from scratch without using the on-disk cache."
+)
+
+
+def report_ref_errors(command):
+    """Show circular $ref chains as a normal error instead of a traceback."""
+    @functools.wraps(command)
+    def wrapper(*args, **kwargs):
+        try:
+            return command(*args, **kwargs)
+        except RefCycleError as e:
+            raise click.ClickException(str(e))
+    return wrapper
+
+
+def filter_options(command):
+    """Options that narrow a command down to some operations, passed on as a `filters` dict."""
+    @functools.wraps(command)
+    def wrapper(*args, path_prefix, methods, tags, operation_ids, **kwargs):
+        filters = {"path_prefix": path_prefix, "methods": methods, "tags": tags, "operation_ids": operation_ids}
+        return command(*args, filters={name: value for name, value in filters.items() if value}, **kwargs)
+
+    wrapper = click.option(
+        "--operation-id",
+        "operation_ids",
+        multiple=True,
+        help="Only include the operation with this operationId. Can be repeated.",
+    )(wrapper)
+    wrapper = click.option(
+        "--tag", "tags", multiple=True, help="Only include operations with this tag. Can be repeated."
+    )(wrapper)
+    wrapper = click.option(
+        "--method",
+        "methods",
+        multiple=True,
+        type=click.Choice(HTTP_METHODS, case_sensitive=False),
+        help="Only include operations with this HTTP method. Can be repeated.",
+    )(wrapper)
+    wrapper = click.option(
+        "--path-prefix",
+        "--prefix",
+        "path_prefix",
+        help="Only include paths under this prefix, matching whole segments, like /customers.",
+    )(wrapper)
+    return wrapper
+
+
+def select_operations(model: SpecModel, filters: Optional[dict], sort: bool = True) -> Optional[Iterator[tuple]]:
+    """
+    Yield (path, method, operation) for the operations that match `filters`.
+
+    Returns None when there are no filters, so callers can keep walking the
+    whole document as they always have.
+    """
+    if not filters:
+        return None
+    operations = model.operations
+    return operations.iter_selected(operations.select(sort=sort, **filters))
+
+
+def filters_key(filters: Optional[dict]) -> tuple:
+    """A hashable form of `filters`, for memoizing results."""
+    return tuple(sorted((filters or {}).items()))
+
+
+def get_response_schema_name(responses: dict, index: Optional[SpecIndex] = None) -> str:
     """Get schema name for success response (2xx)."""
+    lookup = index.get if index is not None else get_with_refs
     for status_code, response in responses.items():
         if 200 <= int(status_code) <= 299:
-            content = get_with_refs(response, ["content"], default={})
+            content = lookup(response, ["content"], default={})
             if not content:
                 return "(none)"
             
@@ -76,18 +235,19 @@ def get_response_schema_name(responses: dict) -> str:
             
             # Check if it's a reference before resolving
             if is_ref(schema):
-                return get_schema_name(schema["$ref"])
+                return _ref_schema_name(schema["$ref"], index)
             return "(inline)"
     return "(none)"
 
 
-def get_request_schema_name(operation: dict) -> str:
+def get_request_schema_name(operation: dict, index: Optional[SpecIndex] = None) -> str:
     """Get schema name for request body."""
-    request_body = get_with_refs(operation, ["requestBody"], default={})
+    lookup = index.get if index is not None else get_with_refs
+    request_body = lookup(operation, ["requestBody"], default={})
     if not request_body:
         return "(none)"
     
-    content = get_with_refs(request_body, ["content"], default={})
+    content = lookup(request_body, ["content"], default={})
     if not content:
         return "(none)"
     
@@ -97,10 +257,16 @@ def get_request_schema_name(operation: dict) -> str:
     
     # Check if it's a reference before resolving
     if is_ref(schema):
-        return get_schema_name(schema["$ref"])
+        return _ref_schema_name(schema["$ref"], index)
     return "(inline)"
 
 
+def _ref_schema_name(ref: str, index: Optional[SpecIndex]) -> str:
+    # The index names schemas of other files the way the schema command does
+    name = index.schema_name(ref) if index is not None else None
+    return name or get_schema_name(ref)
+
+
 def get_success_status_code(responses: dict) -> str:
     """Get the first success status code (2xx) from responses."""
     for status_code, response in responses.items():
@@ -109,341 +275,555 @@ def get_success_status_code(responses: dict) -> str:
     return "-"
 
 
-@click.command()
-@click.argument("filename")
-def summary(filename):
-    """Display a summary table of all API endpoints."""
-    # Read and parse the OpenAPI file
-    with open(filename) as f:
-        api_spec = yaml.safe_load(f)
+SUMMARY_HEADERS = ["Path", "Method", "Operation ID", "Status", "Request Schema", "Response Schema"]
+# Column names for the machine-readable formats
+SUMMARY_FIELDS = ["path", "method", "operation_id", "status", "request_schema", "response_schema"]
+
+
+def iter_summary_rows(
+    model: SpecModel,
+    sort: bool = True,
+    filters: Optional[dict] = None,
+) -> Iterator[list]:
+    """
+    Yield the row shown by `summary` for each operation, one at a time.
+
+    With `sort`, only the path keys are sorted up front; rows still come out
+    one at a time, in path order and then in the order of the operations.
+    With `filters`, see `filter_options`, only the matching operations are
+    looked at.
+    """
+    index = model.index
+    operations = select_operations(model, filters, sort)
+    if operations is None:
+        operations = iter_operations(model.spec, index, sort=sort)
+    for path, method, operation in operations:
+        operation_id = index.get(operation, ["operationId"], default="")
+        request_schema = get_request_schema_name(operation, index)
+        responses = index.get(operation, ["responses"], default={})
+        response_schema = get_response_schema_name(responses, index)
+        status_code = get_success_status_code(responses)
+        
+        yield [
+            path,
+            method.upper(),
+            operation_id,
+            status_code,
+            request_schema,
+            response_schema
+        ]
+
+
+def render_summary(model: SpecModel, sort: bool = True, filters: Optional[dict] = None) -> str:
+    """Render the title, description and table of endpoints shown by `summary`, once per model."""
+    key = ("summary", sort, filters_key(filters))
+    return model.memo(key, lambda: _render_summary(model, sort, filters))
+
+
+def _render_summary(model: SpecModel, sort: bool, filters: Optional[dict]) -> str:
+    index = model.index
     
     # Print title and description if available
-    info = get_with_refs(api_spec, ["info"], default={})
-    title = get_with_refs(info, ["title"], default="Untitled API")
-    description = get_with_refs(info, ["description"], default="No description provided")
+    info = index.get(model.spec, ["info"], default={})
+    title = index.get(info, ["title"], default="Untitled API")
+    description = index.get(info, ["description"], default="No description provided")
     
-    click.echo(f"Title: {title}")
-    click.echo(f"Description: {description}")
-    click.echo()  # Add blank line before table
+    with phase("resolve"):
+        rows = list(iter_summary_rows(model, sort, filters))
     
-    rows = []
+    from tabulate import tabulate
+    with phase("format"):
+        table = tabulate(rows, headers=SUMMARY_HEADERS, tablefmt="grid")
+    # Blank line before table
+    return "\n".join([f"Title: {title}", f"Description: {description}", "", table])
+
+
+def batch_options(command):
+    """Options for commands that take many files."""
+    command = click.option(
+        "--report",
+        type=click.Path(dir_okay=False, writable=True),
+        help="Write a JSON Lines report with a line per file and a summary line.",
+    )(command)
+    command = click.option(
+        "--jobs",
+        "-j",
+        default=1,
+        show_default=True,
+        type=click.IntRange(min=0),
+        help="Number of files to process in parallel, or 0 for one per CPU.",
+    )(command)
+    return command
+
+
+def is_single_file(filenames: tuple, report: Optional[str]) -> bool:
+    """Check if a command was given one file and should keep its single-file output."""
+    return len(filenames) == 1 and report is None and not is_spec_collection(filenames[0])
+
+
+def run_batch_command(worker, filenames: tuple, jobs: int, report_path: Optional[str], echo_result) -> BatchReport:
+    """Run `worker` on every file, echoing each result in order and writing the report."""
+    try:
+        files = expand_filenames(filenames)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    jobs = jobs or os.cpu_count() or 1
+    report = BatchReport(report_path, jobs)
+    try:
+        for result in run_batch(functools.partial(timed, worker), files, jobs):
+            report.add(result)
+            echo_result(result)
+    finally:
+        report.close()
+    return report
+
+
+def _summarize_file(
+    filename: str,
+    use_cache: bool = True,
+    output_format: str = "grid",
+    sort: bool = True,
+    filters: Optional[dict] = None,
+) -> dict:
+    model = load_model(filename, use_cache=use_cache)
+    if output_format == "grid":
+        return {"status": "ok", "output": render_summary(model, sort, filters)}
+    return {"status": "ok", "rows": list(iter_summary_rows(model, sort=sort, filters=filters))}
+
+
+@click.command()
+@click.argument("filenames", nargs=-1, required=True)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["grid", *STREAMING_FORMATS]),
+    default="grid",
+    show_default=True,
+    help="grid is a table for reading. csv, tsv, jsonl and json are written row by row, for other tools.",
+)
+@click.option(
+    "--sort/--no-sort",
+    default=True,
+    show_default=True,
+    help="Order operations by path. Without sorting, rows come out in the order of the file.",
+)
+@filter_options
+@batch_options
+@no_cache_option
+@report_ref_errors
+def summary(filenames, output_format, sort, filters, jobs, report, no_cache):
+    """
+    Display a summary table of all API endpoints.
+
+    FILENAMES can be files, directories or quoted glob patterns. With more
+    than one file, each grid is preceded by a ==> FILE <== header, and the
+    other formats get a file column.
+    """
+    streaming = output_format != "grid"
+    if is_single_file(filenames, report):
+        model = load_model(filenames[0], use_cache=not no_cache)
+        if streaming:
+            writer = TableWriter(sys.stdout, SUMMARY_FIELDS, output_format)
+            with phase("output"):
+                try:
+                    for row in iter_summary_rows(model, sort=sort, filters=filters):
+                        writer.write(row)
+                finally:
+                    writer.close()
+            return
+        output = render_summary(model, sort, filters)
+        with phase("output"):
+            click.echo(output)
+        return
     
-    paths = get_with_refs(api_spec, ["paths"], default={})
-    for path, path_item in paths.items():
-        for method, operation in path_item.items():
-            if method == "parameters":  # Skip common parameters
-                continue
-                
-            operation_id = get_with_refs(operation, ["operationId"], default="")
-            request_schema = get_request_schema_name(operation)
-            responses = get_with_refs(operation, ["responses"], default={})
-            response_schema = get_response_schema_name(responses)
-            status_code = get_success_status_code(responses)
-            
-            rows.append([
-                path,
-                method.upper(),
-                operation_id,
-                status_code,
-                request_schema,
-                response_schema
-            ])
+    first = True
+    writer = None
+    if streaming:
+        writer = TableWriter(sys.stdout, ["file", *SUMMARY_FIELDS], output_format)
     
-    # Sort rows by path (first column)
-    rows.sort(key=lambda x: x[0])
+    def echo_result(result):
+        nonlocal first
+        if writer is not None:
+            if result["status"] != "ok":
+                click.echo(f"Error: {result['file']}: {result['error']}", err=True)
+            for row in result.get("rows", ()):
+                writer.write([result["file"], *row])
+            return
+        if not first:
+            click.echo()
+        first = False
+        click.echo(f"==> {result['file']} <==")
+        if result["status"] == "ok":
+            click.echo(result["output"])
+        else:
+            click.echo(f"Error: {result['error']}", err=True)
     
-    headers = ["Path", "Method", "Operation ID", "Status", "Request Schema", "Response Schema"]
-    click.echo(tabulate(rows, headers=headers, tablefmt="grid"))
+    worker = functools.partial(
+        _summarize_file, use_cache=not no_cache, output_format=output_format, sort=sort, filters=filters
+    )
+    try:
+        batch = run_batch_command(worker, filenames, jobs, report, echo_result)
+    finally:
+        if writer is not None:
+            writer.close()
+    click.echo(
+        f"\nSummarized {batch.files - batch.failed} of {batch.files} files "
+        f"in {batch.seconds:.2f}s ({batch.specs_per_second:.1f} specs/s)",
+        err=True,
+    )
+    if batch.failed:
+        sys.exit(1)
 
 
 @click.command()
 @click.argument("filename")
-@click.argument("schema_name")
-def schema(filename, schema_name):
+@click.argument("schema_name", required=False)
+@click.option("--all", "show_all", is_flag=True, help="Display every schema in the file.")
+@click.option("--max-depth", type=click.IntRange(min=1), help="Only display this many levels of the tree.")
+@click.option(
+    "--collapse-repeated",
+    is_flag=True,
+    help="Expand each referenced schema once and mark later appearances as shown above.",
+)
+@no_cache_option
+@report_ref_errors
+def schema(filename, schema_name, show_all, max_depth, collapse_repeated, no_cache):
     """Display a schema from the OpenAPI file in a tree format."""
-    # Read and parse the OpenAPI file
-    with open(filename) as f:
-        api_spec = yaml.safe_load(f)
+    model = load_model(filename, use_cache=not no_cache)
+    index = model.index
+    graph = model.graph
     
-    def get_schema_by_ref(ref: str):
-        """Get a schema by its reference."""
-        if not ref.startswith("#/"):
-            return None
-        parts = ref.lstrip("#/").split("/")
-        current = api_spec
-        for part in parts:
-            if part not in current:
-                return None
-            current = current[part]
-        return current
+    if show_all:
+        schema_names = list(graph.schemas)
+    elif schema_name is None:
+        raise click.UsageError("Missing argument 'SCHEMA_NAME' (or pass --all).")
+    else:
+        schema_names = [schema_name]
     
-    def find_schema_usage(schema_name):
-        """Find where the schema is used in requests and responses."""
-        request_ops = []
-        response_ops = []
-        target_ref = f"#/components/schemas/{schema_name}"
-        
-        def check_schema_ref(schema):
-            """Check if a schema or its nested items reference the target schema."""
-            if not isinstance(schema, dict):
-                return False
-            
-            # Direct reference match
-            if is_ref(schema) and schema["$ref"] == target_ref:
-                return True
-            
-            # Check array items
-            if schema.get("type") == "array" and isinstance(schema.get("items"), dict):
-                if is_ref(schema["items"]) and schema["items"]["$ref"] == target_ref:
-                    return True
-            
-            return False
-        
-        paths = api_spec.get("paths", {})
-        for path, path_item in paths.items():
-            for method, operation in path_item.items():
-                if method == "parameters":
-                    continue
-                
-                operation_id = operation.get("operationId", "")
-                if not operation_id:
-                    continue
-                
-                # Check request body
-                request_body = operation.get("requestBody", {})
-                if request_body:
-                    content = request_body.get("content", {})
-                    for content_type in content.values():
-                        schema = content_type.get("schema", {})
-                        if check_schema_ref(schema):
-                            request_ops.append(operation_id)
-                            break
-                
-                # Check responses
-                responses = operation.get("responses", {})
-                for response in responses.values():
-                    content = response.get("content", {})
-                    for content_type in content.values():
-                        schema = content_type.get("schema", {})
-                        if check_schema_ref(schema):
-                            response_ops.append(operation_id)
-                            break
-        
-        return sorted(request_ops), sorted(response_ops)
-    
-    def print_schema_tree(schema: dict, indent: str = "", schema_ref: str = None, ref_path: list = None):
-        """Print a schema as a tree."""
-        if not isinstance(schema, dict):
+    for i, name in enumerate(schema_names):
+        # Get the initial schema
+        schema_data = graph.schemas.get(name)
+        if schema_data is None:
+            click.echo(f"Schema '{name}' not found", err=True)
             return
-            
-        if ref_path is None:
-            ref_path = []
-            
-        # Handle circular references
-        if schema_ref and schema_ref in ref_path:
-            click.echo(f"{indent}[Circular reference to {schema_ref}]")
-            return
-            
-        # Add current ref to path
-        current_path = ref_path + ([schema_ref] if schema_ref else [])
         
-        # Handle allOf, anyOf, oneOf
-        for composite_type in ["allOf", "anyOf", "oneOf"]:
-            if composite_type in schema:
-                click.echo(f"{indent}({composite_type})")
-                next_indent = indent + "    "
-                for i, subschema in enumerate(schema[composite_type]):
-                    if is_ref(subschema):
-                        ref = subschema["$ref"]
-                        ref_name = ref.split("/")[-1]
-                        click.echo(f"{next_indent}└── ({ref_name})")
-                        if ref not in current_path:
-                            ref_schema = get_schema_by_ref(ref)
-                            if ref_schema:
-                                print_schema_tree(ref_schema, next_indent + "    ", ref, current_path)
-                    else:
-                        schema_type = subschema.get("type", "object")
-                        click.echo(f"{next_indent}└── ({schema_type})")
-                        print_schema_tree(subschema, next_indent + "    ", None, current_path)
-                return
-            
-        properties = schema.get("properties", {})
-        required = schema.get("required", [])
+        # Find where the schema is used
+        request_ops = graph.request_operations(name)
+        response_ops = graph.response_operations(name)
+        referencing_schemas = graph.referencing_schemas(name)
         
-        for i, (prop_name, prop_schema) in enumerate(properties.items()):
-            is_last = i == len(properties) - 1
-            prefix = "└── " if is_last else "├── "
-            next_indent = indent + ("    " if is_last else "│   ")
-            indicator = "*" if prop_name in required else ""
-            
-            if is_ref(prop_schema):
-                ref = prop_schema["$ref"]
-                ref_name = ref.split("/")[-1]
-                click.echo(f"{indent}{prefix}{prop_name}{indicator} ({ref_name})")
-                
-                # Only expand if not creating a cycle
-                if ref not in current_path:
-                    ref_schema = get_schema_by_ref(ref)
-                    if ref_schema:
-                        print_schema_tree(ref_schema, next_indent, ref, current_path)
-            else:
-                prop_type = prop_schema.get("type", "object")
-                
-                if prop_type == "array":
-                    items = prop_schema.get("items", {})
-                    if is_ref(items):
-                        ref_name = items["$ref"].split("/")[-1]
-                        click.echo(f"{indent}{prefix}{prop_name}{indicator} (array[{ref_name}])")
-                        
-                        if items["$ref"] not in current_path:
-                            ref_schema = get_schema_by_ref(items["$ref"])
-                            if ref_schema:
-                                print_schema_tree(ref_schema, next_indent, items["$ref"], current_path)
-                    else:
-                        item_type = items.get("type", "object")
-                        if item_type in ["string", "number", "integer", "boolean"]:
-                            click.echo(f"{indent}{prefix}{prop_name}{indicator} (array[{item_type}])")
-                        else:
-                            click.echo(f"{indent}{prefix}{prop_name}{indicator} (array[object])")
-                            print_schema_tree(items, next_indent, None, current_path)
-                elif prop_type in ["string", "number", "integer", "boolean"]:
-                    click.echo(f"{indent}{prefix}{prop_name}{indicator} ({prop_type})")
-                else:
-                    click.echo(f"{indent}{prefix}{prop_name}{indicator} (object)")
-                    print_schema_tree(prop_schema, next_indent, None, current_path)
-    
-    def find_schema_references(schema_name):
-        """Find which schemas reference the given schema."""
-        referencing_schemas = set()
-        target_ref = f"#/components/schemas/{schema_name}"
-        
-        def check_schema_for_refs(schema, current_schema_name):
-            """Recursively check a schema and its nested properties for references."""
-            if not isinstance(schema, dict):
-                return
-                
-            # Check for direct reference
-            if is_ref(schema) and schema["$ref"] == target_ref:
-                referencing_schemas.add(current_schema_name)
-                return
-                
-            # Check array items
-            if schema.get("type") == "array" and isinstance(schema.get("items"), dict):
-                check_schema_for_refs(schema["items"], current_schema_name)
-                
-            # Check properties
-            for prop_schema in schema.get("properties", {}).values():
-                check_schema_for_refs(prop_schema, current_schema_name)
-                
-            # Check allOf, anyOf, oneOf
-            for composite_type in ["allOf", "anyOf", "oneOf"]:
-                for subschema in schema.get(composite_type, []):
-                    check_schema_for_refs(subschema, current_schema_name)
-        
-        # Scan all schemas
-        schemas = api_spec.get("components", {}).get("schemas", {})
-        for schema_name_to_check, schema_to_check in schemas.items():
-            if schema_name_to_check != schema_name:  # Don't check the schema against itself
-                check_schema_for_refs(schema_to_check, schema_name_to_check)
-        
-        return sorted(referencing_schemas)
+        # Build the whole block and write it at once
+        lines = [""] if i > 0 else []
+        lines.append(f"Schema: {name}")
+        if referencing_schemas:
+            lines.append(f"Referenced by: {', '.join(referencing_schemas)}")
+        if request_ops:
+            lines.append(f"Requests: {', '.join(request_ops)}")
+        if response_ops:
+            lines.append(f"Responses: {', '.join(response_ops)}")
+        lines.append("")
+        with phase("render"):
+            lines.extend(render_schema_tree(schema_data, index, max_depth, collapse_repeated))
+        with phase("output"):
+            click.echo("\n".join(lines))
+
+
+@click.command()
+@click.argument("filename")
+@click.argument("schema_name", required=False)
+@click.option("--all", "show_all", is_flag=True, help="Show the impact of every schema in the file.")
+@no_cache_option
+@report_ref_errors
+def impact(filename, schema_name, show_all, no_cache):
+    """Display every schema and operation that depends on a schema, directly or not."""
+    graph = load_model(filename, use_cache=not no_cache).graph
     
-    # Get the initial schema
-    schema_data = api_spec.get("components", {}).get("schemas", {}).get(schema_name)
-    if schema_data is None:
+    if show_all:
+        schema_names = list(graph.schemas)
+    elif schema_name is None:
+        raise click.UsageError("Missing argument 'SCHEMA_NAME' (or pass --all).")
+    elif schema_name not in graph.schemas:
         click.echo(f"Schema '{schema_name}' not found", err=True)
         return
+    else:
+        schema_names = [schema_name]
     
-    # Find where the schema is used
-    request_ops, response_ops = find_schema_usage(schema_name)
-    referencing_schemas = find_schema_references(schema_name)
+    lines = []
+    for name in schema_names:
+        with phase("impact"):
+            schemas, operations = graph.impact(name)
+        if lines:
+            lines.append("")
+        lines.append(f"Schema: {name}")
+        lines.append(f"Schemas: {', '.join(schemas) or '(none)'}")
+        lines.append(f"Operations: {', '.join(operations) or '(none)'}")
+    with phase("output"):
+        click.echo("\n".join(lines))
+
+
+def build_url_tree(model: SpecModel, filters: Optional[dict] = None) -> PathTrie:
+    """Build the tree of path segments shown by `urls`, once per model and filters."""
+    return model.memo(("urls", filters_key(filters)), lambda: _build_url_tree(model, filters))
+
+
+def _build_url_tree(model: SpecModel, filters: Optional[dict]) -> PathTrie:
+    index = model.index
+    selected = select_operations(model, filters, sort=False)
+    if selected is None:
+        # Every path, even one without operations
+        paths = {path: [] for path in index.get(model.spec, ["paths"], default={})}
+        selected = iter_operations(model.spec, index)
+    else:
+        # Only the paths with a matching operation, with just those operations
+        paths = {}
+    for path, method, operation in selected:
+        paths.setdefault(path, []).append(operation)
     
-    # Print the schema tree
-    click.echo(f"Schema: {schema_name}")
-    if referencing_schemas:
-        click.echo(f"Referenced by: {', '.join(referencing_schemas)}")
-    if request_ops:
-        click.echo(f"Requests: {', '.join(request_ops)}")
-    if response_ops:
-        click.echo(f"Responses: {', '.join(response_ops)}")
-    click.echo()
-    print_schema_tree(schema_data)
+    # Keep the operations of each path at its last segment
+    tree = PathTrie()
+    with phase("build"):
+        for path, operations in paths.items():
+            node = tree.insert(path)
+            for operation in operations:
+                operation_id = index.get(operation, ["operationId"], default="")
+                if operation_id:
+                    node.add_operation(operation_id)
+    return tree
 
 
 @click.command()
 @click.argument("filename")
-def urls(filename):
-    """Display a tree of URL segments from the OpenAPI file."""
-    # Read and parse the OpenAPI file
-    with open(filename) as f:
-        api_spec = yaml.safe_load(f)
-    
-    # Build a tree structure from the paths
-    root = {}
-    paths = get_with_refs(api_spec, ["paths"], default={})
+@click.option("--depth", type=click.IntRange(min=1), help="Only display this many levels of segments.")
+@filter_options
+@no_cache_option
+@report_ref_errors
+def urls(filename, depth, filters, no_cache):
+    """
+    Display a tree of URL segments from the OpenAPI file.
+
+    With --path-prefix (or --prefix), the tree starts at that prefix.
+    """
+    model = load_model(filename, use_cache=not no_cache)
+    tree = build_url_tree(model, filters)
     
-    for path, path_item in paths.items():
-        # Split path into segments and remove empty ones
-        segments = [s for s in path.split("/") if s]
-        
-        # Start at the root
-        current = root
-        
-        # Build the tree, keeping track of operations at each level
-        for i, segment in enumerate(segments):
-            if segment not in current:
-                current[segment] = {"children": {}, "operations": []}
-            
-            # If this is the last segment, store the operations
-            if i == len(segments) - 1:
-                for method, operation in path_item.items():
-                    if method != "parameters":  # Skip common parameters
-                        operation_id = get_with_refs(operation, ["operationId"], default="")
-                        if operation_id:
-                            current[segment]["operations"].append(operation_id)
-            
-            current = current[segment]["children"]
-    
-    def print_tree(node, indent=""):
-        """Print the URL segments as a tree."""
-        items = sorted(node.items())  # Sort segments alphabetically
-        for i, (segment, data) in enumerate(items):
-            is_last = i == len(items) - 1
-            current_prefix = "└── " if is_last else "├── "
-            next_indent = indent + ("    " if is_last else "│   ")
-            
-            # Format operations if they exist
-            operations_str = ""
-            if data["operations"]:
-                sorted_ops = sorted(data["operations"])  # Sort operations alphabetically
-                operations_str = f" ({', '.join(sorted_ops)})"
-            
-            click.echo(f"{indent}{current_prefix}{segment}{operations_str}")
-            print_tree(data["children"], next_indent)
-    
-    # Print the tree
-    print_tree(root)
+    with phase("output"):
+        prefix = filters.get("path_prefix")
+        if prefix is None:
+            root = tree.root
+        else:
+            root = tree.find(prefix)
+            if root is None:
+                return
+            operations = f" ({', '.join(sorted(root.operations))})" if root.operations else ""
+            click.echo("/" + "/".join(split_path(prefix)) + operations)
+        for line in render_url_tree(root, depth):
+            click.echo(line)
+
+
+def _validate_file(
+    filename: str,
+    use_cache: bool = True,
+    incremental: bool = False,
+    all_errors: bool = False,
+    max_errors: Optional[int] = None,
+) -> dict:
+    if all_errors:
+        errors = list(iter_file_errors(filename, use_cache=use_cache, max_errors=max_errors))
+        if errors:
+            return {"status": "invalid", "error": errors[0]["message"], "errors": errors}
+        return {"status": "ok"}
+    try:
+        validate_file(filename, use_cache=use_cache, incremental=incremental)
+    except OSError:
+        raise
+    except Exception as e:
+        # Validation errors can include the whole offending schema, so keep
+        # the short message when there is one
+        message = getattr(e, "message", None) or (str(e).splitlines() or [type(e).__name__])[0]
+        return {"status": "invalid", "error": message}
+    return {"status": "ok"}
+
+
+def format_error(filename: str, record: dict, output_format: str) -> str:
+    """Format an error record from `iter_file_errors` as one line."""
+    if output_format == "jsonl":
+        return json.dumps({"file": filename, **record}, ensure_ascii=False)
+    return f"{filename}#{record['pointer']}: {record['message']} [{record['rule']}]"
+
+
+@click.command()
+@click.argument("filenames", nargs=-1, required=True)
+@batch_options
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Remember which schemas were valid, and only re-check changed schemas and what depends on them.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["pretty", "text", "jsonl"]),
+    default="pretty",
+    show_default=True,
+    help="pretty shows the first error in full. text and jsonl show every error as one line each, as it's found.",
+)
+@click.option(
+    "--max-errors",
+    type=click.IntRange(min=1),
+    help="With --format text or jsonl, stop after this many errors per file.",
+)
+@no_cache_option
+def validate_cmd(filenames, jobs, report, incremental, output_format, max_errors, no_cache):
+    """
+    Validate OpenAPI files.
+
+    FILENAMES can be files, directories or quoted glob patterns. With more
+    than one file, each gets a line with its status, and the exit code is
+    nonzero if any of them is invalid.
+
+    Files that were valid before are not validated again, unless --no-cache
+    is passed.
+    """
+    streaming = output_format != "pretty"
+    if is_single_file(filenames, report):
+        filename = filenames[0]
+        if not streaming:
+            try:
+                validate_file(filename, use_cache=not no_cache, incremental=incremental)
+                click.echo("✓ OpenAPI specification is valid")
+            except Exception as e:
+                click.echo(e, err=True)
+                sys.exit(1)
+            return
+
+        failed = False
+        try:
+            for record in iter_file_errors(filename, use_cache=not no_cache, max_errors=max_errors):
+                failed = True
+                click.echo(format_error(filename, record, output_format))
+        except Exception as e:
+            failed = True
+            click.echo(format_error(filename, {"pointer": "", "rule": "load", "message": str(e)}, output_format))
+        if failed:
+            sys.exit(1)
+        if output_format == "text":
+            click.echo("✓ OpenAPI specification is valid")
+        return
+
+    def echo_result(result):
+        if streaming:
+            errors = result.get("errors")
+            if errors is None and result["status"] != "ok":
+                errors = [{"pointer": "", "rule": "load", "message": result["error"]}]
+            for record in errors or ():
+                click.echo(format_error(result["file"], record, output_format))
+            if not errors and output_format == "text":
+                click.echo(f"✓ {result['file']}")
+        elif result["status"] == "ok":
+            click.echo(f"✓ {result['file']}")
+        else:
+            click.echo(f"✗ {result['file']}: {result['error']}")
+
+    worker = functools.partial(
+        _validate_file,
+        use_cache=not no_cache,
+        incremental=incremental,
+        all_errors=streaming,
+        max_errors=max_errors,
+    )
+    batch = run_batch_command(worker, filenames, jobs, report, echo_result)
+    if output_format != "jsonl":
+        click.echo(
+            f"\n{batch.files - batch.failed} valid, {batch.failed} failed "
+            f"({batch.files} files in {batch.seconds:.2f}s, {batch.specs_per_second:.1f} specs/s)"
+        )
+    if batch.failed:
+        sys.exit(1)
 
 
 @click.command()
 @click.argument("filename")
-def validate_cmd(filename):
-    """Validate an OpenAPI file."""
-    with open(filename) as f:
-            spec = yaml.safe_load(f)
-            
-    try:
-        validate(spec)
-        click.echo("✓ OpenAPI specification is valid")
-    except Exception as e:
-        click.echo(e, err=True)
+@click.argument("terms", nargs=-1, required=True)
+@click.option("--limit", default=20, show_default=True, type=click.IntRange(min=1), help="Show at most this many results.")
+@click.option("--kind", type=click.Choice(["operation", "schema"]), help="Only show operations or only schemas.")
+@no_cache_option
+@report_ref_errors
+def search(filename, terms, limit, kind, no_cache):
+    """
+    Find operations and schemas by keyword.
+
+    Searches paths, operationIds, summaries, descriptions, tags, schema
+    names and property names. Results are ranked by where the terms were
+    found and how rare they are, and each term must match, as a whole word
+    or the start of one. The search index is cached, so later searches of
+    the same file don't parse it again.
+    """
+    from .search_index import load_search_index
+
+    search_index = load_search_index(filename, use_cache=not no_cache)
+    with phase("search"):
+        results = search_index.search(" ".join(terms), limit=limit, kind=kind)
+    if not results:
+        click.echo(f"No matches for '{' '.join(terms)}'", err=True)
         sys.exit(1)
+    with phase("output"):
+        click.echo("\n".join(
+            f"{score:6.1f}  {result_kind:<9}  {label}" + (f" ({detail})" if detail else "")
+            for score, result_kind, label, detail in results
+        ))
+
+
+@click.command()
+@click.argument("filename")
+@no_cache_option
+def shell(filename, no_cache):
+    """
+    Explore an OpenAPI file interactively.
+
+    The file is parsed and indexed once, so summary, schema, impact, urls,
+    search and validate queries answer right away. Each takes the same options as
+    the command of the same name, without the file argument. The file is
+    reloaded in the background when it changes.
+    """
+    from .shell import SpecShell
+
+    live = LiveModel(filename, use_cache=not no_cache, on_reload=lambda model: click.echo(f"\nReloaded {filename}", err=True))
+    live.start()
+    try:
+        commands = {
+            "summary": summary,
+            "schema": schema,
+            "impact": impact,
+            "urls": urls,
+            "search": search,
+            "validate": validate_cmd,
+        }
+        SpecShell(live, commands).cmdloop()
+    finally:
+        live.stop()
+
+
+@click.group()
+def cache():
+    """Manage the on-disk cache of parsed OpenAPI files."""
+    pass
+
+
+@cache.command()
+def clear():
+    """Remove every cached OpenAPI file."""
+    removed = clear_cache()
+    click.echo(f"Removed {removed} cached file(s) from {cache_dir()}")
 
 # Add the new command to the CLI group
 cli.add_command(summary)
 cli.add_command(schema)
+cli.add_command(impact)
 cli.add_command(urls)
 cli.add_command(validate_cmd, name="validate")
+cli.add_command(search)
+cli.add_command(shell)
+cli.add_command(cache)
 
 
 if __name__ == "__main__":
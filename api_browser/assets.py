@@ -0,0 +1,355 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+from .documents import bundle, DocumentCache, has_external_refs
+from .instrument import phase
+from .loader import is_json, load_spec, parse_spec
+from .model import SpecModel
+from .sources import discover_specs, is_spec_collection, DEFAULT_REGISTRY_SIZE
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+__all__ = [
+    "AssetVersion",
+    "FileAsset",
+    "SpecAsset",
+    "StaticAsset",
+    "SpecRegistry",
+    "discover_specs",
+    "is_spec_collection",
+    "precompress",
+    "ENCODINGS",
+]
+
+# Content codings we can produce, in order of preference
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Compressing tiny bodies costs more than it saves
+MIN_COMPRESS_SIZE = 512
+# Requests for unknown spec names look for new files at most this often, in seconds
+RESCAN_INTERVAL = 5.0
+# Where precompressed copies of static files live, next to the original
+PRECOMPRESSED_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+
+class AssetVersion:
+    """
+    One version of a file's bytes, with its HTTP validators and compressed variants.
+
+    Compressed variants are produced the first time they are asked for and
+    kept for as long as this version is current.
+    """
+
+    def __init__(self, data: bytes, mtime: float, mimetype: str):
+        self.data = data
+        self.mimetype = mimetype
+        self.etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self.last_modified = datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+        self._encoded = {"identity": data}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by this version, including its compressed variants."""
+        return sum(len(data) for data in self._encoded.values())
+
+    def can_encode(self, encoding: str) -> bool:
+        return encoding == "identity" or (encoding in ENCODINGS and len(self.data) >= MIN_COMPRESS_SIZE)
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return the body for a content coding, compressing it on first use."""
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    with phase("compress"):
+                        data = _compress(self.data, encoding)
+                    self._encoded[encoding] = data
+        return data
+
+    def add_encoded(self, encoding: str, data: bytes) -> None:
+        """Use an already compressed body for a content coding."""
+        with self._lock:
+            self._encoded[encoding] = data
+
+
+class FileAsset:
+    """A file kept in memory and reloaded whenever its mtime or size changes."""
+
+    def __init__(self, path: str, mimetype: Optional[str] = None):
+        self.path = path
+        self.mimetype = mimetype or "application/octet-stream"
+        self._key = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        version = self._version
+        return version.nbytes if version is not None else 0
+
+    def current(self) -> AssetVersion:
+        """Return the current version of the file, rereading it if it changed on disk."""
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._key != key:
+            with self._lock:
+                if self._key != key:
+                    with phase("read"), open(self.path, "rb") as f:
+                        stat = os.fstat(f.fileno())
+                        data = f.read()
+                    self._version = self._make_version(data, stat.st_mtime)
+                    self._key = (stat.st_mtime_ns, stat.st_size)
+        return self._version
+
+    def _make_version(self, data: bytes, mtime: float) -> AssetVersion:
+        return AssetVersion(data, mtime, self.mimetype)
+
+
+class SpecAsset(FileAsset):
+    """
+    An OpenAPI file, which can also be served as pre-serialized JSON.
+
+    Files that the spec refers to are kept in `documents` and checked on
+    each use, so a change to any of them rebuilds the JSON and the model.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.documents = DocumentCache()
+        # The version last checked for refs to other files, and whether it has any
+        self._external_refs = (None, False)
+        self._json_version = None
+        self._json_source = None
+        self._model = None
+        self._model_source = None
+        self._model_lock = threading.Lock()
+
+    def _make_version(self, data: bytes, mtime: float) -> AssetVersion:
+        mimetype = "application/json" if is_json(data, self.path) else "application/yaml"
+        return AssetVersion(data, mtime, mimetype)
+
+    @property
+    def nbytes(self) -> int:
+        json_version = self._json_version
+        extra = json_version.nbytes if json_version is not None and json_version is not self._version else 0
+        return super().nbytes + extra
+
+    def _source(self) -> tuple:
+        """
+        The current version of the file and of the files it refers to.
+
+        Returns:
+            (version, generation of `documents`, whether the spec refers to other files)
+        """
+        version = self.current()
+        checked, external = self._external_refs
+        if checked is not version:
+            external = has_external_refs(version.data)
+            self._external_refs = (version, external)
+        return version, (self.documents.refresh() if external else 0), external
+
+    def json_version(self) -> AssetVersion:
+        """
+        Return the spec rendered as JSON.
+
+        Browsers parse JSON much faster than YAML, so YAML specs are parsed
+        once per version and serialized to JSON. JSON specs are served as is.
+        Specs that refer to other files are bundled into one document first,
+        since the browser can't fetch those files.
+        """
+        source = self._source()
+        version, _, external = source
+        if version.mimetype == "application/json" and not external:
+            return version
+        if self._json_source != source:
+            with self._lock:
+                if self._json_source != source:
+                    with phase("parse"):
+                        spec = parse_spec(version.data, self.path)
+                    if external:
+                        with phase("bundle"):
+                            spec = bundle(spec, self.path, self.documents)[0]
+                    with phase("serialize"):
+                        data = json.dumps(spec, ensure_ascii=False, separators=(",", ":"), default=str)
+                    self._json_version = AssetVersion(
+                        data.encode("utf-8"), version.last_modified.timestamp(), "application/json"
+                    )
+                    self._json_source = source
+        return self._json_version
+
+    def model(self) -> SpecModel:
+        """
+        Return the parsed spec with its lookup structures, built once per version.
+
+        When the file changes, the first caller builds the new model while
+        any others wait for it instead of parsing the file again, and the
+        new model replaces the old one in a single assignment. The spec is
+        loaded through the on-disk parse cache shared with the CLI. A change
+        to a file the spec refers to counts as a new version too.
+        """
+        source = self._source()
+        if self._model_source != source:
+            # Separate from the file lock, so serving the file doesn't wait for a rebuild
+            with self._model_lock:
+                if self._model_source != source:
+                    self._model = SpecModel(load_spec(self.path), self.path, self.documents)
+                    self._model_source = source
+        return self._model
+
+
+class StaticAsset(FileAsset):
+    """
+    A file shipped with the package, such as the Redoc bundle.
+
+    Precompressed copies next to the file (`.br` and `.gz`) are used instead
+    of compressing on the first request, as long as they still match it.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path, mimetypes.guess_type(path)[0])
+
+    def _make_version(self, data: bytes, mtime: float) -> AssetVersion:
+        version = super()._make_version(data, mtime)
+        for encoding, extension in PRECOMPRESSED_EXTENSIONS.items():
+            if encoding not in ENCODINGS:
+                continue
+            try:
+                with open(self.path + extension, "rb") as f:
+                    compressed = f.read()
+                if _decompress(compressed, encoding) == data:
+                    version.add_encoded(encoding, compressed)
+            except Exception:
+                # Missing, corrupt or stale, so compress on demand instead
+                pass
+        return version
+
+
+def precompress(path: str) -> list:
+    """
+    Write the precompressed copies of a static file that StaticAsset looks for.
+
+    Uses the highest compression levels, since this runs once at build time.
+    Returns the paths written.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    written = []
+    for encoding in ENCODINGS:
+        target = path + PRECOMPRESSED_EXTENSIONS[encoding]
+        if encoding == "gzip":
+            # A fixed mtime keeps the output reproducible
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = brotli.compress(data, quality=11)
+        with open(target, "wb") as f:
+            f.write(compressed)
+        written.append(target)
+    return written
+
+
+class SpecRegistry:
+    """
+    Many specs served from one directory or glob.
+
+    Nothing is read until a spec is first requested. Loaded specs are kept in
+    a least-recently-used cache that is trimmed to `max_bytes`, so memory use
+    doesn't depend on how many specs there are. Each cached spec still
+    reloads itself when its file changes.
+
+    A request for a name that isn't known looks for new files, but at most
+    once every `rescan_interval` seconds, so requests for missing specs
+    can't make the server list the directory over and over. `on_change`,
+    if set, is called with the spec paths whenever a scan finds specs were
+    added or removed.
+    """
+
+    def __init__(self, source: str, max_bytes: int = DEFAULT_REGISTRY_SIZE, rescan_interval: float = RESCAN_INTERVAL):
+        self.source = source
+        self.max_bytes = max_bytes
+        self.rescan_interval = rescan_interval
+        self.on_change = None
+        self._paths = {}
+        self._names = {}
+        self._scanned_at = None
+        self._assets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scan(self) -> list:
+        """Look for specs in the source again and return every spec name."""
+        paths = discover_specs(self.source)
+        changed = self._scanned_at is not None and set(paths.values()) != set(self._paths.values())
+        self._paths = paths
+        self._names = {path: name for name, path in paths.items()}
+        self._scanned_at = time.monotonic()
+        if changed and self.on_change is not None:
+            self.on_change(list(paths.values()))
+        return list(paths)
+
+    def paths(self) -> list:
+        """Paths of every spec found by the last scan."""
+        return list(self._paths.values())
+
+    def name_for(self, path: str) -> Optional[str]:
+        return self._names.get(os.path.abspath(path))
+
+    def get(self, name: str) -> Optional[SpecAsset]:
+        """Return the spec called `name`, or None if there isn't one."""
+        with self._lock:
+            asset = self._assets.get(name)
+            if asset is not None:
+                self._assets.move_to_end(name)
+                return asset
+        path = self._paths.get(name)
+        if path is None:
+            # It may be a file added since the last scan
+            if self._scanned_at is not None and time.monotonic() - self._scanned_at < self.rescan_interval:
+                return None
+            self.scan()
+            path = self._paths.get(name)
+            if path is None:
+                return None
+        with self._lock:
+            asset = self._assets.setdefault(name, SpecAsset(path))
+            self._assets.move_to_end(name)
+        return asset
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(asset.nbytes for asset in self._assets.values())
+
+    def trim(self) -> None:
+        """Drop the least recently used specs until the cache fits in `max_bytes`."""
+        with self._lock:
+            total = sum(asset.nbytes for asset in self._assets.values())
+            # Always keep the most recent spec, even if it's larger than the budget
+            while total > self.max_bytes and len(self._assets) > 1:
+                _, asset = self._assets.popitem(last=False)
+                total -= asset.nbytes
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+def _decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    raise ValueError(f"Unsupported content coding: {encoding}")
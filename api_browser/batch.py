@@ -0,0 +1,132 @@
+import glob
+import json
+import os
+import time
+from typing import Callable, Iterable, Iterator, Optional
+from .sources import SPEC_EXTENSIONS
+
+__all__ = ["expand_filenames", "run_batch", "timed", "BatchReport"]
+
+
+def expand_filenames(patterns: Iterable[str]) -> list:
+    """
+    Expand filenames, directories and glob patterns into a list of files.
+
+    Directories contribute the OpenAPI files directly inside them, and
+    patterns are matched recursively, so `**` works. Plain filenames are kept
+    even if they don't exist, so they're reported as failures rather than
+    dropped. Each file appears once, in the order first given.
+
+    Raises:
+        ValueError: If a directory or pattern matches no files
+    """
+    filenames = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                entry.path
+                for entry in os.scandir(pattern)
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in SPEC_EXTENSIONS
+            )
+        elif glob.has_magic(pattern):
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [pattern]
+        if not matches:
+            raise ValueError(f"No files match {pattern}")
+        for filename in matches:
+            filenames.setdefault(filename, None)
+    return list(filenames)
+
+
+def run_batch(worker: Callable[[str], dict], filenames: list, jobs: int = 1) -> Iterator[dict]:
+    """
+    Run `worker` on every file and yield its results in the order of `filenames`.
+
+    With more than one job the files are spread over a pool of processes, so
+    each process pays the import cost once rather than once per file.
+    `worker` must be picklable, such as a module-level function or a
+    `functools.partial` of one, so it can be sent to the pool.
+    Results are yielded as soon as they're ready, in order.
+    """
+    if jobs <= 1 or len(filenames) <= 1:
+        for filename in filenames:
+            yield worker(filename)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(filenames))) as pool:
+        yield from pool.map(worker, filenames)
+
+
+def timed(worker: Callable[[str], dict], filename: str) -> dict:
+    """
+    Call `worker` and record how long it took, turning any exception into an error result.
+
+    Results always have `file`, `status` and `seconds`. Any status other
+    than "ok" counts as a failure.
+    """
+    start = time.perf_counter()
+    try:
+        result = worker(filename)
+    except Exception as e:
+        result = {"status": "error", "error": str(e) or e.__class__.__name__}
+    result = {"file": filename, **result}
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+class BatchReport:
+    """
+    Tally batch results and write them to a JSON Lines report.
+
+    Each result is written as one line with `"type": "file"`, followed by a
+    final `"type": "summary"` line with the totals and throughput.
+    """
+
+    def __init__(self, path: Optional[str] = None, jobs: int = 1):
+        self.jobs = jobs
+        self.files = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+        self._end = None
+        self._file = open(path, "w", encoding="utf-8") if path else None
+
+    def add(self, result: dict) -> None:
+        self.files += 1
+        if result["status"] != "ok":
+            self.failed += 1
+        if self._file is not None:
+            self._write({"type": "file", **result})
+
+    @property
+    def seconds(self) -> float:
+        """Time since the batch started, or until it finished once closed."""
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    @property
+    def specs_per_second(self) -> float:
+        seconds = self.seconds
+        return self.files / seconds if seconds > 0 else 0.0
+
+    def close(self) -> None:
+        if self._end is None:
+            self._end = time.perf_counter()
+        if self._file is None:
+            return
+        self._write({
+            "type": "summary",
+            "files": self.files,
+            "passed": self.files - self.failed,
+            "failed": self.failed,
+            "jobs": self.jobs,
+            "seconds": round(self.seconds, 6),
+            "specs_per_second": round(self.specs_per_second, 3),
+        })
+        self._file.close()
+        self._file = None
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,345 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from typing import Iterable, Optional
+from .loader import load_spec
+from .openapi import external_ref_path, parse_pointer
+
+__all__ = [
+    "DocumentCache", "bundle", "component_names", "has_external_refs", "fingerprint", "fingerprint_matches",
+]
+
+log = logging.getLogger(__name__)
+
+# Files loaded at the same time by `DocumentCache.prefetch`
+MAX_LOAD_THREADS = 8
+# A $ref key, in YAML or JSON, whose value doesn't start with "#"
+_EXTERNAL_REF = re.compile(rb"""\$ref['"]?\s*:(?!\s*['"]?#)""")
+
+
+def has_external_refs(data: bytes) -> bool:
+    """
+    Check the text of a spec for refs into other files, without parsing it.
+
+    This can be fooled by text that looks like a $ref, so a True only means
+    the parsed spec is worth checking.
+    """
+    return _EXTERNAL_REF.search(data) is not None
+
+
+class DocumentCache:
+    """
+    The files that $refs point to, each loaded and parsed at most once.
+
+    Files go through `load_spec`, so they share the on-disk parse cache.
+    Every $ref inside a loaded file is rewritten to an absolute path, so it
+    can be followed without knowing which file it came from. `prefetch`
+    loads every file a document refers to, directly or not, a batch of
+    independent files at a time on several threads.
+
+    Long-running processes call `refresh` to drop the files that changed
+    on disk since they were loaded.
+
+    A file that can't be loaded reads as None. Its error is kept in `errors`
+    and logged once as a warning on the `api_browser.documents` logger.
+    """
+
+    def __init__(self, use_cache: bool = True):
+        self.use_cache = use_cache
+        # Path -> ((mtime, size), document or None if it couldn't be loaded)
+        self._documents = {}
+        # Path -> exception, for the files in `_documents` that couldn't be loaded
+        self.errors = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, path: str):
+        """Return the parsed document at `path`, or None if it can't be loaded."""
+        entry = self._documents.get(path)
+        if entry is None:
+            with self._lock:
+                lock = self._locks.setdefault(path, threading.Lock())
+            # Threads asking for the same file wait for one load
+            with lock:
+                entry = self._documents.get(path)
+                if entry is None:
+                    entry = self._load(path)
+                    self._documents[path] = entry
+        return entry[1]
+
+    def resolve(self, path: str, fragment: str):
+        """Return the value at a JSON pointer fragment inside a document, without following $refs."""
+        value = self.get(path)
+        parts = parse_pointer("#" + fragment)
+        if parts is None:
+            return None
+        for part in parts:
+            if isinstance(value, dict):
+                value = value.get(part)
+            elif isinstance(value, list):
+                try:
+                    value = value[int(part)]
+                except (ValueError, IndexError):
+                    return None
+            else:
+                return None
+        return value
+
+    def prefetch(self, document, base: Optional[str]) -> None:
+        """Load every file that `document` refers to, directly or through other files."""
+        pending = set(_external_paths(document, base)) - set(self._documents)
+        while pending:
+            batch = sorted(pending)
+            if len(batch) == 1:
+                self.get(batch[0])
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=min(MAX_LOAD_THREADS, len(batch))) as executor:
+                    list(executor.map(self.get, batch))
+            pending = set()
+            for path in batch:
+                pending.update(_external_paths(self.get(path), path))
+            pending -= set(self._documents)
+
+    def paths(self) -> list:
+        """Paths of the files loaded so far."""
+        return sorted(self._documents)
+
+    def refresh(self) -> int:
+        """
+        Forget the files that changed on disk since they were loaded.
+
+        Returns `generation`, which goes up whenever a file is forgotten, so
+        anything built from the documents knows when to rebuild.
+        """
+        for path, (key, _) in list(self._documents.items()):
+            if _stat_key(path) != key:
+                self._documents.pop(path, None)
+                self.errors.pop(path, None)
+                self.generation += 1
+        return self.generation
+
+    def _load(self, path: str) -> tuple:
+        key = _stat_key(path)
+        try:
+            document = load_spec(path, use_cache=self.use_cache)
+        except Exception as e:
+            self.errors[path] = e
+            log.warning("Can't load %s: %s", path, e)
+            return key, None
+        _absolutize_refs(document, path)
+        return key, document
+
+
+def _stat_key(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _iter_refs(document) -> Iterable[dict]:
+    """Yield every object with a string $ref in a document."""
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get("$ref"), str):
+                yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _external_paths(document, base: Optional[str]) -> set:
+    paths = set()
+    for node in _iter_refs(document):
+        path = external_ref_path(node["$ref"], base)
+        if path is not None:
+            paths.add(path)
+    return paths
+
+
+def _absolutize_refs(document, path: str) -> None:
+    """Rewrite the $refs in a freshly loaded document to point at absolute paths."""
+    for node in _iter_refs(document):
+        ref = node["$ref"]
+        document_part, _, fragment = ref.partition("#")
+        if "://" in document_part:
+            continue
+        target = external_ref_path(ref, path) if document_part else path
+        node["$ref"] = f"{target}#{fragment}"
+
+
+def fingerprint(paths: Iterable[str]) -> tuple:
+    """Hash the contents of some files, to tell later whether any of them changed."""
+    return tuple((path, _file_digest(path)) for path in sorted(paths))
+
+
+def fingerprint_matches(value: tuple) -> bool:
+    return all(_file_digest(path) == digest for path, digest in value)
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def bundle(spec: dict, filename: Optional[str], documents: Optional[DocumentCache] = None) -> tuple:
+    """
+    Bring everything a spec refers to in other files into a single document.
+
+    External refs to /components/<section>/<name> are copied into the same
+    section of the spec, under the names `component_names` gives them, and
+    the refs point there instead. Other external refs, such as whole files, are replaced by
+    a copy of what they point to. A spec without external refs is returned
+    as is.
+
+    Returns:
+        The bundled document, and the paths of the files it was built from
+    """
+    if not any(external_ref_path(node["$ref"], filename) for node in _iter_refs(spec)):
+        return spec, []
+    documents = documents or DocumentCache()
+    bundler = _Bundler(spec, filename, documents)
+    bundled = bundler.copy(spec, bundler.root_path)
+    if bundler.added:
+        components = dict(bundled.get("components") or {})
+        for section, values in bundler.added.items():
+            components[section] = {**(components.get(section) or {}), **values}
+        bundled["components"] = components
+    return bundled, sorted(bundler.paths)
+
+
+def component_names(spec: dict, filename: Optional[str], documents: DocumentCache) -> dict:
+    """
+    Name the components of other files that a spec refers to, as `bundle` does.
+
+    A component keeps its name unless the spec, or another file, has one by
+    that name in the same section. Then the name of its file is appended,
+    and failing that a number. Components are named in order of path and
+    pointer, not in the order refs to them are found, so every caller ends
+    up with the same names.
+
+    Returns:
+        (path, fragment) -> name
+    """
+    documents.prefetch(spec, filename)
+    root_path = os.path.abspath(filename) if filename else None
+    found = set()
+    pending = [(spec, filename)]
+    seen = set()
+    while pending:
+        document, base = pending.pop()
+        for node in _iter_refs(document):
+            ref = node["$ref"]
+            path = external_ref_path(ref, base)
+            if path is None or path == root_path:
+                continue
+            fragment = ref.partition("#")[2]
+            parts = parse_pointer("#" + fragment)
+            if parts and len(parts) == 3 and parts[0] == "components":
+                found.add((path, fragment, parts[1], parts[2]))
+            if path not in seen:
+                seen.add(path)
+                pending.append((documents.get(path), path))
+
+    taken = _component_names_taken(spec)
+    return {
+        (path, fragment): _unique_name(taken, section, name, path)
+        for path, fragment, section, name in sorted(found)
+    }
+
+
+def _component_names_taken(spec: dict) -> dict:
+    components = spec.get("components") if isinstance(spec, dict) else None
+    if not isinstance(components, dict):
+        return {}
+    return {section: set(values) for section, values in components.items() if isinstance(values, dict)}
+
+
+def _unique_name(taken: dict, section: str, name: str, path: str) -> str:
+    """Pick a name that's free in a section of `taken`, and take it."""
+    names = taken.setdefault(section, set())
+    candidate = name
+    if candidate in names:
+        candidate = f"{name}_{os.path.splitext(os.path.basename(path))[0]}"
+    number = 2
+    while candidate in names:
+        candidate = f"{name}_{number}"
+        number += 1
+    names.add(candidate)
+    return candidate
+
+
+class _Bundler:
+    def __init__(self, spec: dict, filename: Optional[str], documents: DocumentCache):
+        self.documents = documents
+        self.root_path = os.path.abspath(filename) if filename else None
+        self.names = component_names(spec, filename, documents)
+        self.taken = _component_names_taken(spec)
+        for (path, fragment), name in self.names.items():
+            self.taken.setdefault(parse_pointer("#" + fragment)[1], set()).add(name)
+        # Section -> name -> copied value, for the components brought in
+        self.added = {}
+        # (path, fragment) -> local ref, for what's been brought in already
+        self.refs = {}
+        self.inlining = set()
+        self.paths = set()
+
+    def copy(self, node, path: Optional[str]):
+        if isinstance(node, dict):
+            if isinstance(node.get("$ref"), str):
+                replaced = self.replace_ref(node, path)
+                if replaced is not None:
+                    return replaced
+            return {key: self.copy(value, path) for key, value in node.items()}
+        if isinstance(node, list):
+            return [self.copy(value, path) for value in node]
+        return node
+
+    def replace_ref(self, node: dict, path: Optional[str]):
+        ref = node["$ref"]
+        target_path = external_ref_path(ref, path)
+        if target_path is None:
+            return None
+        fragment = ref.partition("#")[2]
+        if target_path == self.root_path:
+            return {**node, "$ref": f"#{fragment}"}
+
+        key = (target_path, fragment)
+        if key in self.refs:
+            return {**node, "$ref": self.refs[key]}
+        target = self.documents.resolve(target_path, fragment)
+        if target is None:
+            return None
+        self.paths.add(target_path)
+
+        parts = parse_pointer("#" + fragment)
+        if parts and len(parts) == 3 and parts[0] == "components":
+            section, name = parts[1], self.names[key]
+        elif key in self.inlining:
+            # A file that refers back to itself can't be inlined, so it becomes a schema
+            section = "schemas"
+            name = _unique_name(
+                self.taken, section, os.path.splitext(os.path.basename(target_path))[0] + fragment.replace("/", "_"),
+                target_path,
+            )
+        else:
+            self.inlining.add(key)
+            try:
+                return self.copy(target, target_path)
+            finally:
+                self.inlining.discard(key)
+
+        local = "#/components/{}/{}".format(section, name.replace("~", "~0").replace("/", "~1"))
+        self.refs[key] = local
+        self.added.setdefault(section, {})[name] = self.copy(target, target_path)
+        return {**node, "$ref": local}
@@ -0,0 +1,190 @@
+import selectors
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+from .watcher import Broadcaster
+
+__all__ = ["EventServer", "HEARTBEAT_INTERVAL"]
+
+# How often idle event streams send a comment, so dead connections get noticed
+HEARTBEAT_INTERVAL = 15
+# Requests with longer headers than this aren't from EventSource
+MAX_REQUEST_SIZE = 16 * 1024
+
+STREAM_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"X-Accel-Buffering: no\r\n"
+    b"Connection: keep-alive\r\n"
+)
+STREAM_START = b"\r\nretry: 1000\n\n"
+NOT_FOUND = b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+
+class EventServer(threading.Thread):
+    """
+    Server-sent event streams for every open page, from a single thread.
+
+    The streams get their own listening socket, and every connection is
+    kept in one selector, so an idle page costs an open socket and nothing
+    more. The WSGI server's worker threads never wait on a stream, so any
+    number of open pages can't starve the requests for specs and assets.
+
+    Events published on `broadcaster` are written to every stream. Clients
+    too slow to take a few bytes are disconnected, and EventSource connects
+    again by itself.
+
+    Pages are served from another port, so they're another origin. Only
+    pages from the same host name as the stream are allowed to read it.
+    """
+
+    def __init__(self, broadcaster: Broadcaster, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(name="api-browser-events", daemon=True)
+        self.broadcaster = broadcaster
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        self._listener = socket.create_server((host, port), family=family)
+        self._listener.setblocking(False)
+        self.port = self._listener.getsockname()[1]
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        # Socket -> request bytes received so far, or None once it's streaming
+        self._clients = {}
+        self._stopped = threading.Event()
+        broadcaster.subscribe(self._wake)
+
+    @property
+    def streams(self) -> int:
+        """Number of open event streams."""
+        return sum(1 for request in list(self._clients.values()) if request is None)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._waker.send(b"\0")
+        except OSError:
+            # Already woken and not yet drained, or closed
+            pass
+
+    def run(self) -> None:
+        self._selector.register(self._listener, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wakeup, selectors.EVENT_READ, "wakeup")
+        version = self.broadcaster.version
+        next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL
+        try:
+            while not self._stopped.is_set():
+                timeout = max(0.0, next_heartbeat - time.monotonic())
+                for key, _ in self._selector.select(timeout):
+                    if key.data == "accept":
+                        self._accept()
+                    elif key.data == "wakeup":
+                        self._drain()
+                    else:
+                        self._read(key.fileobj)
+
+                if self.broadcaster.version != version:
+                    version, data = self.broadcaster.version, self.broadcaster.data
+                    self._send_all(f"event: reload\ndata: {data or ''}\n\n".encode("utf-8"))
+                if time.monotonic() >= next_heartbeat:
+                    self._send_all(b": heartbeat\n\n")
+                    next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL
+        finally:
+            self.broadcaster.unsubscribe(self._wake)
+            for client in list(self._clients):
+                self._close(client)
+            self._selector.close()
+            self._listener.close()
+            self._wakeup.close()
+            self._waker.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            client.setblocking(False)
+            self._clients[client] = b""
+            self._selector.register(client, selectors.EVENT_READ, "client")
+
+    def _drain(self) -> None:
+        try:
+            while self._wakeup.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _read(self, client: socket.socket) -> None:
+        try:
+            data = client.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(client)
+            return
+        request = self._clients.get(client)
+        if request is None:
+            # Streaming clients have nothing more to say
+            return
+        request += data
+        if b"\r\n\r\n" not in request:
+            if len(request) > MAX_REQUEST_SIZE:
+                self._close(client)
+            else:
+                self._clients[client] = request
+            return
+
+        method, _, rest = request.partition(b" ")
+        path = rest.split(b" ", 1)[0].split(b"?", 1)[0]
+        if method == b"GET" and path == b"/events":
+            self._clients[client] = None
+            self._send(client, STREAM_HEADERS + _cors_header(request) + STREAM_START)
+        else:
+            self._send(client, NOT_FOUND)
+            self._close(client)
+
+    def _send_all(self, data: bytes) -> None:
+        for client, request in list(self._clients.items()):
+            if request is None:
+                self._send(client, data)
+
+    def _send(self, client: socket.socket, data: bytes) -> None:
+        try:
+            sent = client.send(data)
+        except OSError:
+            sent = 0
+        if sent < len(data):
+            self._close(client)
+
+    def _close(self, client: socket.socket) -> None:
+        if self._clients.pop(client, False) is False:
+            return
+        try:
+            self._selector.unregister(client)
+        except (KeyError, ValueError):
+            pass
+        client.close()
+
+
+def _cors_header(request: bytes) -> bytes:
+    """Allow the request's Origin if it has the same host name the stream was requested at."""
+    headers = {}
+    for line in request.split(b"\r\n\r\n", 1)[0].split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+    origin = headers.get(b"origin")
+    host = headers.get(b"host")
+    if not origin or not host:
+        return b""
+    try:
+        same_host = urlsplit(origin.decode("latin-1")).hostname == urlsplit("//" + host.decode("latin-1")).hostname
+    except ValueError:
+        return b""
+    return b"Access-Control-Allow-Origin: " + origin + b"\r\n" if same_host else b""
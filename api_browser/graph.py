@@ -0,0 +1,277 @@
+from typing import Optional
+from .openapi import is_ref, iter_operations, SpecIndex
+
+__all__ = ["SchemaGraph", "operation_label"]
+
+def operation_label(path: str, method: str, operation: dict) -> str:
+    """
+    Name an operation by its operationId, falling back to "METHOD /path".
+
+    Only impact lists operations without an operationId. The request and
+    response usage that schema shows leaves them out.
+    """
+    return operation.get("operationId") or f"{method.upper()} {path}"
+
+
+class SchemaGraph:
+    """
+    Dependency graph between component schemas and the operations that use them.
+
+    The graph is built in a single pass over the document. Forward edges
+    record what each schema or operation refers to and reverse edges record
+    who refers to each schema, so usage questions become dictionary lookups
+    instead of rescans of the whole spec.
+    """
+
+    def __init__(self, spec: dict, index: Optional[SpecIndex] = None):
+        self.index = index or SpecIndex(spec)
+        # Component schemas of other files are added as they're found referenced, named by the index
+        self.schemas = dict(self.index.get(spec, ["components", "schemas"], default={}))
+        # Schema -> schemas it refers to, and the reverse
+        self.references = {}
+        self.referenced_by = {}
+        # Operation -> schemas used directly as its request or response body, and the reverse
+        self.operation_requests = {}
+        self.operation_responses = {}
+        self.requests = {}
+        self.responses = {}
+        # Operation -> every schema it refers to anywhere, and the reverse
+        self.operation_refs = {}
+        self.operations_using = {}
+        # Strongly connected components of the schema graph, built on first use
+        self._component_of = None
+        self._members = None
+        self._parents = None
+        self._ancestors = {}
+        self._build(spec)
+
+    def _build(self, spec: dict) -> None:
+        paths = self.index.get(spec, ["paths"], default={})
+        for path, method, operation in iter_operations(spec, self.index):
+            label = operation_label(path, method, operation)
+            path_parameters = self.index.get(paths, [path, "parameters"], default=[])
+            refs = self._operation_schema_refs([operation, path_parameters])
+            self.operation_refs[label] = refs
+            for name in refs:
+                self.operations_using.setdefault(name, set()).add(label)
+
+            requests = self.operation_requests.setdefault(label, set())
+            request_body = self.index.get(operation, ["requestBody"], default={})
+            for media_type in self.index.get(request_body, ["content"], default={}).values():
+                requests.update(_body_schema_names(media_type, self.index))
+
+            responses = self.operation_responses.setdefault(label, set())
+            for response in self.index.get(operation, ["responses"], default={}).values():
+                response = self.index.deref(response, {})
+                for media_type in self.index.get(response, ["content"], default={}).values():
+                    responses.update(_body_schema_names(media_type, self.index))
+
+            # Request and response usage lists only operations with an operationId, as it always has
+            if not operation.get("operationId"):
+                continue
+            for name in requests:
+                self.requests.setdefault(name, set()).add(label)
+            for name in responses:
+                self.responses.setdefault(name, set()).add(label)
+
+        # Schemas found in other files are appended, so this also visits them
+        names = list(self.schemas)
+        for name in names:
+            targets = set()
+            for ref in _nested_refs(self.schemas[name]):
+                target = self.index.schema_name(ref)
+                if target is not None:
+                    targets.add(target)
+                    if self._add_external(ref, target):
+                        names.append(target)
+            self.references[name] = targets
+            for target in targets:
+                self.referenced_by.setdefault(target, set()).add(name)
+
+    def _add_external(self, ref: str, name: str) -> bool:
+        """Add the schema an external ref points to, returning True if it's new."""
+        if name in self.schemas or ref.startswith("#"):
+            return False
+        schema = self.index.resolve(ref)
+        if not isinstance(schema, dict):
+            return False
+        self.schemas[name] = schema
+        return True
+
+    def _operation_schema_refs(self, nodes: list) -> set:
+        """Schema names referred to anywhere in an operation, looking through non-schema refs."""
+        names = set()
+        seen = set()
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+                continue
+            if not isinstance(node, dict):
+                continue
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                name = self.index.schema_name(ref)
+                if name is not None:
+                    names.add(name)
+                    self._add_external(ref, name)
+                elif ref not in seen:
+                    # Shared parameters, request bodies and responses can hold schema refs too
+                    seen.add(ref)
+                    stack.append(self.index.resolve(ref))
+                continue
+            stack.extend(node.values())
+        return names
+
+    def impact(self, name: str):
+        """
+        Everything that reaches `name` through any chain of references.
+
+        Returns:
+            A (schemas, operations) tuple of sorted names
+        """
+        self._condense()
+        component = self._component_of.get(name)
+        if component is None:
+            return [], sorted(self.operations_using.get(name, ()))
+        schemas = set(self._ancestor_schemas(component))
+        members = self._members[component]
+        if len(members) > 1:
+            schemas.update(members)
+        schemas.discard(name)
+
+        operations = set(self.operations_using.get(name, ()))
+        for schema_name in schemas:
+            operations.update(self.operations_using.get(schema_name, ()))
+        return sorted(schemas), sorted(operations)
+
+    def _condense(self) -> None:
+        """Collapse the schema graph into a DAG of strongly connected components."""
+        if self._component_of is not None:
+            return
+        nodes = list(self.references)
+        for targets in self.references.values():
+            nodes.extend(targets)
+        self._members = _strongly_connected_components(nodes, self.references)
+        self._component_of = {
+            node: component for component, members in enumerate(self._members) for node in members
+        }
+        self._parents = [set() for _ in self._members]
+        for source, targets in self.references.items():
+            source_component = self._component_of[source]
+            for target in targets:
+                target_component = self._component_of[target]
+                if target_component != source_component:
+                    self._parents[target_component].add(source_component)
+
+    def _ancestor_schemas(self, component: int) -> frozenset:
+        """Schemas in every component that can reach `component`, memoized per component."""
+        memo = self._ancestors
+        stack = [component]
+        while stack:
+            current = stack[-1]
+            if current in memo:
+                stack.pop()
+                continue
+            missing = [parent for parent in self._parents[current] if parent not in memo]
+            if missing:
+                stack.extend(missing)
+                continue
+            ancestors = set()
+            for parent in self._parents[current]:
+                ancestors.update(self._members[parent])
+                ancestors.update(memo[parent])
+            memo[current] = frozenset(ancestors)
+            stack.pop()
+        return memo[component]
+
+    def referencing_schemas(self, name: str) -> list:
+        """Schemas that refer to `name`, not counting `name` itself."""
+        return sorted(self.referenced_by.get(name, set()) - {name})
+
+    def request_operations(self, name: str) -> list:
+        """Operations that use `name` as their request body."""
+        return sorted(self.requests.get(name, ()))
+
+    def response_operations(self, name: str) -> list:
+        """Operations that use `name` as a response body."""
+        return sorted(self.responses.get(name, ()))
+
+
+def _nested_refs(schema) -> set:
+    """Collect the $refs anywhere inside a schema without following them."""
+    refs = set()
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                refs.add(ref)
+            else:
+                stack.extend(node.values())
+    return refs
+
+
+def _strongly_connected_components(nodes, edges: dict) -> list:
+    """
+    Tarjan's algorithm with an explicit stack.
+
+    Returns a list of components, each a list of nodes.
+    """
+    order = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    for root in nodes:
+        if root in order:
+            continue
+        order[root] = lowlink[root] = len(order)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in order:
+                    order[successor] = lowlink[successor] = len(order)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(edges.get(successor, ()))))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], order[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _body_schema_names(media_type, index: SpecIndex) -> set:
+    """Schema names used directly by a media type, either as the body or as its array items."""
+    schema = media_type.get("schema") if isinstance(media_type, dict) else None
+    if not isinstance(schema, dict):
+        return set()
+    if is_ref(schema):
+        ref = schema["$ref"]
+    elif schema.get("type") == "array" and is_ref(schema.get("items")):
+        ref = schema["items"]["$ref"]
+    else:
+        return set()
+    name = index.schema_name(ref)
+    return {name} if name else set()
@@ -0,0 +1,140 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+
+__all__ = ["Timings", "phase", "start", "stop", "current", "peak_rss", "profile"]
+
+_local = threading.local()
+_NO_PHASE = nullcontext()
+
+
+class Timings:
+    """
+    Time spent in each named phase of a run.
+
+    Phases can nest, and nested phases are recorded under their parent, as
+    in "load/parse". Repeated phases add up, and their count is kept too.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        # Phase path -> [seconds, count], in the order phases first ran
+        self.phases = {}
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        key = "/".join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            entry = self.phases.setdefault(key, [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+
+    def finish(self) -> None:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def total(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def report(self) -> str:
+        """Format the phases as an indented table, with untimed time as "(other)"."""
+        lines = ["Timings:"]
+        width = max([len(key.rsplit("/", 1)[-1]) + 2 * key.count("/") for key in self.phases] + [7])
+        timed = 0.0
+        for key, (seconds, count) in self.phases.items():
+            depth = key.count("/")
+            if depth == 0:
+                timed += seconds
+            label = "  " * depth + key.rsplit("/", 1)[-1]
+            lines.append(f"  {label:<{width}} {seconds * 1000:>10.1f} ms {count:>6}x")
+        lines.append(f"  {'(other)':<{width}} {max(self.total - timed, 0) * 1000:>10.1f} ms")
+        lines.append(f"  {'total':<{width}} {self.total * 1000:>10.1f} ms")
+        rss = peak_rss()
+        if rss is not None:
+            lines.append(f"Peak RSS: {rss / 1024 / 1024:.1f} MB")
+        return "\n".join(lines)
+
+    def server_timing(self) -> str:
+        """Format the top-level phases as a Server-Timing header value."""
+        metrics = [
+            f"{key};dur={seconds * 1000:.2f}"
+            for key, (seconds, _) in self.phases.items()
+            if "/" not in key
+        ]
+        metrics.append(f"total;dur={self.total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+def start() -> Timings:
+    """Start timing phases on this thread."""
+    timings = Timings()
+    _local.timings = timings
+    return timings
+
+
+def stop() -> Optional[Timings]:
+    """Stop timing phases on this thread, returning what was recorded."""
+    timings = current()
+    _local.timings = None
+    if timings is not None:
+        timings.finish()
+    return timings
+
+
+def current() -> Optional[Timings]:
+    return getattr(_local, "timings", None)
+
+
+def phase(name: str):
+    """
+    Time a block of code as a phase of the current run.
+
+    Costs next to nothing when timing isn't turned on:
+
+        with phase("parse"):
+            spec = parse_spec(data)
+    """
+    timings = getattr(_local, "timings", None)
+    if timings is None:
+        return _NO_PHASE
+    return timings.phase(name)
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident memory of this process in bytes, or None where it isn't available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def profile(filename: str) -> Iterator["cProfile.Profile"]:
+    """Profile a block of code with cProfile and write the stats to `filename`."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+from typing import Optional
+from .instrument import phase
+
+__all__ = ["load_spec", "parse_spec", "is_json", "cache_dir", "clear_cache", "get_cached", "set_cached"]
+
+# Bump this when the cached representation changes so old entries are ignored.
+CACHE_VERSION = 1
+CACHE_DIR_ENV = "API_BROWSER_CACHE_DIR"
+CACHE_SIZE_ENV = "API_BROWSER_CACHE_SIZE"
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+CACHE_SUFFIX = ".pickle"
+
+_MISSING = object()
+_LEADING_WHITESPACE = re.compile(rb"(?:\xef\xbb\xbf)?\s*")
+
+
+def cache_dir() -> str:
+    """Return the directory used for the parsed-spec cache."""
+    explicit = os.environ.get(CACHE_DIR_ENV)
+    if explicit:
+        return explicit
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "api_browser")
+
+
+def cache_size_limit() -> int:
+    """Return the maximum total size of the cache in bytes."""
+    try:
+        return int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE))
+    except ValueError:
+        return DEFAULT_CACHE_SIZE
+
+
+def is_json(data: bytes, filename: Optional[str] = None) -> bool:
+    """Check if an OpenAPI file looks like JSON, by extension or by its first character."""
+    if filename and filename.lower().endswith(".json"):
+        return True
+    start = _LEADING_WHITESPACE.match(data).end()
+    return data[start:start + 1] in (b"{", b"[")
+
+
+def yaml_loader():
+    """
+    Return the fastest safe YAML loader.
+
+    That's libyaml when PyYAML was built with it; it's several times faster
+    than the pure-Python loader and produces the same documents. PyYAML is
+    imported here rather than at the top, so commands that only read JSON
+    or cached specs don't pay for it.
+    """
+    import yaml
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_spec(data: bytes, filename: Optional[str] = None, loader=None):
+    """
+    Parse the raw bytes of an OpenAPI file.
+
+    JSON files are parsed with the json module, which is much faster than
+    any YAML loader. Everything else, including JSON-looking files that turn
+    out to be YAML flow mappings, is parsed with `loader` (libyaml when
+    available).
+    """
+    if is_json(data, filename):
+        try:
+            return json.loads(data)
+        except ValueError:
+            pass
+    import yaml
+    return yaml.load(data, Loader=loader or yaml_loader())
+
+
+def load_spec(filename: str, use_cache: bool = True):
+    """
+    Read and parse an OpenAPI file.
+
+    The parsed document is cached on disk keyed by the file's path, mtime,
+    size and content hash, so unchanged files are only parsed once.
+
+    Args:
+        filename: Path to the OpenAPI file
+        use_cache: Set to False to always parse the file and skip the cache
+
+    Returns:
+        The parsed document
+    """
+    path = os.path.abspath(filename)
+    with phase("read"):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+
+    if not use_cache:
+        with phase("parse"):
+            return parse_spec(data, path)
+
+    entry = _entry_path(_cache_key(path, stat, data))
+    with phase("cache"):
+        spec = _read_entry(entry)
+    if spec is _MISSING:
+        with phase("parse"):
+            spec = parse_spec(data, path)
+        with phase("cache"):
+            _write_entry(entry, spec)
+    return spec
+
+
+def get_cached(key: str, default=None):
+    """Return a value stored with `set_cached`, or `default` if there isn't one."""
+    value = _read_entry(_entry_path(key))
+    return default if value is _MISSING else value
+
+
+def set_cached(key: str, value) -> None:
+    """
+    Store a picklable value in the on-disk cache under `key`.
+
+    Values share the size limit and eviction of parsed specs, and are
+    removed by `clear_cache`. Keys should be hashes, so they're safe to use
+    as file names.
+    """
+    _write_entry(_entry_path(key), value)
+
+
+def clear_cache() -> int:
+    """Remove every cached entry and return how many were removed."""
+    removed = 0
+    for entry in _list_entries():
+        try:
+            os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _cache_key(path: str, stat: os.stat_result, data: bytes) -> str:
+    content_hash = hashlib.blake2b(data).hexdigest()
+    key = f"{CACHE_VERSION}\0{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0{content_hash}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(cache_dir(), key + CACHE_SUFFIX)
+
+
+def _read_entry(entry: str):
+    try:
+        with open(entry, "rb") as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return _MISSING
+    except Exception:
+        # A truncated or stale entry is treated as a miss and thrown away
+        _remove_quietly(entry)
+        return _MISSING
+    # Touch the entry so eviction drops the least recently used ones first
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    return value
+
+
+def _write_entry(entry: str, value) -> None:
+    directory = os.path.dirname(entry)
+    import tempfile
+
+    # The cache is best effort; a read-only or full disk shouldn't break commands
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry)
+    except Exception:
+        _remove_quietly(tmp_path)
+        return
+    _evict(cache_size_limit())
+
+
+def _evict(limit: int) -> None:
+    """Remove the least recently used entries until the cache fits in `limit` bytes."""
+    entries = []
+    total = 0
+    for entry in _list_entries():
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total += stat.st_size
+    if total <= limit:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        if total <= limit:
+            break
+        if _remove_quietly(path):
+            total -= size
+
+
+def _list_entries():
+    try:
+        with os.scandir(cache_dir()) as it:
+            return [entry for entry in it if entry.is_file() and entry.name.endswith(CACHE_SUFFIX)]
+    except OSError:
+        return []
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
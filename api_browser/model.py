@@ -0,0 +1,205 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, TYPE_CHECKING
+from .documents import DocumentCache
+from .graph import SchemaGraph
+from .instrument import phase
+from .loader import load_spec
+from .openapi import SpecIndex
+from .operations import OperationIndex
+
+if TYPE_CHECKING:
+    from .search_index import SearchIndex
+
+__all__ = ["SpecModel", "LiveModel", "load_model", "live_model"]
+
+log = logging.getLogger(__name__)
+
+# Live models by absolute path, which load_model answers from
+_live_models = {}
+# Results kept by each model's `memo`, beyond its lookup structures
+MAX_MEMO_ENTRIES = 64
+
+
+class SpecModel:
+    """
+    A parsed spec together with the lookup structures the commands use.
+
+    The index, schema graph and operation index are built the first time
+    they're needed and kept, so a model that stays in memory answers later
+    queries without parsing or indexing again. Rendered output can be kept
+    too, with `memo`. A model never changes once built: a new version of
+    the file gets a new model.
+
+    Refs into other files are resolved relative to `filename`, loading each
+    file once through `documents`.
+    """
+
+    def __init__(self, spec: dict, filename: Optional[str] = None, documents: Optional[DocumentCache] = None):
+        self.spec = spec
+        self.filename = filename
+        self.documents = documents
+        self._structures = {}
+        self._results = OrderedDict()
+        self._lock = threading.RLock()
+
+    def memo(self, key, compute: Callable[[], object]):
+        """
+        Return `compute()` the first time `key` is asked for, and the same value after that.
+
+        Only the most recently used results are kept, so queries with
+        endless variations of options can't fill up memory.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            value = compute()
+            self._results[key] = value
+            if len(self._results) > MAX_MEMO_ENTRIES:
+                self._results.popitem(last=False)
+            return value
+
+    def _build(self, key: str, compute: Callable[[], object]):
+        try:
+            return self._structures[key]
+        except KeyError:
+            pass
+        # Threads asking for the same structure wait for one build
+        with self._lock:
+            if key not in self._structures:
+                self._structures[key] = compute()
+            return self._structures[key]
+
+    @property
+    def index(self) -> SpecIndex:
+        return self._build("index", lambda: SpecIndex(self.spec, base=self.filename, documents=self.documents))
+
+    @property
+    def graph(self) -> SchemaGraph:
+        def build():
+            with phase("graph"):
+                return SchemaGraph(self.spec, self.index)
+        return self._build("graph", build)
+
+    @property
+    def operations(self) -> OperationIndex:
+        def build():
+            with phase("index"):
+                return OperationIndex(self.spec, self.index)
+        return self._build("operations", build)
+
+    @property
+    def search_index(self) -> "SearchIndex":
+        def build():
+            from .search_index import SearchIndex
+            with phase("index"):
+                return SearchIndex.build(self.spec, self.index)
+        return self._build("search", build)
+
+    def warm(self) -> "SpecModel":
+        """Build every lookup structure now instead of on first use."""
+        for build in (self.index.resolve_all, lambda: self.graph, lambda: self.operations, lambda: self.search_index):
+            try:
+                build()
+            except Exception:
+                # Nothing is stored for a failed build, so the command that
+                # needs it runs into the same error and reports it
+                pass
+        return self
+
+
+class LiveModel:
+    """
+    The model of a file, kept in memory and reloaded when the file changes.
+
+    Reloads happen on a background thread. The new model is parsed and
+    fully indexed before it replaces the old one, so readers always see a
+    complete model and never wait for a reload. While a LiveModel is
+    watching, `load_model` returns its model for that file.
+
+    The files the spec's $refs point to are watched too, once the model
+    has loaded them, and the watched set follows them on every reload.
+    """
+
+    def __init__(self, filename: str, use_cache: bool = True, on_reload: Optional[Callable] = None):
+        self.filename = filename
+        self.path = os.path.abspath(filename)
+        self.use_cache = use_cache
+        self.on_reload = on_reload
+        self.model = self._load()
+        self._watcher = None
+
+    def _load(self) -> SpecModel:
+        spec = load_spec(self.filename, use_cache=self.use_cache)
+        return SpecModel(spec, self.filename, DocumentCache(use_cache=self.use_cache))
+
+    def reload(self) -> SpecModel:
+        model = self._load().warm()
+        # Replacing the reference is atomic, so readers get the old model or the new one
+        self.model = model
+        self._watch(model)
+        if self.on_reload is not None:
+            self.on_reload(model)
+        return model
+
+    def start(self, warm: bool = True) -> "LiveModel":
+        """Watch the file and its $ref files for changes and serve its model from `load_model`."""
+        from .watcher import FileWatcher
+
+        self._watcher = FileWatcher(self._paths(self.model), self._on_change)
+        self._watcher.start()
+        _live_models[self.path] = self
+        if warm:
+            threading.Thread(target=self._warm, name="api-browser-warm", daemon=True).start()
+        return self
+
+    def _warm(self) -> None:
+        model = self.model
+        self._watch(model.warm())
+
+    def _paths(self, model: SpecModel) -> list:
+        return [self.path, *model.documents.paths()]
+
+    def _watch(self, model: SpecModel) -> None:
+        watcher = self._watcher
+        # A slow warm-up of an old model mustn't replace the current model's files
+        if watcher is not None and model is self.model:
+            watcher.watch(self._paths(model))
+
+    def stop(self) -> None:
+        if _live_models.get(self.path) is self:
+            del _live_models[self.path]
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _on_change(self, paths: set) -> None:
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep answering from the last version that loaded
+            log.error("Error reloading %s: %s", self.filename, e)
+
+
+def load_model(filename: str, use_cache: bool = True) -> SpecModel:
+    """
+    Return the model of an OpenAPI file.
+
+    The in-memory model is used when the file is being watched by a
+    `LiveModel`, unless `use_cache` is False. Otherwise the file is loaded
+    with `load_spec`.
+    """
+    if use_cache:
+        model = live_model(filename)
+        if model is not None:
+            return model
+    return SpecModel(load_spec(filename, use_cache=use_cache), filename, DocumentCache(use_cache=use_cache))
+
+
+def live_model(filename: str) -> Optional[SpecModel]:
+    """Return the in-memory model of a file watched by a `LiveModel`, or None."""
+    live = _live_models.get(os.path.abspath(filename))
+    return live.model if live is not None else None
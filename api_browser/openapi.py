@@ -1,6 +1,24 @@
+import os
 from typing import Optional
+from urllib.parse import unquote
+
+__all__ = [
+    'is_ref', 'get_with_refs', 'get_schema_name', 'parse_pointer', 'schema_name_from_ref',
+    'ref_name', 'external_ref_path', 'iter_operations', 'SpecIndex', 'RefCycleError', 'HTTP_METHODS',
+]
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+_NOT_FOUND = object()
+
+
+class RefCycleError(ValueError):
+    """Raised when a chain of $refs loops back on itself."""
+
+    def __init__(self, chain):
+        self.chain = list(chain)
+        super().__init__("Circular $ref chain: " + " -> ".join(self.chain))
 
-__all__ = ['is_ref', 'get_with_refs', 'get_schema_name']
 
 def is_ref(value) -> bool:
     """Check if a value is a reference object (has $ref property)."""
@@ -11,12 +29,39 @@ def get_schema_name(schema_ref: Optional[str]) -> str:
     """Extract schema name from $ref or return appropriate placeholder."""
     if not schema_ref:
         return "(none)"
-    if not schema_ref.startswith("#/components/schemas/"):
-        return "(inline)"
-    return schema_ref.split("/")[-1]
+    document, _, fragment = schema_ref.partition("#")
+    # Refs to a whole file are named after the file
+    if fragment.startswith("/components/schemas/") or (document and not fragment):
+        return ref_name(schema_ref)
+    return "(inline)"
+
+
+def ref_name(ref: str) -> str:
+    """Name a $ref by the last segment of its pointer, or by its file if it points to a whole file."""
+    document, _, fragment = ref.partition("#")
+    if fragment.strip("/") or not document:
+        return fragment.split("/")[-1]
+    return os.path.splitext(os.path.basename(document))[0]
 
 
-def get_with_refs(value, path_parts, root=None, default=None):
+def external_ref_path(ref: str, base: Optional[str]) -> Optional[str]:
+    """
+    Return the absolute path of the file a $ref points into, or None for local refs.
+
+    Relative paths are resolved against the directory of `base`, the file
+    the ref appears in, or the working directory without one. Refs to URLs
+    aren't followed and give None too.
+    """
+    if not isinstance(ref, str):
+        return None
+    document = ref.partition("#")[0]
+    if not document or "://" in document:
+        return None
+    directory = os.path.dirname(os.path.abspath(base)) if base else os.getcwd()
+    return os.path.normpath(os.path.join(directory, unquote(document)))
+
+
+def get_with_refs(value, path_parts, root=None, default=None, base=None):
     """
     Get a value from a nested structure, following any $ref references.
     
@@ -25,44 +70,280 @@ def get_with_refs(value, path_parts, root=None, default=None):
         path_parts: List of strings/integers representing the path to follow
         root: The root document for resolving refs (defaults to value if not provided)
         default: Value to return if path is not found (defaults to None)
+        base: Path of the root document's file, to follow refs into other files
     
     Returns:
         The value at the path, dereferenced if it's a ref, or default if not found
+
+    Raises:
+        RefCycleError: If a chain of $refs loops back on itself
     """
     if root is None:
         root = value
-        
-    if not path_parts:
-        # If we hit a ref, resolve it and return the dereferenced value
+    return SpecIndex(root, base=base).get(value, path_parts, default)
+
+
+def parse_pointer(ref: str) -> Optional[tuple]:
+    """
+    Split a local $ref like "#/components/schemas/Pet" into its path parts.
+
+    JSON pointer escapes (~0, ~1) and URI percent-encoding are decoded.
+    Returns None for refs that don't point into the current document.
+    """
+    if not isinstance(ref, str) or not ref.startswith("#"):
+        return None
+    fragment = ref[1:].lstrip("/")
+    if not fragment:
+        return ()
+    return tuple(
+        unquote(part).replace("~1", "/").replace("~0", "~")
+        for part in fragment.split("/")
+    )
+
+
+def schema_name_from_ref(ref: str) -> Optional[str]:
+    """
+    Return the component schema name a local $ref points to, or None for any other ref.
+
+    Schemas in other files can share a name with one in the spec, so
+    `SpecIndex.schema_name` names those.
+    """
+    parts = parse_pointer(ref)
+    if parts is not None and len(parts) == 3 and parts[:2] == ("components", "schemas"):
+        return parts[2]
+    return None
+
+
+def iter_operations(spec: dict, index: "Optional[SpecIndex]" = None, sort: bool = False):
+    """
+    Yield (path, method, operation) for every operation in the document.
+
+    Only the HTTP methods of each path item are operations, not its summary,
+    servers or parameters. With `sort`, paths come in sorted order, and the
+    operations of each path in document order.
+    """
+    index = index or SpecIndex(spec)
+    paths = index.get(spec, ["paths"], default={})
+    for path in (sorted(paths) if sort else paths):
+        path_item = index.deref(paths[path])
+        if not isinstance(path_item, dict):
+            continue
+        for method, operation in path_item.items():
+            if method in HTTP_METHODS and isinstance(operation, dict):
+                yield path, method, operation
+
+
+class SpecIndex:
+    """
+    Index over an OpenAPI document for fast $ref resolution.
+
+    Each $ref is parsed and resolved once and the result is memoized, so
+    looking the same ref up again is a dictionary hit instead of another walk
+    from the document root.
+
+    Refs into other files, like "./common.yaml#/components/schemas/Error",
+    are followed when the index knows the path of its document, `base`. The
+    files come from a `DocumentCache`, which is shared between indexes that
+    pass the same one. The first time such a ref is followed, every file the
+    document refers to is loaded at once.
+    """
+
+    def __init__(self, root, base: Optional[str] = None, documents=None):
+        self.root = root
+        self.base = base
+        self.documents = documents
+        self._root_path = os.path.abspath(base) if base else None
+        self._prefetched = False
+        # (path, fragment) -> name, for the components of other files
+        self._external_names = None
+        self._pointers = {}
+        self._targets = {}
+
+    def pointer(self, ref: str) -> Optional[tuple]:
+        """
+        Return the file and the parsed path parts of a $ref, parsing each ref only once.
+
+        The file is None for the index's own document. Returns None for refs
+        that can't be followed.
+        """
+        location = self._pointers.get(ref, _NOT_FOUND)
+        if location is _NOT_FOUND:
+            location = self._locate(ref)
+            self._pointers[ref] = location
+        return location
+
+    def _locate(self, ref: str) -> Optional[tuple]:
+        if not isinstance(ref, str):
+            return None
+        if ref.startswith("#"):
+            parts = parse_pointer(ref)
+            return None if parts is None else (None, parts)
+        if self.base is None and self.documents is None:
+            return None
+        path = external_ref_path(ref, self.base)
+        if path is None:
+            return None
+        parts = parse_pointer("#" + ref.partition("#")[2])
+        return (None if path == self._root_path else path), parts
+
+    def _document(self, path: Optional[str]):
+        if path is None:
+            return self.root
+        return self._external_documents().get(path)
+
+    def _external_documents(self):
+        if self.documents is None:
+            from .documents import DocumentCache
+            self.documents = DocumentCache()
+        if not self._prefetched:
+            self._prefetched = True
+            self.documents.prefetch(self.root, self.base)
+        return self.documents
+
+    def schema_name(self, ref: str) -> Optional[str]:
+        """
+        Return the name of the component schema a $ref points to, or None for any other ref.
+
+        Schemas of other files go by the name `bundle` gives them in the
+        bundled spec, so two files' "Error" schemas, or one that clashes
+        with a schema in this document, get told apart the same way
+        everywhere.
+        """
+        location = self.pointer(ref)
+        if location is None:
+            return None
+        path, parts = location
+        if parts is None or len(parts) != 3 or parts[:2] != ("components", "schemas"):
+            return None
+        if path is None:
+            return parts[2]
+        if self._external_names is None:
+            from .documents import component_names
+            self._external_names = component_names(self.root, self.base, self._external_documents())
+        return self._external_names.get((path, ref.partition("#")[2]))
+
+    def resolve(self, ref: str, default=None):
+        """
+        Return the value a $ref points to, following chains of refs.
+
+        Raises:
+            RefCycleError: If the chain of refs loops back on itself
+        """
+        if ref not in self._targets:
+            self._resolve_chain(ref)
+        target = self._targets[ref]
+        return default if target is _NOT_FOUND else target
+
+    def _resolve_chain(self, ref: str) -> None:
+        """
+        Resolve `ref` using an explicit stack instead of recursion.
+
+        Whenever a pointer runs into another ref that hasn't been resolved
+        yet, that ref is pushed and resolved first. A ref that is already on
+        the stack means the chain loops. Every ref on the stack ends up with
+        its final target cached, so later lookups through the same chain are
+        dictionary hits.
+        """
+        stack = [ref]
+        on_stack = {ref}
+        while stack:
+            current = stack[-1]
+            pending, target = self._walk_pointer(current)
+            if pending is None:
+                self._targets[current] = target
+                stack.pop()
+                on_stack.discard(current)
+            elif pending in on_stack:
+                raise RefCycleError(stack[stack.index(pending):] + [pending])
+            else:
+                stack.append(pending)
+                on_stack.add(pending)
+
+    def _walk_pointer(self, ref: str):
+        """
+        Walk a pointer from the root using only already-resolved refs.
+
+        Returns (pending_ref, None) if an unresolved ref is in the way, or
+        (None, target) once the walk is complete.
+        """
+        location = self.pointer(ref)
+        if location is None:
+            return None, _NOT_FOUND
+        path, parts = location
+        value = self._document(path)
+        if value is None:
+            return None, _NOT_FOUND
+        for part in parts:
+            if is_ref(value):
+                pending = value["$ref"]
+                if pending not in self._targets:
+                    return pending, None
+                value = self._targets[pending]
+            if isinstance(value, list):
+                try:
+                    value = value[int(part)]
+                except (ValueError, IndexError):
+                    return None, _NOT_FOUND
+            elif isinstance(value, dict):
+                value = value.get(part)
+                if value is None:
+                    return None, _NOT_FOUND
+            else:
+                return None, _NOT_FOUND
         if is_ref(value):
-            ref_path = value["$ref"].lstrip("#/").split("/")
-            return get_with_refs(root, ref_path, root, default)
-        return value
-        
-    current_key = path_parts[0]
-    remaining_path = path_parts[1:]
-    
-    # Handle array indexing
-    if isinstance(value, list):
-        try:
-            if not isinstance(current_key, int):
-                current_key = int(current_key)
-            next_value = value[current_key]
-            return get_with_refs(next_value, remaining_path, root, default)
-        except (ValueError, IndexError):
-            return default
-            
-    # Handle dict access
-    if isinstance(value, dict):
-        # If we hit a ref, resolve it first then continue with the path
+            pending = value["$ref"]
+            if pending not in self._targets:
+                return pending, None
+            value = self._targets[pending]
+        return None, value
+
+    def deref(self, value, default=None):
+        """Return `value`, or the value it points to if it is a reference object."""
         if is_ref(value):
-            ref_path = value["$ref"].lstrip("#/").split("/")
-            resolved_value = get_with_refs(root, ref_path, root, default)
-            return get_with_refs(resolved_value, path_parts, root, default)
-            
-        next_value = value.get(current_key)
-        if next_value is None:
-            return default
-        return get_with_refs(next_value, remaining_path, root, default)
-        
-    return default 
\ No newline at end of file
+            return self.resolve(value["$ref"], default)
+        return value
+
+    def get(self, value, path_parts, default=None):
+        """
+        Iterative equivalent of `get_with_refs` using this index's document as the root.
+
+        Args:
+            value: The value to traverse
+            path_parts: List of strings/integers representing the path to follow
+            default: Value to return if path is not found (defaults to None)
+
+        Returns:
+            The value at the path, dereferenced if it's a ref, or default if not found
+
+        Raises:
+            RefCycleError: If a chain of $refs loops back on itself
+        """
+        for part in path_parts:
+            value = self.deref(value, _NOT_FOUND)
+            if isinstance(value, list):
+                try:
+                    value = value[part if isinstance(part, int) else int(part)]
+                except (ValueError, IndexError):
+                    return default
+            elif isinstance(value, dict):
+                value = value.get(part)
+                if value is None:
+                    return default
+            else:
+                return default
+        value = self.deref(value, _NOT_FOUND)
+        return default if value is _NOT_FOUND else value
+
+    def resolve_all(self) -> dict:
+        """Resolve every $ref in the document up front and return the targets by ref."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                ref = node.get("$ref")
+                if isinstance(ref, str):
+                    self.resolve(ref)
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return {ref: target for ref, target in self._targets.items() if target is not _NOT_FOUND}
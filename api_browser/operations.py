@@ -0,0 +1,190 @@
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+from .openapi import iter_operations, SpecIndex
+
+__all__ = ["OperationIndex", "PathTrie", "PathNode", "split_path"]
+
+
+def split_path(path: str) -> list:
+    """Split a path into its segments, ignoring empty ones."""
+    return [segment for segment in path.split("/") if segment]
+
+
+class PathNode:
+    """
+    A path segment, with the segments that follow it and the paths that end at it.
+
+    Nodes use __slots__ and keep their children in two parallel lists sorted
+    by segment instead of a dict, since large specs have many thousands of
+    them. Children are found by binary search and are always in order, so
+    the tree never needs sorting before it's printed. The lists of paths and
+    operations are only created for the nodes that have some.
+    """
+
+    __slots__ = ("segments", "nodes", "paths", "operations")
+
+    def __init__(self):
+        self.segments = []
+        self.nodes = []
+        self.paths = None
+        self.operations = None
+
+    def child(self, segment: str) -> Optional["PathNode"]:
+        i = bisect_left(self.segments, segment)
+        if i < len(self.segments) and self.segments[i] == segment:
+            return self.nodes[i]
+        return None
+
+    def add_child(self, segment: str) -> "PathNode":
+        """Return the child for `segment`, inserting it in order if it's new."""
+        i = bisect_left(self.segments, segment)
+        if i < len(self.segments) and self.segments[i] == segment:
+            return self.nodes[i]
+        node = PathNode()
+        self.segments.insert(i, segment)
+        self.nodes.insert(i, node)
+        return node
+
+    def add_path(self, path: str) -> None:
+        if self.paths is None:
+            self.paths = []
+        self.paths.append(path)
+
+    def add_operation(self, operation_id: str) -> None:
+        if self.operations is None:
+            self.operations = []
+        self.operations.append(operation_id)
+
+
+class PathTrie:
+    """
+    Paths stored segment by segment.
+
+    The paths under a prefix like /customers are found by walking down to
+    the prefix and collecting its subtree, without looking at the others.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self.root = PathNode()
+        for path in paths:
+            self.insert(path)
+
+    def insert(self, path: str) -> PathNode:
+        """Add a path and return the node for its last segment."""
+        node = self.root
+        for segment in split_path(path):
+            node = node.add_child(segment)
+        node.add_path(path)
+        return node
+
+    def find(self, prefix: str) -> Optional[PathNode]:
+        """Return the node for a path prefix, or None if no path starts with it."""
+        node = self.root
+        for segment in split_path(prefix):
+            node = node.child(segment)
+            if node is None:
+                return None
+        return node
+
+    def paths_under(self, prefix: str) -> Iterator[str]:
+        """Yield every path that starts with the segments of `prefix`, including the prefix itself."""
+        node = self.find(prefix)
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            if node.paths:
+                yield from node.paths
+            stack.extend(node.nodes)
+
+
+class OperationIndex:
+    """
+    Indexes for picking out operations without scanning the whole spec.
+
+    Paths go into a `PathTrie`, and operations are indexed by method, tag
+    and operationId. Building the indexes only reads those fields, so the
+    expensive work for each operation, like resolving its schemas, is left
+    to the caller and only done for the operations that were selected.
+    """
+
+    def __init__(self, spec: dict, index: Optional[SpecIndex] = None):
+        self.index = index or SpecIndex(spec)
+        # (path, method) -> operation, in the order of the document
+        self.operations = {}
+        self.position = {}
+        self.methods = {}
+        self.by_method = {}
+        self.by_tag = {}
+        self.by_operation_id = {}
+        self.trie = PathTrie(self.index.get(spec, ["paths"], default={}))
+
+        for path, method, operation in iter_operations(spec, self.index):
+            key = (path, method)
+            self.position[key] = len(self.operations)
+            self.operations[key] = operation
+            self.methods.setdefault(path, []).append(method)
+            self.by_method.setdefault(method, []).append(key)
+            for tag in self.index.get(operation, ["tags"], default=[]):
+                if isinstance(tag, str):
+                    self.by_tag.setdefault(tag, []).append(key)
+            operation_id = self.index.get(operation, ["operationId"])
+            if isinstance(operation_id, str):
+                self.by_operation_id.setdefault(operation_id, []).append(key)
+
+    def select(
+        self,
+        path_prefix: Optional[str] = None,
+        methods: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        operation_ids: Iterable[str] = (),
+        sort: bool = False,
+    ) -> list:
+        """
+        Return the (path, method) of each operation that matches every given filter.
+
+        Within a filter, any of the values can match. The path prefix matches
+        whole segments, so /customers matches /customers/{id} but not
+        /customers-v2. Only the smallest matching index is walked and the
+        others are checked by lookup, so narrow queries stay fast on big specs.
+
+        Operations are in the order of the document, or ordered by path with
+        `sort`.
+        """
+        groups = []
+        if methods:
+            groups.append(self._union(self.by_method, (method.lower() for method in methods)))
+        if tags:
+            groups.append(self._union(self.by_tag, tags))
+        if operation_ids:
+            groups.append(self._union(self.by_operation_id, operation_ids))
+
+        if groups:
+            groups.sort(key=len)
+            selected = groups[0].intersection(*groups[1:])
+            if path_prefix is not None:
+                prefix = split_path(path_prefix)
+                selected = {key for key in selected if split_path(key[0])[:len(prefix)] == prefix}
+        elif path_prefix is not None:
+            selected = {
+                (path, method)
+                for path in self.trie.paths_under(path_prefix)
+                for method in self.methods.get(path, ())
+            }
+        else:
+            selected = self.operations
+
+        if sort:
+            return sorted(selected, key=lambda key: (key[0], self.position[key]))
+        return sorted(selected, key=self.position.__getitem__)
+
+    def iter_selected(self, keys: Iterable[tuple]) -> Iterator[tuple]:
+        """Yield (path, method, operation) for the keys returned by `select`."""
+        for path, method in keys:
+            yield path, method, self.operations[(path, method)]
+
+    @staticmethod
+    def _union(index: dict, values: Iterable[str]) -> set:
+        keys = set()
+        for value in values:
+            keys.update(index.get(value, ()))
+        return keys
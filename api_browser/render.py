@@ -0,0 +1,143 @@
+from typing import Iterator, Optional
+from .openapi import is_ref, ref_name, SpecIndex
+from .operations import PathNode
+
+__all__ = ["render_schema_tree", "render_url_tree"]
+
+COMPOSITE_TYPES = ("allOf", "anyOf", "oneOf")
+PRIMITIVE_TYPES = ("string", "number", "integer", "boolean")
+COLLAPSED_SUFFIX = " [see above]"
+
+
+def render_schema_tree(
+    schema: dict,
+    index: SpecIndex,
+    max_depth: Optional[int] = None,
+    collapse_repeated: bool = False,
+) -> list:
+    """
+    Render a schema as a tree, returning the lines of output.
+
+    Args:
+        schema: The schema to render
+        index: Index of the document the schema belongs to, used to resolve refs
+        max_depth: Stop rendering below this many levels (defaults to no limit)
+        collapse_repeated: Expand each referenced schema only the first time it
+            appears, and mark later appearances as already shown above
+
+    Returns:
+        The lines of the tree, without trailing newlines
+    """
+    lines = []
+    # Refs being expanded on the current branch, so cycles aren't followed
+    active = set()
+    # Refs expanded anywhere so far, for collapse_repeated
+    expanded = set()
+
+    def label(ref: str) -> str:
+        # Schemas of other files go by the names the schema graph knows them by
+        return index.schema_name(ref) or ref_name(ref)
+
+    def ref_suffix(ref: str) -> str:
+        if collapse_repeated and ref in expanded and ref not in active:
+            return COLLAPSED_SUFFIX
+        return ""
+
+    def expand(ref: str, indent: str, depth: int) -> None:
+        """Render a referenced schema below its line unless that would loop or repeat."""
+        if ref in active or (collapse_repeated and ref in expanded):
+            return
+        ref_schema = index.resolve(ref)
+        if ref_schema:
+            active.add(ref)
+            expanded.add(ref)
+            render(ref_schema, indent, depth)
+            active.discard(ref)
+
+    def render(schema: dict, indent: str, depth: int) -> None:
+        if not isinstance(schema, dict) or (max_depth is not None and depth > max_depth):
+            return
+
+        # Handle allOf, anyOf, oneOf
+        for composite_type in COMPOSITE_TYPES:
+            if composite_type in schema:
+                lines.append(f"{indent}({composite_type})")
+                if max_depth is not None and depth + 1 > max_depth:
+                    return
+                next_indent = indent + "    "
+                for subschema in schema[composite_type]:
+                    if is_ref(subschema):
+                        ref = subschema["$ref"]
+                        lines.append(f"{next_indent}└── ({label(ref)}){ref_suffix(ref)}")
+                        expand(ref, next_indent + "    ", depth + 2)
+                    else:
+                        schema_type = subschema.get("type", "object")
+                        lines.append(f"{next_indent}└── ({schema_type})")
+                        render(subschema, next_indent + "    ", depth + 2)
+                return
+
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", []))
+        last = len(properties) - 1
+
+        for i, (prop_name, prop_schema) in enumerate(properties.items()):
+            prefix = "└── " if i == last else "├── "
+            next_indent = indent + ("    " if i == last else "│   ")
+            line = f"{indent}{prefix}{prop_name}{'*' if prop_name in required else ''}"
+
+            if is_ref(prop_schema):
+                ref = prop_schema["$ref"]
+                lines.append(f"{line} ({label(ref)}){ref_suffix(ref)}")
+                expand(ref, next_indent, depth + 1)
+                continue
+
+            prop_type = prop_schema.get("type", "object")
+            if prop_type == "array":
+                items = prop_schema.get("items", {})
+                if is_ref(items):
+                    ref = items["$ref"]
+                    lines.append(f"{line} (array[{label(ref)}]){ref_suffix(ref)}")
+                    expand(ref, next_indent, depth + 1)
+                else:
+                    item_type = items.get("type", "object")
+                    if item_type in PRIMITIVE_TYPES:
+                        lines.append(f"{line} (array[{item_type}])")
+                    else:
+                        lines.append(f"{line} (array[object])")
+                        render(items, next_indent, depth + 1)
+            elif prop_type in PRIMITIVE_TYPES:
+                lines.append(f"{line} ({prop_type})")
+            else:
+                lines.append(f"{line} (object)")
+                render(prop_schema, next_indent, depth + 1)
+
+    render(schema, "", 1)
+    return lines
+
+
+def render_url_tree(root: PathNode, max_depth: Optional[int] = None) -> Iterator[str]:
+    """
+    Render the segments below a URL trie node as a tree, one line at a time.
+
+    Uses an explicit stack, so paths of any depth can be rendered. Each
+    segment lists the operationIds of the path that ends there.
+
+    Args:
+        root: The node whose children are the first level of the tree
+        max_depth: Stop rendering below this many levels (defaults to no limit)
+    """
+    # (segment, node, indent, is_last, depth), with the next line on top
+    stack = []
+
+    def push_children(node: PathNode, indent: str, depth: int) -> None:
+        last = len(node.segments) - 1
+        for i in range(last, -1, -1):
+            stack.append((node.segments[i], node.nodes[i], indent, i == last, depth))
+
+    push_children(root, "", 1)
+    while stack:
+        segment, node, indent, is_last, depth = stack.pop()
+        operations = f" ({', '.join(sorted(node.operations))})" if node.operations else ""
+        yield f"{indent}{'└── ' if is_last else '├── '}{segment}{operations}"
+        if max_depth is None or depth < max_depth:
+            push_children(node, indent + ("    " if is_last else "│   "), depth + 1)
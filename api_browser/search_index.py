@@ -0,0 +1,210 @@
+import hashlib
+import math
+import os
+import re
+from bisect import bisect_left
+from typing import Iterable, Optional
+from .documents import DocumentCache, fingerprint, fingerprint_matches
+from .instrument import phase
+from .loader import get_cached, set_cached, load_spec
+from .openapi import iter_operations, SpecIndex
+
+__all__ = ["SearchIndex", "load_search_index", "tokenize"]
+
+# Bump this when the layout of SearchIndex changes, so old cached indexes are ignored
+SEARCH_INDEX_VERSION = 2
+# How much a match in each field counts
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "operation_id": 5.0,
+    "path": 3.0,
+    "tag": 3.0,
+    "summary": 2.0,
+    "property": 2.0,
+    "description": 1.0,
+    "method": 1.0,
+}
+# A term that only matches the start of a word counts for this much of a whole-word match
+PREFIX_FACTOR = 0.5
+# A short prefix can match a large part of the vocabulary, so only this many words are tried
+MAX_PREFIX_EXPANSIONS = 200
+
+_WORD = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """
+    Split text into lowercase words for indexing.
+
+    Identifiers are indexed whole and by their camelCase parts, so
+    "listPetOwners" can be found as listpetowners, pet or owners.
+    """
+    tokens = []
+    for word in _WORD.findall(text):
+        tokens.append(word.lower())
+        parts = _CAMEL_PART.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+class SearchIndex:
+    """
+    Inverted index of the operations and component schemas of a spec.
+
+    Each word points to the documents it appears in and the weight of the
+    best field it appears in there, so a query only looks at the documents
+    that contain its terms. The index is plain data, so it can be pickled
+    and cached next to the parsed spec.
+    """
+
+    def __init__(self, documents: list, postings: dict):
+        # (kind, label, detail) for each document
+        self.documents = documents
+        # Word -> {document number: weight}
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, spec: dict, index: Optional[SpecIndex] = None) -> "SearchIndex":
+        index = index or SpecIndex(spec)
+        documents = []
+        postings = {}
+
+        def add(field: str, text) -> None:
+            if not isinstance(text, str):
+                return
+            weight = FIELD_WEIGHTS[field]
+            doc = len(documents) - 1
+            for token in tokenize(text):
+                docs = postings.setdefault(token, {})
+                if docs.get(doc, 0.0) < weight:
+                    docs[doc] = weight
+
+        for path, method, operation in iter_operations(spec, index):
+            operation_id = index.get(operation, ["operationId"], default="")
+            documents.append(("operation", f"{method.upper()} {path}", operation_id if isinstance(operation_id, str) else ""))
+            add("path", path)
+            add("method", method)
+            add("operation_id", operation_id)
+            add("summary", index.get(operation, ["summary"]))
+            add("description", index.get(operation, ["description"]))
+            for tag in index.get(operation, ["tags"], default=[]):
+                add("tag", tag)
+
+        for name, schema in index.get(spec, ["components", "schemas"], default={}).items():
+            documents.append(("schema", name, ""))
+            add("name", name)
+            if isinstance(schema, dict):
+                add("summary", schema.get("title"))
+                add("description", schema.get("description"))
+            for property_name in _property_names(schema):
+                add("property", property_name)
+
+        return cls(documents, postings)
+
+    def search(self, query: str, limit: Optional[int] = 20, kind: Optional[str] = None) -> list:
+        """
+        Return the best matches for `query` as (score, kind, label, detail), best first.
+
+        Every term of the query has to match a document, either as a whole
+        word or as the start of one. Matches are scored by the weight of the
+        field they're in and how rare the word is.
+        """
+        terms = [word.lower() for word in _WORD.findall(query)]
+        if not terms:
+            return []
+        total = len(self.documents)
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token, factor in self._expand(term):
+                docs = self.postings[token]
+                idf = math.log(1 + total / len(docs))
+                for doc, weight in docs.items():
+                    score = weight * idf * factor
+                    if term_scores.get(doc, 0.0) < score:
+                        term_scores[doc] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+            if not scores:
+                return []
+
+        results = []
+        for doc, score in scores.items():
+            document = self.documents[doc]
+            if kind is None or document[0] == kind:
+                results.append((score, *document))
+        results.sort(key=lambda result: (-result[0], result[1], result[2]))
+        return results[:limit] if limit is not None else results
+
+    def _expand(self, term: str) -> Iterable[tuple]:
+        """Yield the words a term matches, with how much each match counts."""
+        i = bisect_left(self.vocabulary, term)
+        expansions = 0
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+            word = self.vocabulary[i]
+            if word == term:
+                yield word, 1.0
+            elif expansions < MAX_PREFIX_EXPANSIONS:
+                expansions += 1
+                yield word, PREFIX_FACTOR
+            else:
+                break
+            i += 1
+
+
+def _property_names(schema) -> list:
+    """Names of the properties anywhere inside a schema, without following $refs."""
+    names = []
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            properties = node.get("properties")
+            if isinstance(properties, dict):
+                names.extend(name for name in properties if isinstance(name, str))
+            stack.extend(value for key, value in node.items() if key != "$ref")
+        elif isinstance(node, list):
+            stack.extend(node)
+    return names
+
+
+def load_search_index(filename: str, use_cache: bool = True) -> SearchIndex:
+    """
+    Return the search index of an OpenAPI file.
+
+    Indexes are cached on disk next to the parsed specs, keyed by the file's
+    contents and checked against the files it refers to, so searching an
+    unchanged file doesn't even parse it. A file
+    kept in memory by a `LiveModel` uses the index of its model.
+    """
+    if not use_cache:
+        spec = load_spec(filename, use_cache=False)
+        return SearchIndex.build(spec, SpecIndex(spec, base=filename, documents=DocumentCache(use_cache=False)))
+
+    from .model import live_model
+    model = live_model(filename)
+    if model is not None:
+        return model.search_index
+
+    with phase("read"), open(os.path.abspath(filename), "rb") as f:
+        digest = hashlib.blake2b(f.read()).hexdigest()
+    key = hashlib.blake2b(
+        f"search\0{SEARCH_INDEX_VERSION}\0{digest}".encode("utf-8"), digest_size=20
+    ).hexdigest()
+    with phase("cache"):
+        cached = get_cached(key)
+    # Stored with the digests of the files the spec refers to, which can change on their own
+    if cached is not None and fingerprint_matches(cached[0]):
+        return cached[1]
+    spec = load_spec(filename)
+    index = SpecIndex(spec, base=filename, documents=DocumentCache())
+    with phase("index"):
+        search_index = SearchIndex.build(spec, index)
+    with phase("cache"):
+        set_cached(key, (fingerprint(index.documents.paths()), search_index))
+    return search_index
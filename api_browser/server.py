@@ -0,0 +1,578 @@
+import flask.cli
+import json
+import logging
+import os
+import sys
+import threading
+import yaml
+from typing import Optional
+from urllib.parse import urlsplit
+from flask import Flask, Response, abort, g, redirect, render_template, request, url_for
+from werkzeug.http import is_resource_modified
+from werkzeug.security import safe_join
+from . import instrument
+from .instrument import phase
+from .operations import split_path
+from .assets import AssetVersion, SpecAsset, SpecRegistry, StaticAsset, ENCODINGS
+from .sources import DEFAULT_REGISTRY_SIZE, DEFAULT_THREADS
+from .events import EventServer, HEARTBEAT_INTERVAL
+from .loader import parse_spec
+from .model import SpecModel
+from .openapi import RefCycleError
+from .render import render_schema_tree
+from .watcher import Broadcaster, FileWatcher
+
+__all__ = ["app", "get_registry", "get_spec_model", "send_asset", "start_live_reload", "make_server", "DEFAULT_THREADS"]
+
+# Static URLs include a hash of the file, so browsers can keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+FINGERPRINT_LENGTH = 12
+
+current_dir = os.path.dirname(__file__)
+template_dir = os.path.abspath(os.path.join(current_dir, "templates"))
+static_dir = os.path.abspath(os.path.join(current_dir, "static"))
+
+# Static files are served by static_asset below instead of Flask's own route
+app = Flask(__name__, template_folder=template_dir, static_folder=None)
+
+# Flask shows some stuff during boot I don't want to show
+# This disables that. We'll improve this later by maybe
+# moving to a different HTTP app.
+log = logging.getLogger("werkzeug")
+log.disabled = True
+flask.cli.show_server_banner = lambda *args: None
+
+logger = logging.getLogger(__name__)
+
+_spec_assets = {}
+_static_assets = {}
+_registries = {}
+reloads = Broadcaster()
+
+
+@app.before_request
+def start_request_timings():
+    if app.config.get("LOG_TIMINGS"):
+        g.timings = instrument.start()
+
+
+@app.after_request
+def log_request_timings(response: Response) -> Response:
+    """Log how long the request took and add a Server-Timing header with its phases."""
+    if g.pop("timings", None) is None:
+        return response
+    timings = instrument.stop()
+    response.headers["Server-Timing"] = timings.server_timing()
+    phases = ", ".join(
+        f"{key} {seconds * 1000:.1f} ms" for key, (seconds, _) in timings.phases.items() if "/" not in key
+    )
+    print(
+        f"{request.method} {request.full_path.rstrip('?')} {response.status_code} "
+        f"{timings.total * 1000:.1f} ms" + (f" ({phases})" if phases else ""),
+        file=sys.stderr,
+    )
+    return response
+
+
+def get_spec_asset() -> SpecAsset:
+    """Return the in-memory copy of the configured OpenAPI file."""
+    filename = os.path.abspath(app.config["OPENAPI_FILENAME"])
+    asset = _spec_assets.get(filename)
+    if asset is None:
+        asset = _spec_assets.setdefault(filename, SpecAsset(filename))
+    return asset
+
+
+def get_registry() -> SpecRegistry:
+    """Return the specs found in the configured directory or glob."""
+    source = app.config["OPENAPI_SOURCE"]
+    registry = _registries.get(source)
+    if registry is None:
+        max_bytes = app.config.get("SPEC_CACHE_SIZE", DEFAULT_REGISTRY_SIZE)
+        registry = _registries.setdefault(source, SpecRegistry(source, max_bytes))
+        registry.scan()
+    return registry
+
+
+def get_static_asset(filename: str) -> Optional[StaticAsset]:
+    """Return a file from the static directory, or None if there isn't one."""
+    asset = _static_assets.get(filename)
+    if asset is None:
+        path = safe_join(static_dir, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        asset = _static_assets.setdefault(filename, StaticAsset(path))
+    return asset
+
+
+@app.template_global()
+def static_url(filename: str) -> str:
+    """URL of a static file, fingerprinted with a hash of its contents."""
+    fingerprint = get_static_asset(filename).current().etag[:FINGERPRINT_LENGTH]
+    return url_for("static_asset", fingerprint=fingerprint, filename=filename)
+
+
+def choose_encoding(version: AssetVersion) -> str:
+    """Pick the best content coding the client accepts and we can produce."""
+    for encoding in ENCODINGS:
+        if request.accept_encodings[encoding] and version.can_encode(encoding):
+            return encoding
+    return "identity"
+
+
+def send_asset(version: AssetVersion, cache_control: str = "no-cache") -> Response:
+    """
+    Send an in-memory asset, honoring conditional requests and Accept-Encoding.
+
+    Each content coding gets its own ETag, and a matching If-None-Match or
+    If-Modified-Since is answered with 304 Not Modified.
+    """
+    encoding = choose_encoding(version)
+    etag = version.etag if encoding == "identity" else f"{version.etag}-{encoding}"
+
+    modified = is_resource_modified(request.environ, etag=etag, last_modified=version.last_modified)
+    response = Response(status=200 if modified else 304, mimetype=version.mimetype)
+    response.set_etag(etag)
+    response.last_modified = version.last_modified
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    if modified:
+        response.set_data(version.encoded(encoding))
+        if encoding != "identity":
+            response.content_encoding = encoding
+    return response
+
+
+def send_spec(asset: SpecAsset, as_json: bool = False) -> Response:
+    """Send a spec as is, or rendered as JSON."""
+    try:
+        version = asset.current()
+        if as_json:
+            try:
+                version = asset.json_version()
+            except Exception:
+                # Let Redoc report the parse error from the original file
+                pass
+    except FileNotFoundError:
+        abort(404)
+    return send_asset(version)
+
+
+def render_documentation(spec_url: str, spec_name: str = None) -> str:
+    return render_template(
+        "redoc.html",
+        spec_url=spec_url,
+        spec_name=spec_name,
+        events_url=events_url(),
+        google_fonts=app.config.get("GOOGLE_FONTS", False),
+    )
+
+
+@app.route("/openapi")
+def read_openapi():
+    return send_spec(get_spec_asset())
+
+
+@app.route("/openapi.json")
+def read_openapi_json():
+    return send_spec(get_spec_asset(), as_json=True)
+
+
+@app.route("/openapi-documentation")
+def openapi_documentation():
+    return render_documentation(url_for("read_openapi_json"))
+
+
+@app.route("/")
+def index():
+    if not app.config.get("OPENAPI_SOURCE"):
+        return redirect(url_for("openapi_documentation"))
+    return render_template("index.html", names=get_registry().scan(), source=app.config["OPENAPI_SOURCE"])
+
+
+def _registry_spec(name: str) -> SpecAsset:
+    asset = get_registry().get(name)
+    if asset is None:
+        abort(404)
+    return asset
+
+
+@app.route("/specs/<path:name>/openapi")
+def read_spec(name):
+    response = send_spec(_registry_spec(name))
+    get_registry().trim()
+    return response
+
+
+@app.route("/specs/<path:name>/openapi.json")
+def read_spec_json(name):
+    response = send_spec(_registry_spec(name), as_json=True)
+    get_registry().trim()
+    return response
+
+
+@app.route("/specs/<path:name>/documentation")
+def spec_documentation(name):
+    _registry_spec(name)
+    return render_documentation(url_for("read_spec_json", name=name), spec_name=name)
+
+
+####### JSON API
+# Answers are computed from the spec model, which is parsed and indexed once
+# per version of the file, and each answer is kept with the model that
+# produced it. A changed file gets a new model, so nothing goes stale.
+
+
+class APIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@app.errorhandler(APIError)
+def send_api_error(error: APIError) -> Response:
+    return Response(json.dumps({"error": error.message}), status=error.status, mimetype="application/json")
+
+
+def get_spec_model() -> SpecModel:
+    """Return the model of the configured OpenAPI file, for the current version of the file."""
+    if not app.config.get("OPENAPI_FILENAME"):
+        raise APIError(404, "The API is only available when serving a single OpenAPI file")
+    try:
+        return get_spec_asset().model()
+    except FileNotFoundError:
+        raise APIError(404, "The OpenAPI file doesn't exist")
+    except (ValueError, yaml.YAMLError) as e:
+        raise APIError(422, f"The OpenAPI file can't be parsed: {e}")
+
+
+def send_api(key: tuple, build) -> Response:
+    """
+    Send `build(model)` as JSON, computing it once per version of the spec.
+
+    The serialized answer is kept with the model, so repeated queries are
+    served from memory with ETags and compression like the spec itself.
+    """
+    model = get_spec_model()
+
+    def make_version() -> AssetVersion:
+        try:
+            body = build(model)
+        except RefCycleError as e:
+            raise APIError(422, str(e))
+        except RecursionError:
+            raise APIError(422, "The spec is nested too deeply to answer this query")
+        with phase("serialize"):
+            data = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return AssetVersion(data, get_spec_asset().current().last_modified.timestamp(), "application/json")
+
+    return send_asset(model.memo(("api", *key), make_version))
+
+
+def query_filters() -> dict:
+    """The operation filters of a query, in the same form as the CLI's filter options."""
+    filters = {
+        "path_prefix": request.args.get("path_prefix") or request.args.get("prefix"),
+        "methods": tuple(method.lower() for method in request.args.getlist("method")),
+        "tags": tuple(request.args.getlist("tag")),
+        "operation_ids": tuple(request.args.getlist("operation_id")),
+    }
+    return {name: value for name, value in filters.items() if value}
+
+
+def query_int(name: str) -> Optional[int]:
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise APIError(400, f"{name} must be a positive integer")
+    return number
+
+
+def query_flag(name: str, default: bool) -> bool:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ("0", "false", "no", "off")
+
+
+@app.route("/api/summary")
+def api_summary():
+    """Every operation, with the same fields as `summary --format json`."""
+    from . import SUMMARY_FIELDS, filters_key, iter_summary_rows
+
+    filters = query_filters()
+    sort = query_flag("sort", True)
+
+    def build(model):
+        info = model.index.get(model.spec, ["info"], default={})
+        with phase("resolve"):
+            operations = [dict(zip(SUMMARY_FIELDS, row)) for row in iter_summary_rows(model, sort, filters)]
+        return {
+            "title": model.index.get(info, ["title"], default=None),
+            "description": model.index.get(info, ["description"], default=None),
+            "operations": operations,
+        }
+
+    return send_api(("summary", sort, filters_key(filters)), build)
+
+
+def schema_usage(model: SpecModel, name: str) -> dict:
+    graph = model.graph
+    return {
+        "name": name,
+        "referenced_by": graph.referencing_schemas(name),
+        "requests": graph.request_operations(name),
+        "responses": graph.response_operations(name),
+    }
+
+
+@app.route("/api/schemas")
+def api_schemas():
+    """Every component schema, with the schemas and operations that use it."""
+    def build(model):
+        return {"schemas": [schema_usage(model, name) for name in model.graph.schemas]}
+
+    return send_api(("schemas",), build)
+
+
+@app.route("/api/schemas/<path:name>")
+def api_schema(name):
+    """One schema's usage and its tree as rendered by `schema`."""
+    max_depth = query_int("max_depth")
+    collapse_repeated = query_flag("collapse_repeated", False)
+
+    def build(model):
+        schema = model.graph.schemas.get(name)
+        if schema is None:
+            raise APIError(404, f"Schema '{name}' not found")
+        with phase("render"):
+            tree = render_schema_tree(schema, model.index, max_depth, collapse_repeated)
+        return {**schema_usage(model, name), "tree": tree}
+
+    return send_api(("schema", name, max_depth, collapse_repeated), build)
+
+
+@app.route("/api/urls")
+def api_urls():
+    """
+    The tree of path segments shown by `urls`, as nested objects.
+
+    Takes the same filters as /api/summary, and depth to stop after some
+    levels. With a path prefix, the tree starts at the prefix.
+    """
+    from . import build_url_tree, filters_key
+
+    filters = query_filters()
+    depth = query_int("depth")
+
+    def build(model):
+        tree = build_url_tree(model, filters)
+        prefix = filters.get("path_prefix")
+        root = tree.find(prefix) if prefix is not None else tree.root
+        if root is None:
+            return {"path": prefix, "operations": [], "children": []}
+        return url_tree_json(root, "/" + "/".join(split_path(prefix or "")), depth)
+
+    return send_api(("urls", depth, filters_key(filters)), build)
+
+
+def url_tree_json(root, path: str, max_depth: Optional[int] = None) -> dict:
+    """Convert a URL trie node and what's below it to nested dicts, without recursion."""
+    top = {"path": path, "operations": sorted(root.operations or ()), "children": []}
+    stack = [(root, top, path.rstrip("/"), 1)]
+    while stack:
+        node, out, prefix, depth = stack.pop()
+        if max_depth is not None and depth > max_depth:
+            continue
+        for segment, child in zip(node.segments, node.nodes):
+            child_path = f"{prefix}/{segment}"
+            child_out = {
+                "segment": segment,
+                "path": child_path,
+                "operations": sorted(child.operations or ()),
+                "children": [],
+            }
+            out["children"].append(child_out)
+            stack.append((child, child_out, child_path, depth + 1))
+    return top
+
+
+@app.route("/assets/<fingerprint>/<path:filename>")
+def static_asset(fingerprint, filename):
+    asset = get_static_asset(filename)
+    if asset is None:
+        abort(404)
+    version = asset.current()
+    if fingerprint != version.etag[:FINGERPRINT_LENGTH]:
+        # A page rendered before the file changed. Send the current file, but
+        # don't let it be cached under the old URL.
+        return send_asset(version)
+    return send_asset(version, cache_control=IMMUTABLE)
+
+
+def events_url() -> Optional[str]:
+    """
+    URL of the event stream that tells open pages when to reload, or None without live reload.
+
+    The stream is served by the app itself, unless an `EventServer` was
+    started for it on a port of its own. That one only speaks plain HTTP,
+    at the same host name the page was loaded from.
+    """
+    port = app.config.get("EVENTS_PORT")
+    if port is None:
+        return url_for("events") if app.config.get("LIVE_RELOAD") else None
+    hostname = urlsplit(request.host_url).hostname
+    if not hostname:
+        return None
+    if ":" in hostname:
+        hostname = f"[{hostname}]"
+    return f"http://{hostname}:{port}/events"
+
+
+@app.route("/events")
+def events():
+    """Server-sent events stream that tells open pages when to reload."""
+    if not app.config.get("LIVE_RELOAD"):
+        abort(404)
+
+    def stream():
+        version = reloads.version
+        yield "retry: 1000\n\n"
+        while True:
+            new_version, data = reloads.wait(version, HEARTBEAT_INTERVAL)
+            if new_version == version:
+                yield ": heartbeat\n\n"
+                continue
+            version = new_version
+            yield f"event: reload\ndata: {data or ''}\n\n"
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _reload_changed_specs(paths: set) -> None:
+    """Tell open pages to reload the changed files that parse again."""
+    names = []
+    for path in sorted(paths):
+        try:
+            with open(path, "rb") as f:
+                parse_spec(f.read(), path)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            logger.warning("Not reloading %s: %s", path, e)
+            continue
+        name = get_registry().name_for(path) if app.config.get("OPENAPI_SOURCE") else None
+        names.append(name or os.path.basename(path))
+    if names:
+        reloads.publish(",".join(names))
+
+
+def start_live_reload(paths, host: str = "127.0.0.1", events_port: Optional[int] = None) -> FileWatcher:
+    """
+    Watch the spec files and push reload events to open documentation pages.
+
+    Pages get the events from the app's own /events stream, which holds a
+    server thread per open page. The development server starts a thread
+    for each connection, so that's fine there. With a fixed pool of worker
+    threads, pass `events_port` to serve the streams from an `EventServer`
+    listening on `host` and that port (0 for any free port) instead.
+
+    When serving a directory or glob, specs the registry finds later are
+    watched too, and removed ones aren't anymore.
+    """
+    if events_port is None:
+        app.config["LIVE_RELOAD"] = True
+    else:
+        event_server = EventServer(reloads, host, events_port)
+        event_server.start()
+        app.config["EVENTS_PORT"] = event_server.port
+    watcher = FileWatcher(paths, _reload_changed_specs)
+    if app.config.get("OPENAPI_SOURCE"):
+        get_registry().on_change = watcher.watch
+    watcher.start()
+    return watcher
+
+
+class Server:
+    """A WSGI server that is already bound to its socket and ready for connections."""
+
+    def __init__(self, server, host: str, port: int, serve, shutdown):
+        self.server = server
+        self.host = host
+        self.port = port
+        self._serve = serve
+        self._shutdown = shutdown
+
+    @property
+    def url(self) -> str:
+        """Base URL to reach the server from this machine."""
+        host = {"0.0.0.0": "127.0.0.1", "::": "::1", "": "127.0.0.1"}.get(self.host, self.host)
+        if ":" in host:
+            host = f"[{host}]"
+        return f"http://{host}:{self.port}"
+
+    def serve_forever(self) -> None:
+        self._serve()
+
+    def shutdown(self) -> None:
+        self._shutdown()
+
+
+def _waitress_controls(server) -> tuple:
+    """Functions to run and shut down a waitress server, from any thread."""
+    from waitress import wasyncore
+
+    running = threading.Event()
+
+    def serve():
+        running.set()
+        try:
+            server.run()
+        finally:
+            running.clear()
+
+    def shutdown():
+        if running.is_set():
+            # The serving thread is still selecting on the sockets, so it has to close them itself
+            server.trigger.pull_trigger(lambda: wasyncore.close_all(server._map))
+        else:
+            server.close()
+        server.task_dispatcher.shutdown()
+
+    return serve, shutdown
+
+
+def make_server(host: str, port: int, production: bool = False, threads: int = DEFAULT_THREADS) -> Server:
+    """
+    Create a server for the app and bind it to `host` and `port`.
+
+    The socket is listening by the time this returns, so clients can connect
+    right away; they're served once `serve_forever` is called. Pass port 0 to
+    pick any free port.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+        production: Use waitress, a multi-threaded production WSGI server,
+            instead of the Werkzeug development server
+        threads: Number of worker threads for the production server
+    """
+    if production:
+        try:
+            from waitress import create_server
+        except ImportError:
+            raise RuntimeError("The production server needs waitress. Install it with: pip install 'api-browser[server]'")
+        server = create_server(app, host=host, port=port, threads=threads, ident="api-browser")
+        return Server(server, server.effective_host, server.effective_port, *_waitress_controls(server))
+
+    from werkzeug.serving import make_server as make_dev_server
+    server = make_dev_server(host, port, app, threaded=True)
+    return Server(server, host, server.server_port, server.serve_forever, server.server_close)
@@ -0,0 +1,100 @@
+import cmd
+import shlex
+import sys
+import click
+from .model import LiveModel
+
+__all__ = ["SpecShell"]
+
+
+class SpecShell(cmd.Cmd):
+    """
+    Interactive prompt that answers queries about one spec from memory.
+
+    Each query runs the CLI command of the same name on the shell's file,
+    with the same options and the same output. The commands get the spec
+    from the `LiveModel`, which keeps it parsed and indexed between queries
+    and reloads it in the background when the file changes.
+    """
+
+    def __init__(self, live: LiveModel, commands: dict, **kwargs):
+        super().__init__(**kwargs)
+        self.live = live
+        self.commands = commands
+        self.interactive = sys.stdin.isatty()
+        self.prompt = "api> " if self.interactive else ""
+        if self.interactive:
+            self.intro = (
+                f"Exploring {live.filename}. Commands: {', '.join(commands)}. "
+                "Type help COMMAND for its options, exit to quit."
+            )
+
+    def default(self, line: str) -> None:
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return
+        name, args = args[0], args[1:]
+        if name == "validate" and not args:
+            self.validate()
+        elif name in self.commands:
+            self.run(name, args)
+        else:
+            click.echo(f"Unknown command '{name}'. Commands: {', '.join(self.commands)}", err=True)
+
+    def run(self, name: str, args: list) -> None:
+        """Run a CLI command on the shell's file, reporting errors without leaving the shell."""
+        command = self.commands[name]
+        try:
+            command.main([self.live.filename, *args], prog_name=name, standalone_mode=False)
+        except click.ClickException as e:
+            e.show()
+        except (click.exceptions.Exit, click.exceptions.Abort, SystemExit):
+            # Commands exit with a status after they've reported a failure
+            pass
+
+    def validate(self) -> None:
+        """Validate the spec, remembering the outcome for as long as the file doesn't change."""
+        from .documents import bundle
+        from .validation import validate_spec
+
+        def check():
+            try:
+                validate_spec(bundle(model.spec, model.filename, model.documents)[0])
+            except Exception as e:
+                return e
+            return None
+
+        model = self.live.model
+        error = model.memo("validation", check)
+        if error is None:
+            click.echo("✓ OpenAPI specification is valid")
+        else:
+            click.echo(error, err=True)
+
+    def do_help(self, arg: str) -> None:
+        """Show the commands, or the options of one command."""
+        if arg in self.commands:
+            self.run(arg, ["--help"])
+        else:
+            click.echo(f"Commands: {', '.join(self.commands)}, exit")
+            click.echo("Type help COMMAND for its options. The file argument is left out.")
+
+    def do_exit(self, arg: str) -> bool:
+        """Leave the shell."""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg: str) -> bool:
+        if self.interactive:
+            click.echo()
+        return True
+
+    def emptyline(self) -> None:
+        # Don't repeat the last command
+        pass
+
+    def completenames(self, text: str, *ignored) -> list:
+        return [name for name in [*self.commands, "help", "exit"] if name.startswith(text)]
@@ -0,0 +1,42 @@
+import glob
+import os
+
+__all__ = ["discover_specs", "is_spec_collection", "SPEC_EXTENSIONS", "DEFAULT_REGISTRY_SIZE", "DEFAULT_THREADS"]
+
+# Everything the CLI needs before it knows what to serve lives here, away
+# from assets.py and server.py, so `--help` doesn't import Flask or brotli.
+SPEC_EXTENSIONS = (".yaml", ".yml", ".json")
+DEFAULT_REGISTRY_SIZE = 256 * 1024 * 1024
+# Worker threads for the production server. Live reload streams are served by
+# the EventServer instead, so these only handle short requests.
+DEFAULT_THREADS = 32
+
+
+def is_spec_collection(source: str) -> bool:
+    """Check if `source` names several specs, as a directory or a glob pattern."""
+    return os.path.isdir(source) or glob.has_magic(source)
+
+
+def discover_specs(source: str) -> dict:
+    """
+    Find the OpenAPI files in a directory or matching a glob pattern.
+
+    Returns:
+        A mapping of spec name to absolute path. Names are paths relative to
+        the directory (or the fixed part of the pattern), without extension.
+    """
+    if os.path.isdir(source):
+        base = source
+        paths = [entry.path for entry in os.scandir(source) if entry.is_file()]
+    else:
+        base = source
+        while glob.has_magic(base):
+            base = os.path.dirname(base)
+        paths = [path for path in glob.glob(source, recursive=True) if os.path.isfile(path)]
+
+    specs = {}
+    for path in sorted(paths):
+        stem, extension = os.path.splitext(os.path.relpath(path, base or "."))
+        if extension.lower() in SPEC_EXTENSIONS:
+            specs.setdefault(stem.replace(os.sep, "/"), os.path.abspath(path))
+    return specs
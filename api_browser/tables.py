@@ -0,0 +1,50 @@
+import csv
+import json
+from typing import IO, Sequence
+
+__all__ = ["TableWriter", "STREAMING_FORMATS"]
+
+# Formats that TableWriter writes row by row, without holding the table in memory
+STREAMING_FORMATS = ("csv", "tsv", "jsonl", "json")
+
+
+class TableWriter:
+    """
+    Write rows to a stream as CSV, TSV, JSON Lines or a JSON array as they arrive.
+
+    CSV and TSV start with a header row. JSON formats write each row as an
+    object keyed by `fields`. Call `close` after the last row to finish the
+    JSON array.
+    """
+
+    def __init__(self, stream: IO[str], fields: Sequence[str], output_format: str):
+        if output_format not in STREAMING_FORMATS:
+            raise ValueError(f"Unsupported table format: {output_format}")
+        self.stream = stream
+        self.fields = list(fields)
+        self.output_format = output_format
+        self.rows = 0
+        self._csv = None
+        if output_format in ("csv", "tsv"):
+            delimiter = "\t" if output_format == "tsv" else ","
+            self._csv = csv.writer(stream, delimiter=delimiter, lineterminator="\n")
+            self._csv.writerow(self.fields)
+        elif output_format == "json":
+            stream.write("[")
+
+    def write(self, row: Sequence) -> None:
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            record = json.dumps(dict(zip(self.fields, row)), ensure_ascii=False)
+            if self.output_format == "json":
+                record = ("\n  " if self.rows == 0 else ",\n  ") + record
+            else:
+                record += "\n"
+            self.stream.write(record)
+        self.rows += 1
+
+    def close(self) -> None:
+        if self.output_format == "json":
+            self.stream.write("\n]\n" if self.rows else "]\n")
+        self.stream.flush()
@@ -0,0 +1,282 @@
+import hashlib
+import itertools
+import json
+import os
+from typing import Iterator, Optional
+from .documents import bundle, DocumentCache, fingerprint, fingerprint_matches
+from .graph import SchemaGraph
+from .instrument import phase
+from .loader import get_cached, set_cached, load_spec
+
+__all__ = [
+    "validate_file",
+    "validate_spec",
+    "iter_file_errors",
+    "iter_spec_errors",
+    "error_record",
+    "validator_version",
+]
+
+# Bump this when the meaning of cached validation results changes
+VALIDATION_CACHE_VERSION = 2
+# Messages can quote whole objects, so records cut them off after this many characters
+MAX_MESSAGE_LENGTH = 300
+
+_validator_version = None
+
+
+def validator_version() -> str:
+    """Version of openapi-spec-validator, which is part of every cache key."""
+    global _validator_version
+    if _validator_version is None:
+        try:
+            from importlib.metadata import version
+            _validator_version = version("openapi-spec-validator")
+        except Exception:
+            import openapi_spec_validator
+            _validator_version = getattr(openapi_spec_validator, "__version__", "unknown")
+    return _validator_version
+
+
+def validate_file(filename: str, use_cache: bool = True, incremental: bool = False) -> str:
+    """
+    Validate an OpenAPI file, skipping the work if it's known to be valid.
+
+    Only successful results are cached, so invalid files always show their
+    errors. A file whose exact bytes were valid before is accepted without
+    even being parsed, as long as the files it refers to haven't changed
+    either. Those files are bundled into the spec before it's validated.
+
+    Args:
+        filename: Path to the OpenAPI file
+        use_cache: Set to False to parse and validate from scratch
+        incremental: Only re-check the component schemas that changed since
+            the file last validated, see `validate_spec`
+
+    Returns:
+        "cached", "partial" or "full", for how much was validated
+
+    Raises:
+        The validator's exception if the file is invalid
+    """
+    if not use_cache:
+        validate_spec(_load_bundled(filename, use_cache=False)[0], use_cache=False)
+        return "full"
+
+    raw_key = _raw_key(filename)
+    if _known_valid(raw_key):
+        return "cached"
+
+    spec, paths = _load_bundled(filename)
+    result = validate_spec(spec, incremental=incremental)
+    set_cached(raw_key, fingerprint(paths) or True)
+    return result
+
+
+def iter_file_errors(filename: str, use_cache: bool = True, max_errors: Optional[int] = None) -> Iterator[dict]:
+    """
+    Validate an OpenAPI file and yield each error as soon as it's found.
+
+    Errors are compact records, see `error_record`. Stop iterating, or pass
+    `max_errors`, to stop validating early. A file is only recorded as valid
+    in the cache once every error has been looked for and none was found.
+    """
+    if not use_cache:
+        yield from iter_spec_errors(_load_bundled(filename, use_cache=False)[0], max_errors)
+        return
+
+    raw_key = _raw_key(filename)
+    if _known_valid(raw_key):
+        return
+    spec, paths = _load_bundled(filename)
+    spec_key = _key("spec", _hash(spec))
+    if not get_cached(spec_key):
+        valid = True
+        for record in iter_spec_errors(spec, max_errors):
+            valid = False
+            yield record
+        if not valid:
+            return
+        set_cached(spec_key, True)
+    set_cached(raw_key, fingerprint(paths) or True)
+
+
+def _load_bundled(filename: str, use_cache: bool = True) -> tuple:
+    """Load a spec with the files it refers to bundled in, and the paths of those files."""
+    return bundle(load_spec(filename, use_cache=use_cache), filename, DocumentCache(use_cache=use_cache))
+
+
+def _known_valid(raw_key: str) -> bool:
+    # True for a file on its own, or the digests of the files it referred to
+    cached = get_cached(raw_key)
+    return cached is True or bool(cached) and fingerprint_matches(cached)
+
+
+def iter_spec_errors(spec: dict, max_errors: Optional[int] = None) -> Iterator[dict]:
+    """
+    Yield the validation errors of a parsed OpenAPI document as they're found.
+
+    The validator works lazily, so taking only the first few errors of a
+    badly broken document is much faster than collecting all of them.
+    """
+    from openapi_spec_validator.shortcuts import get_validator_cls
+
+    try:
+        validator_cls = get_validator_cls(spec)
+    except Exception:
+        yield {"pointer": "", "rule": "openapi", "message": "Can't tell the OpenAPI version; 'openapi' or 'swagger' is missing"}
+        return
+    errors = map(error_record, validator_cls(spec).iter_errors())
+    yield from itertools.islice(errors, max_errors)
+
+
+def error_record(error: Exception) -> dict:
+    """
+    Turn a validator error into a small record with its location, rule and message.
+
+    Unlike the error's string form, which includes the whole schema that
+    failed, records fit on one line.
+    """
+    path = getattr(error, "absolute_path", None) or ()
+    pointer = "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in path)
+    rule = getattr(error, "validator", None)
+    if not isinstance(rule, str):
+        rule = type(error).__name__
+    message = " ".join((getattr(error, "message", None) or str(error)).split())
+    if len(message) > MAX_MESSAGE_LENGTH:
+        message = message[:MAX_MESSAGE_LENGTH - 3] + "..."
+    return {"pointer": pointer, "rule": rule, "message": message}
+
+
+def validate_spec(spec: dict, use_cache: bool = True, incremental: bool = False) -> str:
+    """
+    Validate a parsed OpenAPI document, caching successful results.
+
+    Results are keyed on a hash of the normalized document and the validator
+    version, so formatting changes and YAML/JSON conversions still hit.
+
+    With `incremental`, the hash of each component schema is recorded too.
+    When only schemas changed since the last valid version, the schemas that
+    didn't change and don't depend on or feed into a changed schema are
+    replaced by empty schemas before validating, so only the changed part
+    is checked again. Added and removed schemas count as changes, so the
+    schemas that still refer to a removed one are checked. Errors are
+    always reported against the whole document.
+
+    Returns:
+        "cached", "partial" or "full", for how much was validated
+
+    Raises:
+        The validator's exception if the document is invalid
+    """
+    if not use_cache:
+        _validate(spec)
+        return "full"
+
+    with phase("hash"):
+        spec_key = _key("spec", _hash(spec))
+    if get_cached(spec_key):
+        return "cached"
+
+    if not incremental:
+        _validate(spec)
+        set_cached(spec_key, True)
+        return "full"
+
+    schemas = _component_schemas(spec)
+    # The rest of the document is stored with the schemas it was valid with
+    with phase("hash"):
+        skeleton_key = _key("skeleton", _hash(_without_schemas(spec)))
+        schema_keys = {name: _key("schema", name, _hash(schema)) for name, schema in schemas.items()}
+
+    result = "full"
+    # Schema name -> key of the version that was valid
+    known = get_cached(skeleton_key)
+    if known is not None:
+        changed = [name for name, key in schema_keys.items() if known.get(name) != key]
+        changed.extend(name for name in known if name not in schema_keys)
+        keep = _schemas_to_check(spec, changed)
+        if len(keep.intersection(schemas)) < len(schemas):
+            result = "partial"
+        try:
+            _validate(_replace_schemas(spec, {name: {} for name in schemas if name not in keep}))
+        except Exception:
+            # Report the error against the document as written, not the one with schemas blanked
+            _validate(spec)
+            result = "full"
+    else:
+        _validate(spec)
+
+    set_cached(spec_key, True)
+    set_cached(skeleton_key, schema_keys)
+    return result
+
+
+def _validate(spec: dict) -> None:
+    from openapi_spec_validator import validate
+
+    with phase("validate"):
+        validate(spec)
+
+
+def _schemas_to_check(spec: dict, changed: list) -> set:
+    """
+    Changed schemas, the schemas that refer to them, and everything those refer to.
+
+    `changed` can include removed schemas, which aren't in the spec but are
+    still found through the refs to them.
+    """
+    if not changed:
+        return set()
+    graph = SchemaGraph(spec)
+    roots = set(changed)
+    for name in changed:
+        roots.update(graph.impact(name)[0])
+
+    keep = set()
+    stack = list(roots)
+    while stack:
+        name = stack.pop()
+        if name in keep:
+            continue
+        keep.add(name)
+        stack.extend(graph.references.get(name, ()))
+    return keep
+
+
+def _component_schemas(spec: dict) -> dict:
+    components = spec.get("components") if isinstance(spec, dict) else None
+    schemas = components.get("schemas") if isinstance(components, dict) else None
+    return schemas if isinstance(schemas, dict) else {}
+
+
+def _replace_schemas(spec: dict, replacements: dict) -> dict:
+    """Copy the document with some component schemas swapped out."""
+    schemas = _component_schemas(spec)
+    if not replacements:
+        return spec
+    new_schemas = {name: replacements.get(name, schema) for name, schema in schemas.items()}
+    return {**spec, "components": {**spec["components"], "schemas": new_schemas}}
+
+
+def _without_schemas(spec: dict) -> dict:
+    """The part of the document outside of components.schemas."""
+    if not _component_schemas(spec):
+        return spec
+    return {**spec, "components": {**spec["components"], "schemas": {}}}
+
+
+def _hash(value) -> str:
+    """Hash a document independently of key order and formatting."""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(data.encode("utf-8")).hexdigest()
+
+
+def _raw_key(filename: str) -> str:
+    with open(os.path.abspath(filename), "rb") as f:
+        return _key("raw", hashlib.blake2b(f.read()).hexdigest())
+
+
+def _key(*parts: str) -> str:
+    key = "\0".join(("validation", str(VALIDATION_CACHE_VERSION), validator_version(), *parts))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=20).hexdigest()
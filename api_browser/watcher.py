@@ -0,0 +1,210 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Iterable
+
+__all__ = ["FileWatcher", "Broadcaster"]
+
+log = logging.getLogger(__name__)
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileWatcher(threading.Thread):
+    """
+    Watch files and call `on_change` with the changed paths once writes settle.
+
+    Uses inotify on Linux and falls back to polling mtimes elsewhere. The
+    parent directories are watched rather than the files themselves, because
+    most editors save by writing a new file and renaming it over the old one.
+    Changes are debounced so a burst of writes triggers a single callback.
+    Call `watch` to swap in a different set of files while it runs.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        on_change: Callable[[set], None],
+        debounce: float = 0.2,
+        poll_interval: float = 0.5,
+    ):
+        super().__init__(name="api-browser-watcher", daemon=True)
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self._paths_changed = False
+        self._lock = threading.Lock()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def watch(self, paths: Iterable[str]) -> None:
+        """Watch these files instead from now on, picked up within `poll_interval`."""
+        paths = {os.path.abspath(path) for path in paths}
+        with self._lock:
+            if paths != self.paths:
+                self.paths = paths
+                self._paths_changed = True
+
+    def _open_source(self):
+        with self._lock:
+            paths = set(self.paths)
+            self._paths_changed = False
+        try:
+            return _InotifySource(paths)
+        except OSError:
+            return _PollingSource(paths, self.poll_interval)
+
+    def run(self) -> None:
+        source = self._open_source()
+        try:
+            while not self._stopped.is_set():
+                if self._paths_changed:
+                    source.close()
+                    source = self._open_source()
+                changed = source.wait(self.poll_interval)
+                if not changed:
+                    continue
+                # Keep collecting until the file has been quiet for a moment
+                while True:
+                    more = source.wait(self.debounce)
+                    if not more:
+                        break
+                    changed |= more
+                try:
+                    self.on_change(changed)
+                except Exception:
+                    log.exception("Error handling file change")
+        finally:
+            source.close()
+
+
+class _PollingSource:
+    """Detect changes by comparing each file's mtime and size."""
+
+    def __init__(self, paths: set, interval: float):
+        self.paths = paths
+        self.interval = interval
+        self._stats = {path: self._stat(path) for path in paths}
+
+    @staticmethod
+    def _stat(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wait(self, timeout: float) -> set:
+        time.sleep(min(timeout, self.interval))
+        changed = set()
+        for path in self.paths:
+            stat = self._stat(path)
+            if stat != self._stats[path]:
+                self._stats[path] = stat
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifySource:
+    """Detect changes with Linux inotify watches on the files' directories."""
+
+    def __init__(self, paths: set):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories = {}
+        try:
+            for directory in {os.path.dirname(path) for path in paths}:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"Can't watch {directory}")
+                self._directories[wd] = directory
+        except OSError:
+            os.close(self.fd)
+            raise
+        self.paths = paths
+
+    def wait(self, timeout: float) -> set:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        buffer = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0")
+            offset += length
+            directory = self._directories.get(wd)
+            if directory is not None and name:
+                path = os.path.join(directory, os.fsdecode(name))
+                if path in self.paths:
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Broadcaster:
+    """
+    Fan events out to any number of listeners.
+
+    Threads can block on a shared condition until the version changes, and
+    subscribers are called after each event, so a listener with its own
+    loop, like the `EventServer`, can be woken up without a thread waiting.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._subscribers = []
+        self.version = 0
+        self.data = None
+
+    def publish(self, data=None) -> None:
+        with self._condition:
+            self.version += 1
+            self.data = data
+            self._condition.notify_all()
+        for callback in list(self._subscribers):
+            callback()
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Call `callback` after every event. It should return quickly."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def wait(self, seen_version: int, timeout: float):
+        """Wait until there's an event newer than `seen_version`, returning (version, data)."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != seen_version, timeout)
+            return self.version, self.data
@@ -0,0 +1,45 @@
+"""
+Benchmark schema tree rendering on a diamond-shaped schema graph.
+
+Every schema in layer N refers to both schemas in layer N + 1, so fully
+expanding the first schema visits 2 ** layers paths. --collapse-repeated
+and --max-depth keep the output linear.
+
+Usage:
+    python benchmarks/bench_schema_tree.py [--layers 16]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from generate_spec import diamond_spec  # noqa: E402
+from api_browser.openapi import SpecIndex  # noqa: E402
+from api_browser.render import render_schema_tree  # noqa: E402
+
+
+def run(label: str, spec: dict, **kwargs) -> None:
+    index = SpecIndex(spec)
+    start = time.perf_counter()
+    lines = render_schema_tree(spec["components"]["schemas"]["L0A"], index, **kwargs)
+    output = "\n".join(lines)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed * 1000:>10.1f} ms {len(lines):>12,} lines {len(output):>14,} bytes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--layers", type=int, default=16, help="Number of diamond layers (default: 16)")
+    args = parser.parse_args()
+
+    spec = diamond_spec(args.layers)
+    print(f"Diamond schema graph with {args.layers} layers")
+    run("full expansion", spec)
+    run("--max-depth 8", spec, max_depth=8)
+    run("--collapse-repeated", spec, collapse_repeated=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Time every command on generated specs and compare against a baseline.
+
+For each spec size, runs summary, schema --all, urls and validate (with
+--no-cache, so the work is really done), resolves every operation's
+response schema with get_with_refs, and requests /openapi and
+/openapi.json from the server. Each case is timed as the best of several
+runs and then run once more under tracemalloc to record peak memory.
+The routes are timed once the spec is in the server's memory, as it is
+for every request after the first.
+
+With --baseline, exits with status 1 when a case is slower, or uses more
+memory, than the baseline by more than --threshold. Baselines are only
+comparable on the machine that recorded them, so record one with
+--save-baseline before making changes.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes small,medium] [--save-baseline baseline.json]
+    python benchmarks/bench_suite.py --baseline baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from generate_spec import SIZES, generate_spec, write_spec  # noqa: E402
+from api_browser import app, schema, summary, urls, validate_cmd  # noqa: E402
+from api_browser.loader import load_spec  # noqa: E402
+from api_browser.openapi import HTTP_METHODS, get_with_refs  # noqa: E402
+
+# Differences smaller than this are noise, whatever the threshold says
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1024 * 1024
+
+
+def command_case(command, *args):
+    runner = CliRunner()
+
+    def run(filename):
+        result = runner.invoke(command, [filename, *args, "--no-cache"])
+        if result.exit_code != 0:
+            raise RuntimeError(f"{command.name} failed: {result.output or result.exception}")
+    return run
+
+
+def get_with_refs_case(filename):
+    spec = load_spec(filename, use_cache=False)
+    for path, path_item in spec["paths"].items():
+        for method in HTTP_METHODS:
+            if method in path_item:
+                get_with_refs(
+                    spec,
+                    ["paths", path, method, "responses", "200", "content", "application/json", "schema"],
+                )
+
+
+def route_case(route):
+    client = app.test_client()
+
+    def run(filename):
+        app.config["OPENAPI_FILENAME"] = filename
+        response = client.get(route, headers={"Accept-Encoding": "gzip"})
+        if response.status_code != 200:
+            raise RuntimeError(f"{route} returned {response.status_code}")
+    return run
+
+
+CASES = {
+    "summary": command_case(summary),
+    "schema --all": command_case(schema, "--all"),
+    "urls": command_case(urls),
+    "validate": command_case(validate_cmd),
+    "get_with_refs": get_with_refs_case,
+    "GET /openapi": route_case("/openapi"),
+    "GET /openapi.json": route_case("/openapi.json"),
+}
+
+
+def measure(case, filename: str, repeat: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case(filename)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        case(filename)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a description of every case that regressed compared to the baseline."""
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        for metric, min_delta in (("seconds", MIN_TIME_DELTA), ("peak_bytes", MIN_MEMORY_DELTA)):
+            old, new = before[metric], result[metric]
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(f"{key}: {metric} went from {old:,.4g} to {new:,.4g} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="small,medium", help=f"Comma-separated sizes out of {', '.join(SIZES)} (default: small,medium)")
+    parser.add_argument("--cases", help="Comma-separated cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest counts (default: 3)")
+    parser.add_argument("--baseline", help="Compare against this baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a new baseline")
+    args = parser.parse_args()
+
+    sizes = args.sizes.split(",")
+    cases = args.cases.split(",") if args.cases else list(CASES)
+    for name in sizes:
+        if name not in SIZES:
+            parser.error(f"Unknown size {name}")
+    for name in cases:
+        if name not in CASES:
+            parser.error(f"Unknown case {name}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the parsed-spec cache out of the way; cases run with --no-cache anyway
+        os.environ["API_BROWSER_CACHE_DIR"] = os.path.join(directory, "cache")
+        for size in sizes:
+            filename = os.path.join(directory, f"{size}.yaml")
+            write_spec(generate_spec(**SIZES[size]), filename)
+            print(f"{size}: {os.path.getsize(filename):,} bytes")
+            for name in cases:
+                result = measure(CASES[name], filename, args.repeat)
+                results[f"{size}/{name}"] = result
+                print(f"  {name:<20} {result['seconds'] * 1000:>10.1f} ms {result['peak_bytes'] / 1024 / 1024:>10.1f} MB peak")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Generate synthetic OpenAPI specs for benchmarks.
+
+The shape of the spec is controlled by the number of paths, operations per
+path and schemas, how deep chains of schema refs go, how many schemas each
+allOf combines, and how often a schema refers back to an earlier one to
+form a cycle. The same options and seed always give the same spec.
+
+Usage:
+    python benchmarks/generate_spec.py openapi.yaml [--size medium]
+    python benchmarks/generate_spec.py openapi.json --paths 500 --schemas 800 --ref-depth 6 --cycle-density 0.1
+"""
+import argparse
+import json
+import random
+import yaml
+
+METHODS = ("get", "post", "put", "patch", "delete")
+BODY_METHODS = ("post", "put", "patch")
+
+# Preset shapes used by the benchmark suite
+SIZES = {
+    "small": {"paths": 20, "operations": 2, "schemas": 20, "ref_depth": 3, "allof_fanout": 2, "cycle_density": 0.05},
+    "medium": {"paths": 200, "operations": 3, "schemas": 300, "ref_depth": 5, "allof_fanout": 3, "cycle_density": 0.05},
+    "huge": {"paths": 2000, "operations": 4, "schemas": 3000, "ref_depth": 8, "allof_fanout": 4, "cycle_density": 0.05},
+}
+
+
+def schema_ref(index: int) -> dict:
+    return {"$ref": f"#/components/schemas/Model{index}"}
+
+
+def generate_spec(
+    paths: int = 200,
+    operations: int = 3,
+    schemas: int = 300,
+    ref_depth: int = 5,
+    allof_fanout: int = 3,
+    cycle_density: float = 0.05,
+    seed: int = 0,
+) -> dict:
+    """
+    Build an OpenAPI 3.0 document.
+
+    Args:
+        paths: Number of paths
+        operations: Operations per path, up to 5
+        schemas: Number of component schemas
+        ref_depth: Length of the chains of schemas that refer to the next one
+        allof_fanout: Number of schemas combined by each allOf schema, or 0 for none
+        cycle_density: Fraction of schemas with a ref back to the start of their chain
+        seed: Seed for the random choices
+    """
+    rng = random.Random(seed)
+    ref_depth = max(1, ref_depth)
+
+    components = {}
+    for i in range(schemas):
+        properties = {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"},
+            "createdAt": {"type": "string", "format": "date-time"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        }
+        position = i % ref_depth
+        chain_start = i - position
+        if position < ref_depth - 1 and i + 1 < schemas:
+            properties["next"] = schema_ref(i + 1)
+            properties["children"] = {"type": "array", "items": schema_ref(i + 1)}
+        if position > 0 and rng.random() < cycle_density:
+            properties["root"] = schema_ref(chain_start)
+
+        schema = {"type": "object", "required": ["id", "name"], "properties": properties}
+        # Every fifth schema is a composition of later chains
+        if allof_fanout and i % 5 == 0:
+            targets = sorted({rng.randrange(schemas) for _ in range(allof_fanout)} - {i})
+            schema = {"allOf": [schema_ref(target) for target in targets] + [schema]}
+        components[f"Model{i}"] = schema
+
+    path_items = {}
+    operations = max(1, min(operations, len(METHODS)))
+    for p in range(paths):
+        path = f"/v1/group{p % 10}/resource{p // 2}"
+        if p % 2:
+            path += "/{id}"
+        item = {}
+        if "{id}" in path:
+            item["parameters"] = [{"$ref": "#/components/parameters/Id"}]
+        for method in METHODS[:operations]:
+            model = rng.randrange(schemas) if schemas else None
+            operation = {
+                "operationId": f"{method}Resource{p}",
+                "tags": [f"group{p % 10}"],
+                "parameters": [{"$ref": "#/components/parameters/Limit"}],
+                "responses": {"200": {"description": "OK"}, "default": {"$ref": "#/components/responses/Error"}},
+            }
+            if model is not None:
+                operation["responses"]["200"]["content"] = {"application/json": {"schema": schema_ref(model)}}
+                if method in BODY_METHODS:
+                    operation["requestBody"] = {"content": {"application/json": {"schema": schema_ref(model)}}}
+            item[method] = operation
+        path_items[path] = item
+
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Generated API", "version": "1.0.0", "description": "A synthetic spec for benchmarks"},
+        "paths": path_items,
+        "components": {
+            "schemas": components,
+            "parameters": {
+                "Id": {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}},
+                "Limit": {"name": "limit", "in": "query", "schema": {"type": "integer", "minimum": 1}},
+            },
+            "responses": {
+                "Error": {
+                    "description": "Error",
+                    "content": {
+                        "application/json": {
+                            "schema": {"type": "object", "properties": {"message": {"type": "string"}}},
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+
+def diamond_spec(layers: int) -> dict:
+    """
+    Build a spec whose schemas form a diamond-shaped graph.
+
+    Both schemas in each layer refer to both schemas in the next layer, so
+    fully expanding L0A visits 2 ** layers paths.
+    """
+    schemas = {}
+    for layer in range(layers):
+        for side in "AB":
+            schemas[f"L{layer}{side}"] = {
+                "type": "object",
+                "properties": {
+                    "left": {"$ref": f"#/components/schemas/L{layer + 1}A"},
+                    "right": {"$ref": f"#/components/schemas/L{layer + 1}B"},
+                },
+            }
+    for side in "AB":
+        schemas[f"L{layers}{side}"] = {"type": "object", "properties": {"id": {"type": "integer"}}}
+    return {"components": {"schemas": schemas}}
+
+
+def write_spec(spec: dict, filename: str) -> None:
+    with open(filename, "w", encoding="utf-8") as f:
+        if filename.endswith(".json"):
+            json.dump(spec, f)
+        else:
+            yaml.dump(spec, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper), sort_keys=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("filename", help="Where to write the spec; .json writes JSON, anything else YAML")
+    parser.add_argument("--size", choices=SIZES, default="medium", help="Preset to start from (default: medium)")
+    parser.add_argument("--paths", type=int, help="Number of paths")
+    parser.add_argument("--operations", type=int, help="Operations per path, up to 5")
+    parser.add_argument("--schemas", type=int, help="Number of component schemas")
+    parser.add_argument("--ref-depth", type=int, help="Length of chains of schema refs")
+    parser.add_argument("--allof-fanout", type=int, help="Schemas combined by each allOf")
+    parser.add_argument("--cycle-density", type=float, help="Fraction of schemas that close a cycle")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    options = dict(SIZES[args.size])
+    for name in options:
+        value = getattr(args, name)
+        if value is not None:
+            options[name] = value
+    spec = generate_spec(seed=args.seed, **options)
+    write_spec(spec, args.filename)
+    print(f"Wrote {args.filename}: {len(spec['paths'])} paths, {len(spec['components']['schemas'])} schemas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Load test the documentation server.
+
+Runs concurrent keep-alive clients against /openapi and
+/openapi-documentation and reports requests per second and latency
+percentiles for each. Either point it at a running server with --url, or
+pass --spec to start a local instance for the duration of the test.
+
+Usage:
+    python benchmarks/load_test.py --spec openapi.yaml [--production] [--concurrency 32] [--duration 10]
+    python benchmarks/load_test.py --url http://127.0.0.1:5000
+"""
+import argparse
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+PATHS = ("/openapi", "/openapi-documentation")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(spec: str, production: bool, threads: int) -> tuple:
+    port = free_port()
+    command = [
+        sys.executable, "-c", "from api_browser import cli; cli()",
+        "openapi", spec, "--no-browser", "--no-reload", "--port", str(port), "--threads", str(threads),
+    ]
+    if production:
+        command.append("--production")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("The server didn't start listening in time")
+
+
+def worker(host: str, port: int, path: str, headers: dict, stop_at: float, latencies: list, errors: list) -> None:
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(url: str, path: str, concurrency: int, duration: float, headers: dict) -> None:
+    parts = urlsplit(url)
+    latencies = []
+    errors = []
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(parts.hostname, parts.port or 80, path, headers, stop_at, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        print(f"{path:<26} no successful requests ({len(errors)} errors)")
+        return
+    print(
+        f"{path:<26} {len(latencies) / elapsed:>10.1f} req/s"
+        f"   p50 {percentile(latencies, 0.50) * 1000:>8.2f} ms"
+        f"   p99 {percentile(latencies, 0.99) * 1000:>8.2f} ms"
+        f"   errors {len(errors)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server")
+    target.add_argument("--spec", help="Start a local server for this OpenAPI file")
+    parser.add_argument("--production", action="store_true", help="Start the local server with --production")
+    parser.add_argument("--threads", type=int, default=32, help="Worker threads for the local server (default: 32)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run per path (default: 10)")
+    parser.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if args.spec:
+        process, url = start_server(args.spec, args.production, args.threads)
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+    try:
+        print(f"{url} with {args.concurrency} clients for {args.duration:g}s per path")
+        for path in PATHS:
+            run(url, path, args.concurrency, args.duration, headers)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Update the Redoc bundle shipped in api_browser/static/redoc.
+
+Downloads the standalone bundle and its license from the npm registry and
+writes the precompressed copies the server sends to browsers. Install
+brotli first so the `.br` copy is written too.
+
+Usage:
+    python scripts/update_redoc.py [--version 2.5.4]
+"""
+import argparse
+import io
+import os
+import sys
+import tarfile
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api_browser.assets import ENCODINGS, precompress  # noqa: E402
+
+TARGET_DIR = os.path.join(os.path.dirname(__file__), "..", "api_browser", "static", "redoc")
+FILES = {
+    "package/bundles/redoc.standalone.js": "redoc.standalone.js",
+    "package/bundles/redoc.standalone.js.LICENSE.txt": "redoc.standalone.js.LICENSE.txt",
+    "package/LICENSE": "LICENSE",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default="2.5.4", help="Redoc version to download (default: 2.5.4)")
+    args = parser.parse_args()
+
+    if "br" not in ENCODINGS:
+        sys.exit("brotli isn't installed, so the .br copy can't be written")
+
+    url = f"https://registry.npmjs.org/redoc/-/redoc-{args.version}.tgz"
+    print(f"Downloading {url}")
+    with urllib.request.urlopen(url) as response:
+        archive = tarfile.open(fileobj=io.BytesIO(response.read()), mode="r:gz")
+    for member, name in FILES.items():
+        target = os.path.join(TARGET_DIR, name)
+        with open(target, "wb") as f:
+            f.write(archive.extractfile(member).read())
+        print(f"Wrote {os.path.normpath(target)}")
+
+    for target in precompress(os.path.join(TARGET_DIR, "redoc.standalone.js")):
+        print(f"Wrote {os.path.normpath(target)}")
+
+
+if __name__ == "__main__":
+    main()
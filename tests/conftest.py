@@ -0,0 +1,29 @@
+import pytest
+import yaml
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep the parsed-spec cache out of the user's home directory during tests."""
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("API_BROWSER_CACHE_DIR", str(cache))
+    return cache
+
+
+@pytest.fixture
+def spec():
+    """
+    The document `spec_file` writes.
+
+    Test modules override this fixture with their own spec, and single tests
+    can parametrize it.
+    """
+    return {"openapi": "3.0.0", "info": {"title": "Test", "version": "1.0.0"}, "paths": {}}
+
+
+@pytest.fixture
+def spec_file(tmp_path, spec):
+    """Path of an openapi.yaml holding `spec`, with its keys in the order they were written."""
+    path = tmp_path / "openapi.yaml"
+    path.write_text(yaml.dump(spec, sort_keys=False))
+    return str(path)
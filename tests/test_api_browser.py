@@ -327,3 +327,40 @@ def test_validate_command_invalid(snapshot):
     finally:
         # Clean up the temporary file
         os.unlink(temp_file)
+
+def test_summary_reports_circular_refs(tmp_path):
+    openapi_spec = {
+        "paths": {
+            "/pets": {
+                "get": {
+                    "operationId": "listPets",
+                    "responses": {"200": {"$ref": "#/components/responses/A"}}
+                }
+            }
+        },
+        "components": {
+            "responses": {
+                "A": {"$ref": "#/components/responses/B"},
+                "B": {"$ref": "#/components/responses/A"}
+            }
+        }
+    }
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(openapi_spec))
+
+    result = CliRunner().invoke(summary, [str(spec_file)])
+
+    assert result.exit_code == 1
+    assert "Circular $ref chain: #/components/responses/A -> #/components/responses/B -> #/components/responses/A" in result.output
+
+
+def test_cli_reports_unloadable_ref_files(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump({
+        "paths": {"/pets": {"get": {"responses": {"200": {"$ref": "./missing.yaml#/OK"}}}}},
+    }))
+
+    result = CliRunner().invoke(cli, ["summary", str(spec_file)])
+
+    assert f"Can't load {tmp_path / 'missing.yaml'}" in result.stderr
+    assert "Can't load" not in result.stdout
@@ -0,0 +1,94 @@
+import json
+import pytest
+import yaml
+from click.testing import CliRunner
+from api_browser import summary, validate_cmd
+from api_browser.batch import expand_filenames
+
+
+def valid_spec(title):
+    return {"openapi": "3.0.0", "info": {"title": title, "version": "1.0.0"}, "paths": {}}
+
+
+@pytest.fixture
+def specs(tmp_path):
+    for i in range(3):
+        (tmp_path / f"spec{i}.yaml").write_text(yaml.dump(valid_spec(f"Spec {i}")))
+    (tmp_path / "invalid.yaml").write_text(yaml.dump({"openapi": "3.0.0", "paths": {}}))
+    (tmp_path / "notes.txt").write_text("not a spec")
+    return tmp_path
+
+
+def test_expand_filenames(specs):
+    names = [path.rsplit("/", 1)[-1] for path in expand_filenames([str(specs)])]
+    assert names == ["invalid.yaml", "spec0.yaml", "spec1.yaml", "spec2.yaml"]
+
+    spec1 = str(specs / "spec1.yaml")
+    assert expand_filenames([spec1, str(specs / "spec*.yaml")]) == [
+        spec1,
+        str(specs / "spec0.yaml"),
+        str(specs / "spec2.yaml"),
+    ]
+
+    with pytest.raises(ValueError, match="No files match"):
+        expand_filenames([str(specs / "*.json")])
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_validate_many_files(specs, jobs):
+    report = specs / "report.jsonl"
+    runner = CliRunner()
+    result = runner.invoke(validate_cmd, [str(specs), "--jobs", jobs, "--report", str(report)])
+
+    assert result.exit_code == 1
+    lines = result.output.splitlines()
+    assert lines[:4] == [
+        f"✗ {specs / 'invalid.yaml'}: 'info' is a required property",
+        f"✓ {specs / 'spec0.yaml'}",
+        f"✓ {specs / 'spec1.yaml'}",
+        f"✓ {specs / 'spec2.yaml'}",
+    ]
+    assert lines[-1].startswith("3 valid, 1 failed (4 files in ")
+
+    records = [json.loads(line) for line in report.read_text().splitlines()]
+    assert [record["status"] for record in records[:-1]] == ["invalid", "ok", "ok", "ok"]
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["files"] == 4
+    assert records[-1]["failed"] == 1
+    assert records[-1]["jobs"] == int(jobs)
+    assert records[-1]["specs_per_second"] > 0
+
+
+def test_validate_many_valid_files(specs):
+    runner = CliRunner()
+    result = runner.invoke(validate_cmd, [str(specs / "spec0.yaml"), str(specs / "spec1.yaml")])
+    assert result.exit_code == 0
+
+
+def test_validate_reports_missing_files(specs):
+    runner = CliRunner()
+    result = runner.invoke(validate_cmd, [str(specs / "spec0.yaml"), str(specs / "missing.yaml")])
+    assert result.exit_code == 1
+    assert f"✗ {specs / 'missing.yaml'}: " in result.output
+
+
+def test_summary_many_files(specs):
+    runner = CliRunner()
+    result = runner.invoke(summary, [str(specs / "spec*.yaml"), "--jobs", "2"])
+
+    assert result.exit_code == 0
+    assert result.output.startswith(f"==> {specs / 'spec0.yaml'} <==\nTitle: Spec 0\n")
+    assert result.output.index("Title: Spec 1") < result.output.index("Title: Spec 2")
+    assert "Summarized 3 of 3 files" in result.output
+
+
+def test_validate_many_files_without_openapi_key(specs):
+    # The validator can't tell the version, and raises an error with no message
+    (specs / "unversioned.yaml").write_text(yaml.dump({"info": {"title": "No version", "version": "1.0.0"}}))
+    runner = CliRunner()
+    result = runner.invoke(validate_cmd, [str(specs / "unversioned.yaml"), str(specs / "spec0.yaml")])
+
+    assert result.exit_code == 1
+    lines = result.output.splitlines()
+    assert lines[0] == f"✗ {specs / 'unversioned.yaml'}: ValidatorDetectError"
+    assert lines[1] == f"✓ {specs / 'spec0.yaml'}"
@@ -0,0 +1,291 @@
+import os
+import pytest
+from pathlib import Path
+import yaml
+from click.testing import CliRunner
+from api_browser import documents, schema, summary
+from api_browser.documents import DocumentCache, bundle, has_external_refs
+from api_browser.openapi import get_schema_name, get_with_refs, SpecIndex
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.dump(data))
+    return str(path)
+
+
+@pytest.fixture
+def split_spec(tmp_path):
+    """A spec with its path items, schemas and responses in other files."""
+    error_ref = "./schemas.yaml#/components/schemas/Error"
+    write(tmp_path / "common" / "schemas.yaml", {
+        "components": {
+            "schemas": {
+                "Owner": {"type": "object", "properties": {"name": {"type": "string"}}},
+                "Error": {"type": "object", "properties": {"message": {"type": "string"}}},
+                "NewPet": {
+                    "type": "object",
+                    "properties": {"owner": {"$ref": "#/components/schemas/Owner"}},
+                },
+            }
+        }
+    })
+    write(tmp_path / "common" / "responses.yaml", {
+        "components": {
+            "responses": {
+                "NotFound": {
+                    "description": "Not found",
+                    "content": {"application/json": {"schema": {"$ref": error_ref}}},
+                }
+            }
+        }
+    })
+    write(tmp_path / "paths" / "pets.yaml", {
+        "post": {
+            "operationId": "createPet",
+            "requestBody": {
+                "content": {
+                    "application/json": {"schema": {"$ref": "../common/schemas.yaml#/components/schemas/NewPet"}}
+                }
+            },
+            "responses": {"201": {"description": "Created"}},
+        }
+    })
+    return write(tmp_path / "openapi.yaml", {
+        "openapi": "3.0.0",
+        "info": {"title": "Split", "version": "1.0.0"},
+        "paths": {
+            "/pets": {"$ref": "./paths/pets.yaml"},
+            "/pets/{id}": {
+                "get": {
+                    "operationId": "getPet",
+                    "responses": {
+                        "200": {
+                            "description": "OK",
+                            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+                        },
+                        "404": {"$ref": "./common/responses.yaml#/components/responses/NotFound"},
+                    },
+                }
+            },
+        },
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "type": "object",
+                    "properties": {"owner": {"$ref": "./common/schemas.yaml#/components/schemas/Owner"}},
+                }
+            }
+        },
+    })
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Record every file the document caches load."""
+    paths = []
+    original = documents.load_spec
+
+    def load_spec(path, *args, **kwargs):
+        paths.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(documents, "load_spec", load_spec)
+    return paths
+
+
+def test_get_schema_name_external():
+    assert get_schema_name("./common.yaml#/components/schemas/Error") == "Error"
+    assert get_schema_name("./schemas/Pet.yaml") == "Pet"
+    assert get_schema_name("./common.yaml#/components/responses/Error") == "(inline)"
+
+
+def test_spec_index_follows_relative_refs(split_spec):
+    spec = yaml.safe_load(open(split_spec))
+    index = SpecIndex(spec, base=split_spec)
+
+    assert index.get(spec, ["paths", "/pets", "post", "operationId"]) == "createPet"
+    # Refs inside other files are relative to those files
+    not_found = ["paths", "/pets/{id}", "get", "responses", "404"]
+    assert index.get(spec, [*not_found, "content", "application/json", "schema", "properties", "message", "type"]) == "string"
+    assert index.get(spec, ["components", "schemas", "Pet", "properties", "owner", "type"]) == "object"
+
+
+def test_external_refs_need_a_base(split_spec):
+    spec = yaml.safe_load(open(split_spec))
+    assert get_with_refs(spec, ["paths", "/pets", "post"]) is None
+    assert get_with_refs(spec, ["paths", "/pets", "post", "operationId"], base=split_spec) == "createPet"
+
+
+def test_each_file_is_loaded_once(split_spec, loads):
+    spec = yaml.safe_load(open(split_spec))
+    cache = DocumentCache()
+    for _ in range(2):
+        index = SpecIndex(spec, base=split_spec, documents=cache)
+        index.resolve_all()
+        index.get(spec, ["paths", "/pets", "post", "requestBody", "content", "application/json", "schema"])
+
+    # Every file was loaded on the first external ref, including the ones only other files refer to
+    directory = os.path.dirname(split_spec)
+    assert sorted(loads) == sorted(
+        os.path.join(directory, name) for name in ("common/responses.yaml", "common/schemas.yaml", "paths/pets.yaml")
+    )
+    assert cache.paths() == sorted(loads)
+
+
+def test_missing_files_are_reported_once(tmp_path, caplog):
+    spec = {"components": {"schemas": {"Pet": {"$ref": "./missing.yaml#/Pet"}}}}
+    cache = DocumentCache()
+    index = SpecIndex(spec, base=str(tmp_path / "openapi.yaml"), documents=cache)
+
+    assert index.get(spec, ["components", "schemas", "Pet"]) is None
+    assert index.get(spec, ["components", "schemas", "Pet"], default={}) == {}
+    assert [record.getMessage().startswith("Can't load") for record in caplog.records] == [True]
+    assert list(cache.errors) == [str(tmp_path / "missing.yaml")]
+
+
+def test_refresh_forgets_changed_files(split_spec, loads):
+    cache = DocumentCache()
+    path = os.path.join(os.path.dirname(split_spec), "common", "schemas.yaml")
+    assert "Owner" in cache.resolve(path, "/components/schemas")
+    assert cache.refresh() == 0
+
+    write(Path(path), {"components": {"schemas": {}}})
+    assert cache.refresh() == 1
+    assert cache.resolve(path, "/components/schemas") == {}
+    assert loads == [path, path]
+
+
+def test_bundle(split_spec):
+    spec = yaml.safe_load(open(split_spec))
+    bundled, paths = bundle(spec, split_spec)
+
+    assert [os.path.basename(path) for path in paths] == ["responses.yaml", "schemas.yaml", "pets.yaml"]
+    # Whole files are inlined and components are brought into the spec
+    post = bundled["paths"]["/pets"]["post"]
+    assert post["requestBody"]["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/NewPet"}
+    assert bundled["components"]["responses"]["NotFound"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/Error"
+    }
+    assert set(bundled["components"]["schemas"]) == {"Pet", "Owner", "NewPet", "Error"}
+    assert bundled["components"]["schemas"]["NewPet"]["properties"]["owner"] == {"$ref": "#/components/schemas/Owner"}
+    assert not any("yaml" in line for line in yaml.dump(bundled).splitlines() if "$ref" in line)
+    # The spec itself is left alone
+    assert spec["paths"]["/pets"] == {"$ref": "./paths/pets.yaml"}
+
+
+def test_bundle_renames_conflicting_components(tmp_path):
+    write(tmp_path / "common.yaml", {"components": {"schemas": {"Error": {"type": "string"}}}})
+    spec = {
+        "components": {
+            "schemas": {
+                "Error": {"type": "object"},
+                "Other": {"$ref": "./common.yaml#/components/schemas/Error"},
+            }
+        }
+    }
+    bundled, _ = bundle(spec, str(tmp_path / "openapi.yaml"))
+    assert bundled["components"]["schemas"]["Other"] == {"$ref": "#/components/schemas/Error_common"}
+    assert bundled["components"]["schemas"]["Error_common"] == {"type": "string"}
+
+
+def test_bundle_without_external_refs_returns_spec():
+    spec = {"components": {"schemas": {"A": {"$ref": "#/components/schemas/B"}, "B": {}}}}
+    assert bundle(spec, None) == (spec, [])
+
+
+def test_has_external_refs():
+    assert has_external_refs(b"$ref: ./common.yaml#/components/schemas/Error")
+    assert has_external_refs(b'{"$ref": "common.json"}')
+    assert not has_external_refs(b"$ref: '#/components/schemas/Error'")
+    assert not has_external_refs(b'{"$ref" : "#/components/schemas/Error"}')
+
+
+def test_summary_and_schema_with_split_spec(split_spec):
+    runner = CliRunner()
+    result = runner.invoke(summary, [split_spec, "--format", "csv"])
+    assert result.exit_code == 0
+    assert "/pets,POST,createPet,201,NewPet,(none)" in result.output
+    assert "/pets/{id},GET,getPet,200,(none),Pet" in result.output
+
+    result = runner.invoke(schema, [split_spec, "Owner"])
+    assert result.exit_code == 0
+    assert "Referenced by: NewPet, Pet" in result.output
+
+    result = runner.invoke(schema, [split_spec, "Error"])
+    assert result.exit_code == 0
+    assert "Responses: getPet" in result.output
+    assert "└── message (string)" in result.output
+
+
+@pytest.fixture
+def clashing_spec(tmp_path):
+    """Two files with an Error schema, and a spec with one of its own."""
+    write(tmp_path / "common.yaml", {
+        "components": {
+            "schemas": {
+                "Error": {"type": "object", "properties": {"detail": {"$ref": "#/components/schemas/Detail"}}},
+                "Detail": {"type": "object", "properties": {"field": {"type": "string"}}},
+            }
+        }
+    })
+    write(tmp_path / "billing.yaml", {
+        "components": {"schemas": {"Error": {"type": "object", "properties": {"invoice": {"type": "string"}}}}}
+    })
+
+    def operation(operation_id, ref):
+        return {
+            "operationId": operation_id,
+            "responses": {
+                "400": {"description": "Bad", "content": {"application/json": {"schema": {"$ref": ref}}}},
+            },
+        }
+
+    return write(tmp_path / "multi.yaml", {
+        "openapi": "3.0.0",
+        "info": {"title": "Multi", "version": "1.0.0"},
+        "paths": {
+            "/pets": {"get": operation("listPets", "./common.yaml#/components/schemas/Error")},
+            "/invoices": {"get": operation("listInvoices", "./billing.yaml#/components/schemas/Error")},
+            "/owners": {"get": operation("listOwners", "#/components/schemas/Error")},
+        },
+        "components": {
+            "schemas": {"Error": {"type": "object", "properties": {"code": {"type": "integer"}}}}
+        },
+    })
+
+
+def test_schemas_of_other_files_keep_apart(clashing_spec):
+    runner = CliRunner()
+    result = runner.invoke(schema, [clashing_spec, "Error"])
+    assert result.exit_code == 0
+    assert "Responses: listOwners\n" in result.output
+    assert "code (integer)" in result.output
+
+    result = runner.invoke(schema, [clashing_spec, "Error_common"])
+    assert result.exit_code == 0
+    assert "Responses: listPets\n" in result.output
+    assert "detail (Detail)" in result.output
+
+    result = runner.invoke(schema, [clashing_spec, "Detail"])
+    assert result.exit_code == 0
+    assert "Referenced by: Error_common" in result.output
+
+    result = runner.invoke(schema, [clashing_spec, "Error_billing"])
+    assert result.exit_code == 0
+    assert "Responses: listInvoices\n" in result.output
+    assert "invoice (string)" in result.output
+
+
+def test_bundle_and_graph_agree_on_names(clashing_spec):
+    from api_browser.graph import SchemaGraph
+
+    spec = yaml.safe_load(open(clashing_spec))
+    bundled, _ = bundle(spec, clashing_spec)
+    graph = SchemaGraph(spec, SpecIndex(spec, base=clashing_spec))
+
+    assert set(graph.schemas) == set(bundled["components"]["schemas"]) == {
+        "Error", "Error_billing", "Error_common", "Detail"
+    }
+    responses = bundled["paths"]["/invoices"]["get"]["responses"]["400"]
+    assert responses["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/Error_billing"}
@@ -0,0 +1,191 @@
+import yaml
+from click.testing import CliRunner
+from api_browser import schema, impact
+from api_browser.graph import SchemaGraph
+
+
+def json_body(schema):
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+SPEC = {
+    "paths": {
+        "/pets": {
+            "parameters": [],
+            "get": {
+                "operationId": "listPets",
+                "responses": {"200": json_body({"type": "array", "items": {"$ref": "#/components/schemas/Pet"}})},
+            },
+            "post": {
+                "operationId": "createPet",
+                "requestBody": {"$ref": "#/components/requestBodies/NewPet"},
+                "responses": {
+                    "201": json_body({"$ref": "#/components/schemas/Pet"}),
+                    "default": {"$ref": "#/components/responses/Error"},
+                },
+            },
+        },
+        "/owners": {
+            "get": {"responses": {"200": json_body({"$ref": "#/components/schemas/Owner"})}},
+        },
+    },
+    "components": {
+        "requestBodies": {"NewPet": json_body({"$ref": "#/components/schemas/Pet"})},
+        "responses": {"Error": json_body({"$ref": "#/components/schemas/Error"})},
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "properties": {
+                    "owner": {"$ref": "#/components/schemas/Owner"},
+                    "siblings": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}},
+                },
+            },
+            "Owner": {
+                "allOf": [
+                    {"$ref": "#/components/schemas/Person"},
+                    {"type": "object", "additionalProperties": {"$ref": "#/components/schemas/Pet"}},
+                ]
+            },
+            "Person": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "Error": {"type": "object"},
+        },
+    },
+}
+
+
+def test_schema_graph_edges():
+    graph = SchemaGraph(SPEC)
+
+    assert graph.references["Pet"] == {"Owner", "Pet"}
+    assert graph.references["Owner"] == {"Person", "Pet"}
+    assert graph.referencing_schemas("Pet") == ["Owner"]
+    assert graph.referencing_schemas("Person") == ["Owner"]
+    assert graph.referencing_schemas("Error") == []
+
+
+def test_schema_graph_operations():
+    graph = SchemaGraph(SPEC)
+
+    assert graph.request_operations("Pet") == ["createPet"]
+    assert graph.response_operations("Pet") == ["createPet", "listPets"]
+    # Operations without an operationId aren't listed as users of a body schema
+    assert graph.response_operations("Owner") == []
+    # But impact names them by method and path
+    assert graph.impact("Owner")[1] == ["GET /owners", "createPet", "listPets"]
+    assert graph.response_operations("Error") == ["createPet"]
+    assert graph.operation_responses["createPet"] == {"Pet", "Error"}
+
+
+def test_schema_command_all(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(SPEC))
+
+    result = CliRunner().invoke(schema, [str(spec_file), "--all"])
+
+    assert result.exit_code == 0
+    headings = [line for line in result.output.splitlines() if line.startswith("Schema: ")]
+    assert headings == ["Schema: Error", "Schema: Owner", "Schema: Person", "Schema: Pet"]
+    single = CliRunner().invoke(schema, [str(spec_file), "Person"])
+    assert single.output in result.output
+
+
+def test_schema_command_skips_operations_without_id(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(SPEC))
+
+    result = CliRunner().invoke(schema, [str(spec_file), "Owner"])
+
+    assert result.exit_code == 0
+    assert "GET /owners" not in result.output
+    assert "Responses:" not in result.output
+
+    result = CliRunner().invoke(impact, [str(spec_file), "Owner"])
+    assert "Operations: GET /owners, createPet, listPets\n" in result.output
+
+
+def test_schema_command_requires_name(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(SPEC))
+
+    result = CliRunner().invoke(schema, [str(spec_file)])
+
+    assert result.exit_code == 2
+    assert "Missing argument 'SCHEMA_NAME'" in result.output
+
+
+IMPACT_SPEC = {
+    "paths": {
+        "/customers": {
+            "parameters": [{"name": "region", "in": "query", "schema": {"$ref": "#/components/schemas/Region"}}],
+            "get": {"operationId": "listCustomers", "responses": {"200": {"$ref": "#/components/responses/Customers"}}},
+        },
+        "/orders": {
+            "post": {
+                "operationId": "createOrder",
+                "requestBody": json_body({"type": "object", "properties": {"order": {"$ref": "#/components/schemas/Order"}}}),
+                "responses": {"201": {"description": "Created"}},
+            },
+        },
+        "/health": {"get": {"operationId": "health", "responses": {"200": {"description": "OK"}}}},
+    },
+    "components": {
+        "responses": {"Customers": json_body({"type": "array", "items": {"$ref": "#/components/schemas/Customer"}})},
+        "schemas": {
+            "Address": {"type": "object", "properties": {"region": {"$ref": "#/components/schemas/Region"}}},
+            "Region": {"type": "string"},
+            "Customer": {"type": "object", "properties": {"billing": {"oneOf": [{"$ref": "#/components/schemas/Address"}]}}},
+            "Order": {"allOf": [{"$ref": "#/components/schemas/LineItems"}]},
+            "LineItems": {"type": "array", "items": {"$ref": "#/components/schemas/LineItem"}},
+            "LineItem": {"properties": {"order": {"$ref": "#/components/schemas/Order"}, "shipTo": {"$ref": "#/components/schemas/Address"}}},
+        },
+    },
+}
+
+
+def test_schema_graph_impact_is_transitive():
+    graph = SchemaGraph(IMPACT_SPEC)
+
+    schemas, operations = graph.impact("Address")
+    assert schemas == ["Customer", "LineItem", "LineItems", "Order"]
+    assert operations == ["createOrder", "listCustomers"]
+
+    # Region is also used directly by a path-level parameter
+    assert graph.impact("Region") == (["Address", "Customer", "LineItem", "LineItems", "Order"], ["createOrder", "listCustomers"])
+    assert graph.impact("Customer") == ([], ["listCustomers"])
+
+
+def test_schema_graph_impact_with_cycles():
+    graph = SchemaGraph(IMPACT_SPEC)
+
+    # Order -> LineItems -> LineItem -> Order is one strongly connected component
+    assert graph.impact("Order") == (["LineItem", "LineItems"], ["createOrder"])
+    assert graph.impact("LineItem") == (["LineItems", "Order"], ["createOrder"])
+
+
+def test_schema_graph_impact_long_chain():
+    length = 1500
+    schemas = {f"S{i}": {"properties": {"next": {"$ref": f"#/components/schemas/S{i + 1}"}}} for i in range(length)}
+    schemas[f"S{length}"] = {"type": "string"}
+    graph = SchemaGraph({"components": {"schemas": schemas}})
+
+    # Deeper than the recursion limit, and memoized for every query after the first
+    assert len(graph.impact(f"S{length}")[0]) == length
+    assert len(graph.impact("S1")[0]) == 1
+
+
+def test_impact_command(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(IMPACT_SPEC))
+
+    result = CliRunner().invoke(impact, [str(spec_file), "Address"])
+
+    assert result.exit_code == 0
+    assert result.output == (
+        "Schema: Address\n"
+        "Schemas: Customer, LineItem, LineItems, Order\n"
+        "Operations: createOrder, listCustomers\n"
+    )
+
+    result = CliRunner().invoke(impact, [str(spec_file), "--all"])
+    assert result.exit_code == 0
+    assert result.output.count("Schema: ") == len(IMPACT_SPEC["components"]["schemas"])
@@ -0,0 +1,41 @@
+import re
+import subprocess
+import sys
+
+# Modules that are slow to import and that `urls` doesn't need
+HEAVY_MODULES = (
+    "flask", "werkzeug", "jinja2", "openapi_spec_validator", "jsonschema", "tabulate", "yaml", "webbrowser", "brotli",
+)
+# Generous, so slow CI machines pass; a regression to eager imports is several times this
+IMPORT_BUDGET_US = 300_000
+
+
+def import_times(code: str) -> dict:
+    """Run `code` in a fresh interpreter with -X importtime and return cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            times[match.group(3)] = int(match.group(1))
+    return times
+
+
+def test_urls_help_imports_are_lazy():
+    times = import_times("from api_browser import cli; cli(['urls', '--help'], standalone_mode=False)")
+
+    imported = {name.split(".")[0] for name in times}
+    assert not imported & set(HEAVY_MODULES)
+    # Serving code, with its compression and MIME type tables, waits for serve
+    assert "api_browser.assets" not in times
+    assert times["api_browser"] < IMPORT_BUDGET_US
+
+
+def test_app_is_loaded_on_first_use():
+    times = import_times("import api_browser; api_browser.app")
+    assert "flask" in times
@@ -0,0 +1,73 @@
+import pstats
+import pytest
+from click.testing import CliRunner
+from api_browser import app, cli, instrument
+from api_browser.instrument import phase
+
+
+@pytest.fixture
+def spec():
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Test", "version": "1.0.0"},
+        "paths": {"/pets": {"get": {"operationId": "listPets", "responses": {"200": {"description": "OK"}}}}},
+    }
+
+
+def test_phases_nest_and_add_up():
+    timings = instrument.start()
+    try:
+        for _ in range(2):
+            with phase("load"):
+                with phase("parse"):
+                    pass
+        with phase("render"):
+            pass
+    finally:
+        assert instrument.stop() is timings
+
+    assert list(timings.phases) == ["load/parse", "load", "render"]
+    assert timings.phases["load"][1] == 2
+    report = timings.report()
+    assert "  load " in report
+    assert "    parse " in report
+    assert "(other)" in report
+    assert timings.server_timing().startswith("load;dur=")
+
+
+def test_phase_is_a_no_op_when_not_timing():
+    assert instrument.current() is None
+    with phase("anything"):
+        pass
+    assert instrument.current() is None
+
+
+def test_timings_option(spec_file):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--timings", "summary", spec_file, "--no-cache"])
+
+    assert result.exit_code == 0
+    for name in ("read", "parse", "resolve", "format", "output", "total", "Peak RSS"):
+        assert name in result.output
+    assert instrument.current() is None
+
+
+def test_profile_option(spec_file, tmp_path):
+    profile_file = tmp_path / "out.prof"
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--profile", str(profile_file), "urls", spec_file])
+
+    assert result.exit_code == 0
+    assert pstats.Stats(str(profile_file)).total_calls > 0
+
+
+def test_server_timing_header(spec_file):
+    app.config["OPENAPI_FILENAME"] = spec_file
+    app.config["LOG_TIMINGS"] = True
+    try:
+        response = app.test_client().get("/openapi.json")
+    finally:
+        app.config.pop("LOG_TIMINGS")
+
+    assert "parse;dur=" in response.headers["Server-Timing"]
+    assert "total;dur=" in response.headers["Server-Timing"]
@@ -0,0 +1,153 @@
+import json
+import yaml
+from click.testing import CliRunner
+from api_browser import cli, summary
+from api_browser.loader import load_spec, parse_spec, is_json, clear_cache
+
+
+SPEC = {
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {"/pets": {"get": {"operationId": "listPets"}}},
+}
+
+
+def write_spec(path, spec=SPEC):
+    path.write_text(yaml.dump(spec))
+    return str(path)
+
+
+def cache_entries(cache):
+    return sorted(p.name for p in cache.glob("*.pickle")) if cache.exists() else []
+
+
+def test_load_spec_uses_cache(tmp_path, isolated_cache):
+    filename = write_spec(tmp_path / "openapi.yaml")
+
+    assert load_spec(filename) == SPEC
+    assert len(cache_entries(isolated_cache)) == 1
+
+    # A second load is served from the same entry
+    assert load_spec(filename) == SPEC
+    assert len(cache_entries(isolated_cache)) == 1
+
+
+def test_load_spec_invalidates_on_change(tmp_path, isolated_cache):
+    filename = write_spec(tmp_path / "openapi.yaml")
+    load_spec(filename)
+
+    changed = {**SPEC, "info": {"title": "Changed", "version": "2.0.0"}}
+    write_spec(tmp_path / "openapi.yaml", changed)
+
+    assert load_spec(filename) == changed
+    assert len(cache_entries(isolated_cache)) == 2
+
+
+def test_load_spec_without_cache(tmp_path, isolated_cache):
+    filename = write_spec(tmp_path / "openapi.yaml")
+    assert load_spec(filename, use_cache=False) == SPEC
+    assert cache_entries(isolated_cache) == []
+
+
+def test_load_spec_ignores_corrupt_entry(tmp_path, isolated_cache):
+    filename = write_spec(tmp_path / "openapi.yaml")
+    load_spec(filename)
+    [entry] = isolated_cache.glob("*.pickle")
+    entry.write_bytes(b"not a pickle")
+
+    assert load_spec(filename) == SPEC
+
+
+def test_cache_eviction(tmp_path, isolated_cache, monkeypatch):
+    load_spec(write_spec(tmp_path / "first.yaml"))
+    [first_entry] = cache_entries(isolated_cache)
+    entry_size = (isolated_cache / first_entry).stat().st_size
+
+    # Leave room for a single entry so the older one has to go
+    monkeypatch.setenv("API_BROWSER_CACHE_SIZE", str(entry_size + entry_size // 2))
+    load_spec(write_spec(tmp_path / "second.yaml"))
+
+    entries = cache_entries(isolated_cache)
+    assert len(entries) == 1
+    assert first_entry not in entries
+
+
+def test_no_cache_option(tmp_path, isolated_cache):
+    filename = write_spec(tmp_path / "openapi.yaml")
+    result = CliRunner().invoke(summary, [filename, "--no-cache"])
+    assert result.exit_code == 0
+    assert cache_entries(isolated_cache) == []
+
+
+def test_cache_clear_command(tmp_path, isolated_cache):
+    load_spec(write_spec(tmp_path / "openapi.yaml"))
+    assert len(cache_entries(isolated_cache)) == 1
+
+    result = CliRunner().invoke(cli, ["cache", "clear"])
+    assert result.exit_code == 0
+    assert "Removed 1 cached file(s)" in result.output
+    assert cache_entries(isolated_cache) == []
+    assert clear_cache() == 0
+
+
+BACKEND_SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Backends", "version": "1.0.0", "description": "Unicode ✓ and \"quotes\""},
+    "paths": {
+        "/pets/{id}": {
+            "get": {
+                "operationId": "getPet",
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}}},
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string", "nullable": True},
+                    "weight": {"type": "number", "minimum": 0.5},
+                    "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 10},
+                },
+            }
+        }
+    },
+}
+
+
+def test_parse_spec_backends_agree():
+    yaml_data = yaml.dump(BACKEND_SPEC, allow_unicode=True).encode("utf-8")
+    json_data = json.dumps(BACKEND_SPEC, indent=2).encode("utf-8")
+
+    documents = [
+        parse_spec(json_data),
+        parse_spec(json_data, "openapi.json"),
+        parse_spec(yaml_data),
+        parse_spec(yaml_data, loader=yaml.SafeLoader),
+        parse_spec(json_data, loader=yaml.SafeLoader),
+    ]
+    if hasattr(yaml, "CSafeLoader"):
+        documents.append(parse_spec(yaml_data, loader=yaml.CSafeLoader))
+    # JSON is valid YAML, so forcing it through the YAML loader must agree too
+    documents.append(yaml.load(json_data, Loader=yaml.SafeLoader))
+
+    for document in documents:
+        assert document == BACKEND_SPEC
+
+
+def test_is_json():
+    assert is_json(b'{"openapi": "3.0.0"}')
+    assert is_json(b'\xef\xbb\xbf\n  {"openapi": "3.0.0"}')
+    assert is_json(b"openapi: 3.0.0", "openapi.JSON")
+    assert not is_json(b"openapi: 3.0.0")
+    assert not is_json(b"openapi: 3.0.0", "openapi.yaml")
+
+
+def test_parse_spec_yaml_flow_mapping():
+    # Starts like JSON but is only valid YAML
+    assert parse_spec(b"{openapi: 3.0.0, info: {title: Flow}}") == {
+        "openapi": "3.0.0",
+        "info": {"title": "Flow"},
+    }
@@ -1,5 +1,5 @@
 import pytest
-from api_browser.openapi import is_ref, get_with_refs
+from api_browser.openapi import is_ref, get_with_refs, parse_pointer, SpecIndex, RefCycleError
 
 def test_is_ref():
     assert is_ref({"$ref": "#/components/schemas/Todo"}) == True
@@ -131,4 +131,142 @@ def test_get_with_refs_with_default():
             "$ref": "#/components/schemas/DoesNotExist"
         }
     }
-    assert get_with_refs(data_with_ref, ["broken_ref"], default="ref not found") == "ref not found" 
\ No newline at end of file
+    assert get_with_refs(data_with_ref, ["broken_ref"], default="ref not found") == "ref not found" 
+
+def test_parse_pointer():
+    assert parse_pointer("#/components/schemas/Pet") == ("components", "schemas", "Pet")
+    assert parse_pointer("#/paths/~1pets~1%7Bid%7D/get") == ("paths", "/pets/{id}", "get")
+    assert parse_pointer("#/a~0b") == ("a~b",)
+    assert parse_pointer("#") == ()
+    assert parse_pointer("common.yaml#/components/schemas/Error") is None
+
+
+def test_spec_index_get():
+    error = {"type": "object", "properties": {"code": {"type": "integer"}}}
+    data = {
+        "components": {
+            "schemas": {
+                "Error": error,
+                "TodoResponse": {"$ref": "#/components/schemas/Error"},
+                "Alias": {"$ref": "#/components/schemas/TodoResponse"},
+            }
+        },
+        "items": [{"name": "first"}, {"$ref": "#/components/schemas/Error"}],
+        "root": {"$ref": "#/"},
+        "whole": {"$ref": "#"},
+        "broken_ref": {"$ref": "#/components/schemas/DoesNotExist"},
+    }
+    index = SpecIndex(data)
+    cases = [
+        (["components", "schemas", "TodoResponse"], error),
+        (["components", "schemas", "TodoResponse", "properties", "code", "type"], "integer"),
+        # A chain of aliases is followed to the end
+        (["components", "schemas", "Alias", "properties", "code"], {"type": "integer"}),
+        (["items", 0, "name"], "first"),
+        (["items", "1", "type"], "object"),
+        (["items", 5], "default"),
+        (["items", "not_an_index"], "default"),
+        # "#/" and "#" both point at the whole document
+        (["root", "items", 0, "name"], "first"),
+        (["whole", "components", "schemas", "Error"], error),
+        (["broken_ref"], "default"),
+        (["components", "schemas", "Missing", "type"], "default"),
+        (["missing"], "default"),
+        ([], data),
+    ]
+    for path, expected in cases:
+        assert index.get(data, path, default="default") == expected, path
+        assert get_with_refs(data, path, default="default") == expected, path
+
+
+def test_spec_index_resolves_against_root():
+    data = {
+        "components": {"responses": {"NotFound": {"description": "Not found"}}},
+        "paths": {"/pets": {"get": {"responses": {"404": {"$ref": "#/components/responses/NotFound"}}}}},
+    }
+    index = SpecIndex(data)
+    operation = data["paths"]["/pets"]["get"]
+    # The ref lives inside the operation but points into the document root
+    assert index.get(operation, ["responses", "404", "description"]) == "Not found"
+
+
+def test_spec_index_memoizes_lookups():
+    data = {"components": {"schemas": {"Pet": {"type": "object"}}}}
+    index = SpecIndex(data)
+
+    target = index.resolve("#/components/schemas/Pet")
+    assert target is data["components"]["schemas"]["Pet"]
+
+    # Memoized lookups don't walk the document again
+    data["components"]["schemas"] = {}
+    assert index.resolve("#/components/schemas/Pet") is target
+    assert index.resolve("#/components/schemas/Missing", default="missing") == "missing"
+
+
+def test_spec_index_resolve_all():
+    data = {
+        "components": {"schemas": {"Pet": {"type": "object"}, "Pets": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}}},
+        "paths": {"/pets": {"get": {"responses": {"200": {"$ref": "#/components/responses/Missing"}}}}},
+    }
+    assert SpecIndex(data).resolve_all() == {"#/components/schemas/Pet": {"type": "object"}}
+
+
+def test_spec_index_detects_self_reference():
+    data = {"components": {"schemas": {"A": {"$ref": "#/components/schemas/A"}}}}
+    with pytest.raises(RefCycleError) as excinfo:
+        SpecIndex(data).resolve("#/components/schemas/A")
+    assert excinfo.value.chain == ["#/components/schemas/A", "#/components/schemas/A"]
+
+
+def test_get_with_refs_detects_mutual_reference():
+    data = {
+        "components": {
+            "schemas": {
+                "A": {"$ref": "#/components/schemas/B"},
+                "B": {"$ref": "#/components/schemas/A"},
+            }
+        }
+    }
+    with pytest.raises(RefCycleError) as excinfo:
+        get_with_refs(data, ["components", "schemas", "A"])
+    # Following A's ref starts the chain at B
+    assert excinfo.value.chain == [
+        "#/components/schemas/B",
+        "#/components/schemas/A",
+        "#/components/schemas/B",
+    ]
+    assert "#/components/schemas/B -> #/components/schemas/A" in str(excinfo.value)
+
+
+def test_spec_index_detects_cycle_through_pointer_prefix():
+    # Resolving A/b needs A, which points back at A/b
+    data = {"A": {"$ref": "#/A/b"}}
+    with pytest.raises(RefCycleError):
+        SpecIndex(data).resolve("#/A/b")
+
+
+def test_spec_index_long_alias_chain():
+    length = 5000
+    schemas = {f"S{i}": {"$ref": f"#/components/schemas/S{i + 1}"} for i in range(length)}
+    schemas[f"S{length}"] = {"type": "string"}
+    data = {"components": {"schemas": schemas}}
+    index = SpecIndex(data)
+
+    # Deeper than the recursion limit, but resolved without recursion
+    assert index.resolve("#/components/schemas/S0") == {"type": "string"}
+    # Every alias on the chain resolves to the same schema, from the end of the chain too
+    assert index.resolve("#/components/schemas/S2500") == {"type": "string"}
+    assert index.get(data, ["components", "schemas", f"S{length - 1}", "type"]) == "string"
+
+
+def test_spec_index_ref_through_aliased_parent():
+    data = {
+        "components": {
+            "schemas": {
+                "Pet": {"properties": {"name": {"type": "string"}}},
+                "Animal": {"$ref": "#/components/schemas/Pet"},
+            }
+        },
+        "alias": {"$ref": "#/components/schemas/Animal/properties/name"},
+    }
+    assert SpecIndex(data).get(data, ["alias", "type"]) == "string"
@@ -0,0 +1,161 @@
+import json
+import pytest
+from click.testing import CliRunner
+from api_browser import summary, urls
+from api_browser.operations import OperationIndex, PathTrie
+
+SPEC = {
+    "paths": {
+        "/customers": {
+            "get": {"operationId": "listCustomers", "tags": ["customers"]},
+            "post": {"operationId": "createCustomer", "tags": ["customers"]},
+        },
+        "/customers/{id}": {
+            "parameters": [{"name": "id", "in": "path"}],
+            "get": {"operationId": "getCustomer", "tags": ["customers"]},
+            "delete": {"operationId": "deleteCustomer", "tags": ["customers", "admin"]},
+        },
+        "/customers-v2": {
+            "get": {"operationId": "listCustomersV2", "tags": ["customers"]},
+        },
+        "/orders": {
+            "get": {"operationId": "listOrders", "tags": ["orders"]},
+        },
+    },
+}
+
+
+@pytest.fixture
+def spec():
+    return SPEC
+
+
+def test_trie_matches_whole_segments():
+    trie = PathTrie(SPEC["paths"])
+
+    assert sorted(trie.paths_under("/customers")) == ["/customers", "/customers/{id}"]
+    assert sorted(trie.paths_under("/customers/")) == ["/customers", "/customers/{id}"]
+    assert list(trie.paths_under("/cust")) == []
+    assert len(list(trie.paths_under("/"))) == 4
+
+
+def test_select_combines_filters():
+    index = OperationIndex(SPEC)
+
+    assert index.select(path_prefix="/customers") == [
+        ("/customers", "get"),
+        ("/customers", "post"),
+        ("/customers/{id}", "get"),
+        ("/customers/{id}", "delete"),
+    ]
+    assert index.select(methods=["GET"], tags=["customers"], path_prefix="/customers/{id}") == [("/customers/{id}", "get")]
+    assert index.select(tags=["admin", "orders"]) == [("/customers/{id}", "delete"), ("/orders", "get")]
+    assert index.select(operation_ids=["listOrders", "missing"]) == [("/orders", "get")]
+    assert index.select(tags=["missing"]) == []
+
+
+def test_select_sorts_by_path():
+    index = OperationIndex(SPEC)
+
+    assert [key[0] for key in index.select(methods=["get"], sort=True)] == [
+        "/customers", "/customers-v2", "/customers/{id}", "/orders",
+    ]
+
+
+def test_summary_filters(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--format", "jsonl", "--path-prefix", "/customers", "--method", "delete"])
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [record["operation_id"] for record in records] == ["deleteCustomer"]
+
+
+def test_summary_filter_without_matches(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--tag", "missing"])
+
+    assert result.exit_code == 0
+    assert "Path" in result.output
+    assert "/orders" not in result.output
+
+
+def test_urls_filters(spec_file):
+    result = CliRunner().invoke(urls, [spec_file, "--tag", "customers", "--method", "get"])
+
+    assert result.exit_code == 0
+    assert result.output == (
+        "├── customers (listCustomers)\n"
+        "│   └── {id} (getCustomer)\n"
+        "└── customers-v2 (listCustomersV2)\n"
+    )
+
+
+def test_trie_keeps_children_sorted():
+    trie = PathTrie(["/b", "/a/z", "/c", "/a/y", "/a"])
+
+    assert trie.root.segments == ["a", "b", "c"]
+    assert trie.find("/a").segments == ["y", "z"]
+    assert trie.find("/a").paths == ["/a"]
+    assert trie.find("/a/y").paths == ["/a/y"]
+
+
+def test_urls_prefix_and_depth(spec_file):
+    result = CliRunner().invoke(urls, [spec_file, "--prefix", "/customers", "--depth", "1"])
+
+    assert result.exit_code == 0
+    assert result.output == (
+        "/customers (createCustomer, listCustomers)\n"
+        "└── {id} (deleteCustomer, getCustomer)\n"
+    )
+
+
+def test_urls_depth(spec_file):
+    result = CliRunner().invoke(urls, [spec_file, "--depth", "1"])
+
+    assert result.exit_code == 0
+    assert "{id}" not in result.output
+    assert result.output.startswith("├── customers (createCustomer, listCustomers)\n")
+
+
+def test_urls_unknown_prefix(spec_file):
+    result = CliRunner().invoke(urls, [spec_file, "--prefix", "/missing"])
+
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+DEEP_PATH = "/" + "/".join(f"s{i}" for i in range(2000))
+
+
+@pytest.mark.parametrize("spec", [{"paths": {DEEP_PATH: {"get": {"operationId": "deep"}}}}])
+def test_urls_deep_paths(spec_file):
+    result = CliRunner().invoke(urls, [spec_file])
+
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1].endswith("└── s1999 (deep)")
+
+
+PATH_ITEM_FIELDS_SPEC = {
+    "paths": {
+        "/pets": {
+            "summary": "Pets",
+            "description": "Everything about pets",
+            "servers": [{"url": "https://pets.example.com"}],
+            "parameters": [],
+            "get": {"operationId": "listPets", "responses": {"200": {"description": "OK"}}},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize("spec", [PATH_ITEM_FIELDS_SPEC])
+def test_path_item_fields_are_not_operations(spec_file):
+    runner = CliRunner()
+    unfiltered = runner.invoke(summary, [spec_file, "--format", "jsonl"])
+    filtered = runner.invoke(summary, [spec_file, "--format", "jsonl", "--method", "get"])
+
+    assert unfiltered.exit_code == 0
+    assert [json.loads(line)["method"] for line in unfiltered.output.splitlines()] == ["GET"]
+    assert unfiltered.output == filtered.output
+
+    result = runner.invoke(urls, [spec_file])
+    assert result.output == "└── pets (listPets)\n"
@@ -0,0 +1,65 @@
+import os
+import sys
+from api_browser.openapi import SpecIndex
+from api_browser.render import render_schema_tree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks"))
+
+from generate_spec import diamond_spec  # noqa: E402
+
+
+def ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def render(spec, name, **kwargs):
+    return render_schema_tree(spec["components"]["schemas"][name], SpecIndex(spec), **kwargs)
+
+
+def test_render_schema_tree_expands_diamonds():
+    lines = render(diamond_spec(3), "L0A")
+    # Every path through the diamond is expanded: 2 + 4 + 8 ref lines, plus 8 leaves
+    assert len(lines) == 2 + 4 + 8 + 8
+
+
+def test_render_schema_tree_collapse_repeated():
+    lines = render(diamond_spec(3), "L0A", collapse_repeated=True)
+    assert lines == [
+        "├── left (L1A)",
+        "│   ├── left (L2A)",
+        "│   │   ├── left (L3A)",
+        "│   │   │   └── id (integer)",
+        "│   │   └── right (L3B)",
+        "│   │       └── id (integer)",
+        "│   └── right (L2B)",
+        "│       ├── left (L3A) [see above]",
+        "│       └── right (L3B) [see above]",
+        "└── right (L1B)",
+        "    ├── left (L2A) [see above]",
+        "    └── right (L2B) [see above]",
+    ]
+
+
+def test_render_schema_tree_collapse_scales_linearly():
+    # Four lines per layer instead of 2 ** 40 paths
+    lines = render(diamond_spec(40), "L0A", collapse_repeated=True)
+    assert len(lines) == 4 * 40
+
+
+def test_render_schema_tree_max_depth():
+    spec = diamond_spec(3)
+    assert render(spec, "L0A", max_depth=1) == ["├── left (L1A)", "└── right (L1B)"]
+    assert len(render(spec, "L0A", max_depth=2)) == 2 + 4
+
+
+def test_render_schema_tree_max_depth_composites():
+    spec = {
+        "components": {
+            "schemas": {
+                "Pet": {"allOf": [ref("Base"), {"type": "object", "properties": {"name": {"type": "string"}}}]},
+                "Base": {"properties": {"id": {"type": "integer"}}},
+            }
+        }
+    }
+    assert render(spec, "Pet", max_depth=1) == ["(allOf)"]
+    assert render(spec, "Pet", max_depth=2) == ["(allOf)", "    └── (Base)", "    └── (object)"]
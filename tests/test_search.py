@@ -0,0 +1,123 @@
+import pytest
+from click.testing import CliRunner
+from api_browser import cli, search
+from api_browser import search_index as search_module
+from api_browser.search_index import SearchIndex, load_search_index, tokenize
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Shop", "version": "1.0.0"},
+    "paths": {
+        "/customers": {
+            "get": {"operationId": "listCustomers", "tags": ["customers"], "summary": "List customers"},
+        },
+        "/customers/{id}/invoices": {
+            "get": {
+                "operationId": "listInvoices",
+                "tags": ["billing"],
+                "description": "Invoices sent to a customer",
+            },
+        },
+        "/orders": {
+            "post": {"operationId": "createOrder", "tags": ["orders"]},
+        },
+    },
+    "components": {
+        "schemas": {
+            "Customer": {"type": "object", "properties": {"email": {"type": "string"}}},
+            "Invoice": {
+                "type": "object",
+                "properties": {
+                    "customerId": {"type": "string"},
+                    "lines": {"type": "array", "items": {"type": "object", "properties": {"amountDue": {"type": "number"}}}},
+                },
+            },
+        }
+    },
+}
+
+
+@pytest.fixture
+def spec():
+    return SPEC
+
+
+def labels(results):
+    return [label for _, _, label, _ in results]
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("listPetOwners /pets/{id} HTTPStatus") == [
+        "listpetowners", "list", "pet", "owners", "pets", "id", "httpstatus", "http", "status",
+    ]
+
+
+def test_search_ranks_names_above_descriptions():
+    index = SearchIndex.build(SPEC)
+
+    results = index.search("invoices")
+
+    assert labels(results) == ["GET /customers/{id}/invoices"]
+    assert labels(index.search("invoice")) == ["Invoice", "GET /customers/{id}/invoices"]
+
+
+def test_search_requires_every_term():
+    index = SearchIndex.build(SPEC)
+
+    assert labels(index.search("customers billing")) == ["GET /customers/{id}/invoices"]
+    assert index.search("customers shipping") == []
+
+
+def test_search_matches_prefixes_and_nested_properties():
+    index = SearchIndex.build(SPEC)
+
+    assert labels(index.search("amount")) == ["Invoice"]
+    assert labels(index.search("cust", kind="schema")) == ["Customer", "Invoice"]
+    assert labels(index.search("create")) == ["POST /orders"]
+
+
+def test_search_index_is_cached(spec_file, monkeypatch):
+    load_search_index(spec_file)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the spec was loaded again")
+
+    monkeypatch.setattr(search_module, "load_spec", fail)
+    assert labels(load_search_index(spec_file).search("email")) == ["Customer"]
+
+
+def test_search_command(spec_file):
+    result = CliRunner().invoke(search, [spec_file, "list", "customers"])
+
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0].endswith("operation  GET /customers (listCustomers)")
+
+
+def test_search_command_without_matches(spec_file):
+    result = CliRunner().invoke(search, [spec_file, "shipping"])
+
+    assert result.exit_code == 1
+    assert "No matches for 'shipping'" in result.output
+
+
+def test_search_in_shell(spec_file):
+    runner = CliRunner()
+    expected = runner.invoke(search, [spec_file, "invoice", "--kind", "schema"]).output
+
+    result = runner.invoke(cli, ["shell", spec_file], input="search invoice --kind schema\n")
+
+    assert result.output == expected
+
+
+CYCLIC_SPEC = {
+    "paths": {"/pets": {"$ref": "#/components/pathItems/A"}},
+    "components": {"pathItems": {"A": {"$ref": "#/components/pathItems/B"}, "B": {"$ref": "#/components/pathItems/A"}}},
+}
+
+
+@pytest.mark.parametrize("spec", [CYCLIC_SPEC])
+def test_search_command_reports_circular_refs(spec_file):
+    result = CliRunner().invoke(search, [spec_file, "pets", "--no-cache"])
+
+    assert result.exit_code == 1
+    assert "Circular $ref chain: #/components/pathItems/A -> #/components/pathItems/B -> #/components/pathItems/A" in result.output
@@ -0,0 +1,667 @@
+import gzip
+import json
+import os
+import pytest
+import re
+import socket
+import threading
+import urllib.error
+import urllib.request
+import yaml
+from click.testing import CliRunner
+from flask import render_template
+from pathlib import Path
+from api_browser import app, cli
+from api_browser import server as server_module
+from api_browser.assets import SpecRegistry, StaticAsset, discover_specs, is_spec_collection, precompress
+from api_browser.events import EventServer
+from api_browser.server import IMMUTABLE, make_server, reloads, static_dir, _reload_changed_specs
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_read_openapi_yaml(tmp_path, client):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump({"openapi": "3.0.0"}))
+    app.config["OPENAPI_FILENAME"] = str(spec_file)
+
+    response = client.get("/openapi")
+    assert response.status_code == 200
+    assert response.mimetype == "application/yaml"
+    assert yaml.safe_load(response.data) == {"openapi": "3.0.0"}
+
+
+def test_read_openapi_json(tmp_path, client):
+    spec_file = tmp_path / "openapi.json"
+    spec_file.write_text(json.dumps({"openapi": "3.0.0"}))
+    app.config["OPENAPI_FILENAME"] = str(spec_file)
+
+    response = client.get("/openapi")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {"openapi": "3.0.0"}
+
+
+def big_spec():
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Big", "version": "1.0.0"},
+        "paths": {f"/things/{i}": {"get": {"operationId": f"getThing{i}"}} for i in range(100)},
+    }
+
+
+@pytest.fixture
+def spec():
+    return big_spec()
+
+
+@pytest.fixture
+def spec_file(spec_file):
+    """The shared spec file, served by the app."""
+    app.config["OPENAPI_FILENAME"] = spec_file
+    return Path(spec_file)
+
+
+def test_read_openapi_conditional(spec_file, client):
+    response = client.get("/openapi")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert "Last-Modified" in response.headers
+
+    response = client.get("/openapi", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    response = client.get("/openapi", headers={"If-None-Match": '"something-else"'})
+    assert response.status_code == 200
+
+
+def test_read_openapi_reloads_on_change(spec_file, client):
+    etag = client.get("/openapi").headers["ETag"]
+
+    spec_file.write_text(yaml.dump({"openapi": "3.0.0", "info": {"title": "Changed"}}))
+    os.utime(spec_file, ns=(0, 10**18))
+
+    response = client.get("/openapi", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert yaml.safe_load(response.data)["info"]["title"] == "Changed"
+
+
+def test_read_openapi_compressed(spec_file, client):
+    response = client.get("/openapi", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert yaml.safe_load(gzip.decompress(response.data)) == big_spec()
+
+    plain = client.get("/openapi", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] != response.headers["ETag"]
+
+
+def test_read_openapi_brotli(spec_file, client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/openapi", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert yaml.safe_load(brotli.decompress(response.data)) == big_spec()
+
+
+def test_read_openapi_json_rendering(spec_file, client):
+    response = client.get("/openapi.json")
+    assert response.mimetype == "application/json"
+    assert response.get_json() == big_spec()
+
+    etag = response.headers["ETag"]
+    assert client.get("/openapi.json", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_read_openapi_json_falls_back_on_parse_errors(tmp_path, client):
+    spec_file = tmp_path / "broken.yaml"
+    spec_file.write_text("openapi: [3.0.0\n")
+    app.config["OPENAPI_FILENAME"] = str(spec_file)
+
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert response.data == b"openapi: [3.0.0\n"
+
+
+def test_openapi_documentation_uses_json_rendering(spec_file, client):
+    response = client.get("/openapi-documentation")
+    assert b'spec-url="/openapi.json"' in response.data
+
+
+@pytest.fixture
+def event_server():
+    server = EventServer(reloads)
+    server.start()
+    yield server
+    server.stop()
+    server.join(timeout=5)
+
+
+def open_stream(port: int) -> socket.socket:
+    """Connect to the event server and read up to the end of the stream's headers."""
+    return open_stream_with_headers(port)[0]
+
+
+def open_stream_with_headers(port: int, headers: bytes = b"") -> tuple:
+    stream = socket.create_connection(("127.0.0.1", port), timeout=5)
+    stream.sendall(b"GET /events HTTP/1.1\r\nHost: localhost:%d\r\nAccept: text/event-stream\r\n%s\r\n" % (port, headers))
+    data = b""
+    while b"retry: 1000\n\n" not in data:
+        data += stream.recv(4096)
+    assert data.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"Content-Type: text/event-stream\r\n" in data
+    return stream, data
+
+
+def test_events_stream_pushes_reloads(event_server):
+    streams = [open_stream(event_server.port) for _ in range(50)]
+    try:
+        # Every stream is served by the event server's one thread
+        assert event_server.streams == 50
+        reloads.publish("openapi.yaml")
+        for stream in streams:
+            assert stream.recv(4096) == b"event: reload\ndata: openapi.yaml\n\n"
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+def test_events_server_only_allows_pages_from_the_same_host(event_server):
+    stream, data = open_stream_with_headers(event_server.port, b"Origin: http://localhost:5000\r\n")
+    stream.close()
+    assert b"Access-Control-Allow-Origin: http://localhost:5000\r\n" in data
+
+    for headers in (b"Origin: http://evil.test\r\n", b""):
+        stream, data = open_stream_with_headers(event_server.port, headers)
+        stream.close()
+        assert b"Access-Control-Allow-Origin" not in data
+
+
+def test_events_server_rejects_other_requests(event_server):
+    with socket.create_connection(("127.0.0.1", event_server.port), timeout=5) as connection:
+        connection.sendall(b"GET /openapi HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        assert connection.recv(4096).startswith(b"HTTP/1.1 404 Not Found")
+
+
+def test_reload_requires_valid_spec(spec_file, caplog):
+    version = reloads.version
+    spec_file.write_text("openapi: [3.0.0\n")
+    _reload_changed_specs({str(spec_file)})
+    assert reloads.version == version
+    assert [record.getMessage().startswith(f"Not reloading {spec_file}") for record in caplog.records] == [True]
+
+    spec_file.write_text("openapi: 3.0.0\n")
+    _reload_changed_specs({str(spec_file)})
+    assert reloads.version == version + 1
+
+
+def test_reload_skips_only_the_broken_specs(tmp_path, caplog):
+    broken = tmp_path / "a.yaml"
+    broken.write_text("openapi: [3.0.0\n")
+    valid = tmp_path / "b.yaml"
+    valid.write_text("openapi: 3.0.0\n")
+    version = reloads.version
+
+    _reload_changed_specs({str(broken), str(valid)})
+
+    assert reloads.wait(version, 0) == (version + 1, "b.yaml")
+    assert [record.getMessage().startswith(f"Not reloading {broken}") for record in caplog.records] == [True]
+
+
+@pytest.fixture
+def live_reload():
+    app.config["LIVE_RELOAD"] = True
+    yield
+    app.config.pop("LIVE_RELOAD")
+
+
+def test_openapi_documentation_live_reload(spec_file, client, live_reload):
+    page = client.get("/openapi-documentation").data
+    # The stream comes from the same origin as the page
+    assert b'new EventSource("/events")' in page
+
+
+def test_events_route_pushes_reloads(client, live_reload):
+    response = client.get("/events", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    stream = iter(response.response)
+    assert next(stream) == b"retry: 1000\n\n"
+
+    threading.Timer(0.05, reloads.publish, args=("openapi.yaml",)).start()
+    assert next(stream) == b"event: reload\ndata: openapi.yaml\n\n"
+    response.close()
+
+
+def test_events_route_needs_live_reload(client):
+    assert client.get("/events").status_code == 404
+
+
+def test_openapi_documentation_live_reload_on_event_server(spec_file, client):
+    assert b"EventSource" not in client.get("/openapi-documentation").data
+    app.config["EVENTS_PORT"] = 5001
+    try:
+        page = client.get("/openapi-documentation", base_url="http://example.test:5000").data
+        assert b'new EventSource("http://example.test:5001/events")' in page
+    finally:
+        del app.config["EVENTS_PORT"]
+
+
+@pytest.mark.parametrize("production", [False, True])
+def test_make_server_is_ready_before_serving(spec_file, production):
+    if production:
+        pytest.importorskip("waitress")
+    server = make_server("127.0.0.1", 0, production=production, threads=2)
+    try:
+        assert server.port != 0
+        # The socket accepts connections before serve_forever is running
+        socket.create_connection(("127.0.0.1", server.port), timeout=1).close()
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        with urllib.request.urlopen(f"{server.url}/openapi.json", timeout=5) as response:
+            assert json.loads(response.read()) == big_spec()
+    finally:
+        server.shutdown()
+
+
+def test_open_pages_dont_starve_the_production_server(spec_file, event_server):
+    pytest.importorskip("waitress")
+    server = make_server("127.0.0.1", 0, production=True, threads=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    streams = [open_stream(event_server.port) for _ in range(10)]
+    try:
+        with urllib.request.urlopen(f"{server.url}/openapi", timeout=5) as response:
+            assert response.status == 200
+        # The WSGI server has no streams of its own for pages to hold on to
+        with pytest.raises(urllib.error.HTTPError, match="404"):
+            urllib.request.urlopen(f"{server.url}/events", timeout=5)
+    finally:
+        for stream in streams:
+            stream.close()
+        server.shutdown()
+
+
+@pytest.fixture
+def specs_dir(tmp_path):
+    specs = tmp_path / "specs"
+    (specs / "team").mkdir(parents=True)
+    (specs / "pets.yaml").write_text(yaml.dump({"openapi": "3.0.0", "info": {"title": "Pets"}}))
+    (specs / "users.json").write_text(json.dumps({"openapi": "3.0.0", "info": {"title": "Users"}}))
+    (specs / "team" / "billing.yml").write_text(yaml.dump({"openapi": "3.0.0", "info": {"title": "Billing"}}))
+    (specs / "notes.txt").write_text("not a spec")
+    app.config["OPENAPI_SOURCE"] = str(specs)
+    yield specs
+    app.config.pop("OPENAPI_SOURCE")
+    app.config.pop("SPEC_CACHE_SIZE", None)
+
+
+def test_discover_specs(specs_dir):
+    assert list(discover_specs(str(specs_dir))) == ["pets", "users"]
+    assert list(discover_specs(str(specs_dir / "**" / "*.y*ml"))) == ["pets", "team/billing"]
+    assert is_spec_collection(str(specs_dir))
+    assert is_spec_collection(str(specs_dir / "*.yaml"))
+    assert not is_spec_collection(str(specs_dir / "pets.yaml"))
+
+
+def test_spec_registry_loads_lazily(specs_dir):
+    registry = SpecRegistry(str(specs_dir))
+    assert registry.scan() == ["pets", "users"]
+    assert registry.nbytes == 0
+
+    pets = registry.get("pets")
+    assert registry.nbytes == 0
+    pets.current()
+    assert registry.nbytes == os.path.getsize(specs_dir / "pets.yaml")
+    assert registry.get("pets") is pets
+    assert registry.get("missing") is None
+
+
+def test_spec_registry_trims_least_recently_used(specs_dir):
+    registry = SpecRegistry(str(specs_dir), max_bytes=os.path.getsize(specs_dir / "users.json"))
+    registry.scan()
+    pets = registry.get("pets")
+    pets.current()
+    registry.get("users").current()
+    registry.trim()
+
+    assert list(registry._assets) == ["users"]
+    assert registry.get("pets") is not pets
+
+
+def test_spec_registry_finds_new_files(specs_dir):
+    registry = SpecRegistry(str(specs_dir), rescan_interval=0)
+    registry.scan()
+    changes = []
+    registry.on_change = changes.append
+    (specs_dir / "orders.yaml").write_text(yaml.dump({"openapi": "3.0.0"}))
+
+    assert registry.get("orders") is not None
+    assert registry.name_for(str(specs_dir / "orders.yaml")) == "orders"
+    assert changes == [registry.paths()]
+    assert str(specs_dir / "orders.yaml") in changes[0]
+
+
+def test_spec_registry_rescans_at_most_once_per_interval(specs_dir, monkeypatch):
+    registry = SpecRegistry(str(specs_dir), rescan_interval=60)
+    registry.scan()
+    scans = []
+    original = registry.scan
+    monkeypatch.setattr(registry, "scan", lambda: scans.append(1) or original())
+
+    for _ in range(100):
+        assert registry.get("missing") is None
+    assert scans == []
+
+    registry._scanned_at -= 60
+    (specs_dir / "orders.yaml").write_text(yaml.dump({"openapi": "3.0.0"}))
+    assert registry.get("orders") is not None
+    assert registry.get("missing") is None
+    assert scans == [1]
+
+
+def test_index_lists_specs(specs_dir, client):
+    response = client.get("/")
+    assert response.status_code == 200
+    assert b'href="/specs/pets/documentation"' in response.data
+    assert b'href="/specs/users/documentation"' in response.data
+
+
+def test_index_redirects_for_single_spec(spec_file, client):
+    response = client.get("/")
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/openapi-documentation")
+
+
+def test_read_spec_from_collection(specs_dir, client):
+    response = client.get("/specs/pets/openapi")
+    assert response.status_code == 200
+    assert response.mimetype == "application/yaml"
+
+    response = client.get("/specs/pets/openapi.json")
+    assert response.get_json()["info"]["title"] == "Pets"
+
+    response = client.get("/specs/pets/documentation")
+    assert b'spec-url="/specs/pets/openapi.json"' in response.data
+
+    assert client.get("/specs/missing/openapi").status_code == 404
+    assert client.get("/specs/missing/documentation").status_code == 404
+
+
+def test_read_spec_from_collection_reloads_on_change(specs_dir, client):
+    etag = client.get("/specs/pets/openapi.json").headers["ETag"]
+
+    (specs_dir / "pets.yaml").write_text(yaml.dump({"openapi": "3.0.0", "info": {"title": "Changed"}}))
+    os.utime(specs_dir / "pets.yaml", ns=(0, 10**18))
+
+    response = client.get("/specs/pets/openapi.json", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["info"]["title"] == "Changed"
+
+
+def test_reload_publishes_spec_names(specs_dir):
+    version = reloads.version
+    _reload_changed_specs({str(specs_dir / "pets.yaml")})
+    assert reloads.wait(version, 1) == (version + 1, "pets")
+
+
+def test_documentation_uses_bundled_redoc(spec_file, client):
+    response = client.get("/openapi-documentation")
+    assert b"cdn.redoc.ly" not in response.data
+    assert b"fonts.googleapis.com" not in response.data
+
+    script_url = static_url_from(response.data)
+    response = client.get(script_url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.mimetype in ("application/javascript", "text/javascript")
+    assert response.headers["Cache-Control"] == IMMUTABLE
+    assert response.content_encoding == "gzip"
+    with open(os.path.join(static_dir, "redoc", "redoc.standalone.js.gz"), "rb") as f:
+        assert response.data == f.read()
+
+
+def test_documentation_google_fonts(spec_file, client):
+    app.config["GOOGLE_FONTS"] = True
+    try:
+        assert b"fonts.googleapis.com" in client.get("/openapi-documentation").data
+    finally:
+        app.config["GOOGLE_FONTS"] = False
+
+
+def test_static_asset_with_old_fingerprint(client):
+    response = client.get("/assets/0123456789ab/redoc/redoc.standalone.js")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    assert client.get("/assets/0123456789ab/redoc/missing.js").status_code == 404
+    assert client.get("/assets/0123456789ab/../server.py").status_code == 404
+
+
+def test_static_asset_ignores_stale_precompressed_copy(tmp_path):
+    path = tmp_path / "app.js"
+    path.write_text("var a = 1;" * 100)
+    precompress(str(path))
+    path.write_text("var b = 2;" * 100)
+
+    version = StaticAsset(str(path)).current()
+    assert gzip.decompress(version.encoded("gzip")) == path.read_bytes()
+
+
+def static_url_from(page: bytes) -> str:
+    match = re.search(rb'<script src="(/assets/[^"]+)"', page)
+    return match.group(1).decode()
+
+
+API_SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "listPets",
+                "tags": ["pets"],
+                "responses": {"200": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}}},
+            },
+            "post": {
+                "operationId": "createPet",
+                "tags": ["pets"],
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                "responses": {"201": {"description": "Created"}},
+            },
+        },
+        "/pets/{id}": {"get": {"operationId": "getPet", "responses": {"200": {"description": "OK"}}}},
+        "/owners": {"get": {"operationId": "listOwners", "responses": {"200": {"description": "OK"}}}},
+    },
+    "components": {
+        "schemas": {
+            "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+            "Owner": {"type": "object", "properties": {"name": {"type": "string"}}},
+        }
+    },
+}
+
+
+@pytest.fixture
+def api_spec_file(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(API_SPEC))
+    app.config["OPENAPI_FILENAME"] = str(spec_file)
+    return spec_file
+
+
+def test_api_summary(api_spec_file, client):
+    response = client.get("/api/summary")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["title"] == "Pets"
+    assert [op["operation_id"] for op in data["operations"]] == ["listOwners", "listPets", "createPet", "getPet"]
+    assert data["operations"][2] == {
+        "path": "/pets",
+        "method": "POST",
+        "operation_id": "createPet",
+        "status": "201",
+        "request_schema": "Pet",
+        "response_schema": "(none)",
+    }
+
+
+def test_api_summary_filters(api_spec_file, client):
+    response = client.get("/api/summary?tag=pets&method=GET&sort=false")
+
+    assert [op["operation_id"] for op in response.get_json()["operations"]] == ["listPets"]
+
+
+def test_api_schemas(api_spec_file, client):
+    response = client.get("/api/schemas")
+
+    assert response.get_json() == {
+        "schemas": [
+            {"name": "Owner", "referenced_by": ["Pet"], "requests": [], "responses": []},
+            {"name": "Pet", "referenced_by": [], "requests": ["createPet"], "responses": ["listPets"]},
+        ]
+    }
+
+
+def test_api_schema(api_spec_file, client):
+    response = client.get("/api/schemas/Pet")
+
+    data = response.get_json()
+    assert data["requests"] == ["createPet"]
+    assert data["tree"] == ["└── owner (Owner)", "    └── name (string)"]
+
+    response = client.get("/api/schemas/Pet?max_depth=1")
+    assert response.get_json()["tree"] == ["└── owner (Owner)"]
+
+
+def test_api_schema_errors(api_spec_file, client):
+    response = client.get("/api/schemas/Missing")
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Schema 'Missing' not found"}
+
+    response = client.get("/api/schemas/Pet?max_depth=zero")
+    assert response.status_code == 400
+
+
+def test_api_urls(api_spec_file, client):
+    response = client.get("/api/urls?prefix=/pets")
+
+    assert response.get_json() == {
+        "path": "/pets",
+        "operations": ["createPet", "listPets"],
+        "children": [{"segment": "{id}", "path": "/pets/{id}", "operations": ["getPet"], "children": []}],
+    }
+
+    response = client.get("/api/urls?depth=1")
+    assert [child["segment"] for child in response.get_json()["children"]] == ["owners", "pets"]
+    assert response.get_json()["children"][1]["children"] == []
+
+
+def test_api_is_conditional(api_spec_file, client):
+    etag = client.get("/api/summary").headers["ETag"]
+
+    response = client.get("/api/summary", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_api_rebuilds_once_per_change(api_spec_file, client, monkeypatch):
+    from api_browser import assets
+
+    client.get("/api/summary")
+    loaded = []
+    load_spec = assets.load_spec
+
+    def counting_load_spec(path):
+        loaded.append(path)
+        return load_spec(path)
+
+    monkeypatch.setattr(assets, "load_spec", counting_load_spec)
+    api_spec_file.write_text(yaml.dump(dict(API_SPEC, info={"title": "Changed", "version": "2.0.0"})))
+    os.utime(api_spec_file, ns=(0, 10**18))
+
+    results = []
+
+    def query():
+        with app.test_client() as thread_client:
+            results.append(thread_client.get("/api/summary").get_json()["title"])
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["Changed"] * 8
+    assert len(loaded) == 1
+
+
+def test_api_reports_parse_errors(tmp_path, client):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("paths: [unclosed")
+    app.config["OPENAPI_FILENAME"] = str(spec_file)
+
+    response = client.get("/api/summary")
+
+    assert response.status_code == 422
+    assert "can't be parsed" in response.get_json()["error"]
+
+
+def test_spec_with_external_refs(tmp_path, client):
+    common_file = tmp_path / "common.yaml"
+    common_file.write_text(yaml.dump({"components": {"schemas": {"Owner": {"type": "object"}}}}))
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(dict(API_SPEC, components={"schemas": {"Pet": {
+        "type": "object", "properties": {"owner": {"$ref": "./common.yaml#/components/schemas/Owner"}},
+    }}})))
+    app.config["OPENAPI_FILENAME"] = str(spec_file)
+
+    # Browsers can't follow refs to other files, so the served spec is bundled
+    spec = client.get("/openapi.json").get_json()
+    assert spec["components"]["schemas"]["Pet"]["properties"]["owner"] == {"$ref": "#/components/schemas/Owner"}
+    assert spec["components"]["schemas"]["Owner"] == {"type": "object"}
+    assert client.get("/api/schemas/Pet").get_json()["tree"] == ["└── owner (Owner)"]
+
+    common_file.write_text(yaml.dump({"components": {"schemas": {"Owner": {
+        "type": "object", "properties": {"name": {"type": "string"}},
+    }}}}))
+    os.utime(common_file, ns=(0, 10**18))
+    assert client.get("/api/schemas/Pet").get_json()["tree"] == ["└── owner (Owner)", "    └── name (string)"]
+    assert "name" in client.get("/openapi.json").get_json()["components"]["schemas"]["Owner"]["properties"]
+
+
+@pytest.mark.parametrize("args, expected", [
+    ([], [(None,)]),
+    (["--production"], []),
+    (["--production", "--reload", "--events-port", "5001"], [(5001,)]),
+    (["--no-reload"], []),
+])
+def test_serve_reload_options(spec_file, monkeypatch, args, expected):
+    class FakeServer:
+        url = "http://127.0.0.1:5000"
+
+        def serve_forever(self):
+            pass
+
+        def shutdown(self):
+            pass
+
+    calls = []
+    monkeypatch.setattr(server_module, "make_server", lambda *args, **kwargs: FakeServer())
+    monkeypatch.setattr(server_module, "start_live_reload", lambda paths, host, events_port=None: calls.append((events_port,)))
+
+    result = CliRunner().invoke(cli, ["openapi", str(spec_file), "--no-browser", *args])
+
+    assert result.exit_code == 0, result.output
+    # Live reload is off by default with --production, where streams would hold worker threads
+    assert calls == expected
+
+
+def test_events_url_is_escaped_in_the_page():
+    with app.test_request_context():
+        page = render_template("redoc.html", spec_url="/openapi.json", spec_name=None, events_url='http://a"b</script>/events')
+    assert 'new EventSource("http://a\\"b\\u003c/script\\u003e/events")' in page
@@ -0,0 +1,142 @@
+import time
+from pathlib import Path
+import pytest
+import yaml
+from click.testing import CliRunner
+from api_browser import cli, schema, summary, urls
+from api_browser import model as model_module
+from api_browser.model import LiveModel, SpecModel, load_model
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "listPets",
+                "tags": ["pets"],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Pet": {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}}},
+        }
+    },
+}
+
+
+@pytest.fixture
+def spec():
+    return SPEC
+
+
+def test_shell_matches_commands(spec_file):
+    runner = CliRunner()
+    expected = "".join(
+        runner.invoke(command, [spec_file, *args]).output
+        for command, args in [(summary, []), (schema, ["Pet"]), (urls, ["--tag", "pets"])]
+    )
+
+    result = runner.invoke(cli, ["shell", spec_file], input="summary\nschema Pet\nurls --tag pets\nexit\n")
+
+    assert result.exit_code == 0
+    assert result.output == expected
+
+
+def test_shell_reports_errors_and_continues(spec_file):
+    result = CliRunner().invoke(
+        cli, ["shell", spec_file], input="bogus\nschema Missing\nschema\nsummary --bad-option\nvalidate\n"
+    )
+
+    assert result.exit_code == 0
+    assert "Unknown command 'bogus'" in result.output
+    assert "Schema 'Missing' not found" in result.output
+    assert "Missing argument 'SCHEMA_NAME'" in result.output
+    assert "No such option '--bad-option'" in result.output
+    assert result.output.endswith("✓ OpenAPI specification is valid\n")
+
+
+def test_live_model_serves_and_reloads(spec_file):
+    live = LiveModel(spec_file).start(warm=False)
+    try:
+        first = load_model(spec_file)
+        assert first is live.model
+        # The same lookup structures are used for every query
+        assert first.graph is load_model(spec_file).graph
+
+        changed = dict(SPEC, info={"title": "Changed", "version": "2.0.0"})
+        Path(spec_file).write_text(yaml.dump(changed))
+        live.reload()
+
+        assert load_model(spec_file) is live.model
+        assert live.model is not first
+        assert live.model.spec["info"]["title"] == "Changed"
+        assert "Title: Changed" in CliRunner().invoke(summary, [spec_file]).output
+    finally:
+        live.stop()
+    assert load_model(spec_file) is not live.model
+
+
+def test_live_model_keeps_last_version_on_errors(spec_file, caplog):
+    live = LiveModel(spec_file)
+    model = live.model
+    Path(spec_file).write_text("paths: [unclosed")
+
+    live._on_change({live.path})
+
+    assert live.model is model
+    assert [record.getMessage().startswith(f"Error reloading {spec_file}") for record in caplog.records] == [True]
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the live model"
+        time.sleep(0.05)
+
+
+def test_live_model_reloads_when_ref_files_change(tmp_path):
+    common = tmp_path / "common.yaml"
+    common.write_text(yaml.dump({"Pet": {"type": "object"}}))
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump({"components": {"schemas": {"Pet": {"$ref": "./common.yaml#/Pet"}}}}))
+
+    live = LiveModel(str(spec_file)).start()
+    try:
+        # The ref files are watched once the warm-up has loaded them
+        wait_until(lambda: str(common) in live._watcher.paths)
+        # and the watcher has switched to them
+        wait_until(lambda: not live._watcher._paths_changed)
+        time.sleep(0.1)
+        first = live.model
+
+        common.write_text(yaml.dump({"Pet": {"type": "string"}}))
+
+        wait_until(lambda: live.model is not first)
+        assert live.model.index.get(live.model.spec, ["components", "schemas", "Pet"]) == {"type": "string"}
+        assert live._watcher.paths == {str(spec_file), str(common)}
+    finally:
+        live.stop()
+
+
+def test_memo_keeps_recent_results(monkeypatch):
+    monkeypatch.setattr(model_module, "MAX_MEMO_ENTRIES", 2)
+    model = SpecModel(SPEC)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key
+
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        assert model.memo(key, lambda: compute(key)) == key
+
+    # "b" was the least recently used when "c" came in
+    assert calls == ["a", "b", "c", "b"]
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import pytest
+import yaml
+from click.testing import CliRunner
+from api_browser import summary
+from api_browser.tables import TableWriter
+
+SPEC = {
+    "info": {"title": "Test API"},
+    "paths": {
+        "/pets": {
+            "post": {
+                "operationId": "createPet",
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                "responses": {"201": {"description": "Created"}},
+            },
+            "get": {
+                "operationId": "listPets",
+                "responses": {"200": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/PetList"}}}}},
+            },
+        },
+        "/owners": {
+            "get": {"operationId": "listOwners", "responses": {"200": {"description": "OK"}}},
+        },
+    },
+}
+
+
+@pytest.fixture
+def spec():
+    return SPEC
+
+
+def test_writer_csv_quotes_values():
+    stream = io.StringIO()
+    writer = TableWriter(stream, ["a", "b"], "csv")
+    writer.write(["x,y", 'say "hi"'])
+    writer.close()
+    assert stream.getvalue() == 'a,b\n"x,y","say ""hi"""\n'
+
+
+def test_writer_json_streams_a_valid_array():
+    stream = io.StringIO()
+    writer = TableWriter(stream, ["a"], "json")
+    writer.write([1])
+    # Each row is written as soon as it arrives
+    assert stream.getvalue() == '[\n  {"a": 1}'
+    writer.write([2])
+    writer.close()
+    assert json.loads(stream.getvalue()) == [{"a": 1}, {"a": 2}]
+
+
+def test_writer_empty_json_array():
+    stream = io.StringIO()
+    TableWriter(stream, ["a"], "json").close()
+    assert json.loads(stream.getvalue()) == []
+
+
+def test_writer_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        TableWriter(io.StringIO(), ["a"], "grid")
+
+
+def test_summary_csv(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--format", "csv"])
+
+    assert result.exit_code == 0
+    rows = list(csv.reader(io.StringIO(result.output)))
+    assert rows == [
+        ["path", "method", "operation_id", "status", "request_schema", "response_schema"],
+        ["/owners", "GET", "listOwners", "200", "(none)", "(none)"],
+        ["/pets", "POST", "createPet", "201", "Pet", "(none)"],
+        ["/pets", "GET", "listPets", "200", "(none)", "PetList"],
+    ]
+
+
+def test_summary_tsv(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--format", "tsv"])
+
+    assert result.exit_code == 0
+    assert result.output.splitlines()[1] == "/owners\tGET\tlistOwners\t200\t(none)\t(none)"
+
+
+def test_summary_jsonl_without_sorting_keeps_file_order(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--format", "jsonl", "--no-sort"])
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [(r["path"], r["method"]) for r in records] == [("/pets", "POST"), ("/pets", "GET"), ("/owners", "GET")]
+    assert records[0]["request_schema"] == "Pet"
+
+
+def test_summary_json(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--format", "json"])
+
+    assert result.exit_code == 0
+    records = json.loads(result.output)
+    assert [r["operation_id"] for r in records] == ["listOwners", "createPet", "listPets"]
+
+
+def test_summary_many_files_adds_file_column(tmp_path):
+    for name in ("a.yaml", "b.yaml"):
+        (tmp_path / name).write_text(yaml.dump(SPEC))
+
+    result = CliRunner().invoke(summary, [str(tmp_path), "--format", "jsonl"])
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines() if line.startswith("{")]
+    assert len(records) == 6
+    assert {r["file"] for r in records} == {str(tmp_path / "a.yaml"), str(tmp_path / "b.yaml")}
+
+
+CYCLIC_SPEC = {
+    "paths": {
+        "/pets": {"get": {"operationId": "listPets", "responses": {"200": {"description": "OK"}}}},
+        "/owners": {"get": {"operationId": "listOwners", "responses": {"200": {"$ref": "#/components/responses/A"}}}},
+    },
+    "components": {"responses": {"A": {"$ref": "#/components/responses/B"}, "B": {"$ref": "#/components/responses/A"}}},
+}
+
+
+@pytest.mark.parametrize("spec", [CYCLIC_SPEC])
+def test_summary_json_is_closed_when_a_row_fails(spec_file):
+    result = CliRunner().invoke(summary, [spec_file, "--format", "json", "--no-sort"])
+
+    assert result.exit_code == 1
+    rows = json.loads(result.stdout)
+    assert [row["operation_id"] for row in rows] == ["listPets"]
+    assert "Circular $ref chain" in result.stderr
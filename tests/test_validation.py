@@ -0,0 +1,235 @@
+import json
+import openapi_spec_validator
+import pytest
+import yaml
+from click.testing import CliRunner
+from api_browser import validate_cmd, validation
+from api_browser.validation import iter_file_errors, iter_spec_errors, validate_file
+
+
+def make_spec(schema_count=5):
+    schemas = {f"Schema{i}": {"type": "object", "properties": {"id": {"type": "integer"}}} for i in range(schema_count)}
+    schemas["Parent"] = {"type": "object", "properties": {"child": {"$ref": "#/components/schemas/Schema0"}}}
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Test", "version": "1.0.0"},
+        "paths": {},
+        "components": {"schemas": schemas},
+    }
+
+
+@pytest.fixture
+def validated(monkeypatch):
+    """Record every document passed to the validator."""
+    documents = []
+    original = openapi_spec_validator.validate
+
+    def validate(spec, *args, **kwargs):
+        documents.append(spec)
+        return original(spec, *args, **kwargs)
+
+    monkeypatch.setattr(openapi_spec_validator, "validate", validate)
+    return documents
+
+
+def test_valid_files_are_cached(tmp_path, validated):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(make_spec()))
+
+    assert validate_file(str(spec_file)) == "full"
+    assert validate_file(str(spec_file)) == "cached"
+    assert len(validated) == 1
+
+    # The same document in another format hits the normalized hash
+    json_file = tmp_path / "openapi.json"
+    json_file.write_text(json.dumps(make_spec(), indent=4))
+    assert validate_file(str(json_file)) == "cached"
+    assert len(validated) == 1
+
+
+def test_invalid_files_are_not_cached(tmp_path, validated):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump({"openapi": "3.0.0", "paths": {}}))
+
+    for _ in range(2):
+        with pytest.raises(Exception, match="'info' is a required property"):
+            validate_file(str(spec_file))
+    assert len(validated) == 2
+
+
+def test_cache_is_keyed_on_validator_version(tmp_path, validated, monkeypatch):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(make_spec()))
+    validate_file(str(spec_file))
+
+    monkeypatch.setattr(validation, "_validator_version", "999.0")
+    assert validate_file(str(spec_file)) == "full"
+    assert len(validated) == 2
+
+
+def test_no_cache_always_validates(tmp_path, validated):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(make_spec()))
+    validate_file(str(spec_file), use_cache=False)
+    validate_file(str(spec_file), use_cache=False)
+    assert len(validated) == 2
+
+
+def test_incremental_only_checks_changed_schemas(tmp_path, validated):
+    spec = make_spec()
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(spec))
+    assert validate_file(str(spec_file), incremental=True) == "full"
+
+    spec["components"]["schemas"]["Schema0"]["properties"]["name"] = {"type": "string"}
+    spec_file.write_text(yaml.dump(spec))
+    assert validate_file(str(spec_file), incremental=True) == "partial"
+
+    # The changed schema, the schema referring to it, and nothing else
+    checked = validated[-1]["components"]["schemas"]
+    assert checked["Schema0"] == spec["components"]["schemas"]["Schema0"]
+    assert checked["Parent"] == spec["components"]["schemas"]["Parent"]
+    assert all(checked[f"Schema{i}"] == {} for i in range(1, 5))
+
+
+def test_incremental_still_reports_errors(tmp_path, validated):
+    spec = make_spec()
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(spec))
+    validate_file(str(spec_file), incremental=True)
+
+    spec["components"]["schemas"]["Schema3"]["required"] = "id"
+    spec_file.write_text(yaml.dump(spec))
+    with pytest.raises(Exception):
+        validate_file(str(spec_file), incremental=True)
+
+
+def test_incremental_checks_everything_when_paths_change(tmp_path, validated):
+    spec = make_spec()
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(spec))
+    validate_file(str(spec_file), incremental=True)
+
+    spec["paths"]["/things"] = {"get": {"responses": {"200": {"description": "OK"}}}}
+    spec_file.write_text(yaml.dump(spec))
+    assert validate_file(str(spec_file), incremental=True) == "full"
+    assert validated[-1] == spec
+
+
+def test_validate_command_uses_cache(tmp_path, validated):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(make_spec()))
+    runner = CliRunner()
+
+    for _ in range(2):
+        result = runner.invoke(validate_cmd, [str(spec_file)])
+        assert result.output == "✓ OpenAPI specification is valid\n"
+    assert len(validated) == 1
+
+    runner.invoke(validate_cmd, [str(spec_file), "--no-cache"])
+    assert len(validated) == 2
+
+
+BROKEN_SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": 1},
+    "paths": {},
+}
+
+
+def test_iter_spec_errors():
+    assert list(iter_spec_errors(BROKEN_SPEC)) == [
+        {"pointer": "/info", "rule": "required", "message": "'version' is a required property"},
+        {"pointer": "/info/title", "rule": "type", "message": "1 is not of type 'string'"},
+    ]
+    assert len(list(iter_spec_errors(BROKEN_SPEC, max_errors=1))) == 1
+    assert list(iter_spec_errors({"paths": {}}))[0]["rule"] == "openapi"
+
+
+def test_validate_command_streams_errors(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(BROKEN_SPEC))
+    runner = CliRunner()
+
+    result = runner.invoke(validate_cmd, [str(spec_file), "--format", "text"])
+    assert result.exit_code == 1
+    assert result.output == (
+        f"{spec_file}#/info: 'version' is a required property [required]\n"
+        f"{spec_file}#/info/title: 1 is not of type 'string' [type]\n"
+    )
+
+    result = runner.invoke(validate_cmd, [str(spec_file), "--format", "jsonl", "--max-errors", "1"])
+    assert result.exit_code == 1
+    assert [json.loads(line) for line in result.output.splitlines()] == [
+        {"file": str(spec_file), "pointer": "/info", "rule": "required", "message": "'version' is a required property"},
+    ]
+
+
+def test_validate_command_streams_errors_for_many_files(tmp_path):
+    (tmp_path / "valid.yaml").write_text(yaml.dump(make_spec()))
+    (tmp_path / "broken.yaml").write_text(yaml.dump(BROKEN_SPEC))
+    runner = CliRunner()
+
+    result = runner.invoke(validate_cmd, [str(tmp_path), "--format", "jsonl"])
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [record["file"] for record in records] == [str(tmp_path / "broken.yaml")] * 2
+
+
+def test_streamed_errors_are_not_cached(tmp_path, validated):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(make_spec()))
+
+    assert list(iter_file_errors(str(spec_file))) == []
+    assert validate_file(str(spec_file)) == "cached"
+
+    spec_file.write_text(yaml.dump(BROKEN_SPEC))
+    assert len(list(iter_file_errors(str(spec_file)))) == 2
+    assert len(list(iter_file_errors(str(spec_file)))) == 2
+
+
+def test_changes_to_referenced_files_invalidate_the_cache(tmp_path, validated):
+    spec = make_spec()
+    spec["components"]["schemas"]["Shared"] = {"$ref": "./common.yaml#/components/schemas/Shared"}
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(spec))
+    common_file = tmp_path / "common.yaml"
+    common_file.write_text(yaml.dump({"components": {"schemas": {"Shared": {"type": "string"}}}}))
+
+    assert validate_file(str(spec_file)) == "full"
+    assert validate_file(str(spec_file)) == "cached"
+    # The validator sees one document with the other file bundled in
+    assert validated[0]["components"]["schemas"]["Shared"] == {"$ref": "#/components/schemas/Shared_common"}
+
+    common_file.write_text(yaml.dump({"components": {"schemas": {"Shared": {"type": "strin"}}}}))
+    with pytest.raises(Exception, match="is not valid"):
+        validate_file(str(spec_file))
+
+
+def test_incremental_reports_refs_to_removed_schemas(tmp_path, validated):
+    spec = make_spec()
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(spec))
+    validate_file(str(spec_file), incremental=True)
+
+    del spec["components"]["schemas"]["Schema0"]
+    spec_file.write_text(yaml.dump(spec))
+    for incremental in (True, False):
+        with pytest.raises(Exception, match="'/components/schemas/Schema0' does not exist"):
+            validate_file(str(spec_file), incremental=incremental)
+    # The error comes from the document as written
+    assert validated[-1] == spec
+
+
+def test_incremental_errors_are_reported_against_the_document(tmp_path, validated):
+    spec = make_spec()
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text(yaml.dump(spec))
+    validate_file(str(spec_file), incremental=True)
+
+    spec["components"]["schemas"]["Schema3"]["required"] = "id"
+    spec_file.write_text(yaml.dump(spec))
+    with pytest.raises(Exception) as info:
+        validate_file(str(spec_file), incremental=True)
+    assert "{}" not in str(info.value)
+    assert validated[-1] == spec
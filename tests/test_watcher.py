@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from api_browser.watcher import Broadcaster, FileWatcher, _PollingSource
+
+
+def wait_for(event, timeout=5):
+    assert event.wait(timeout), "timed out waiting for the watcher"
+
+
+def watch(path, **kwargs):
+    changes = []
+    changed = threading.Event()
+
+    def on_change(paths):
+        changes.append(paths)
+        changed.set()
+
+    watcher = FileWatcher([str(path)], on_change, debounce=0.05, poll_interval=0.05, **kwargs)
+    watcher.start()
+    # Give the watcher a moment to set up its watches
+    time.sleep(0.1)
+    return watcher, changes, changed
+
+
+def test_file_watcher_detects_writes(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.0\n")
+    watcher, changes, changed = watch(spec_file)
+    try:
+        spec_file.write_text("openapi: 3.1.0\n")
+        wait_for(changed)
+        assert changes[0] == {str(spec_file)}
+    finally:
+        watcher.stop()
+
+
+def test_file_watcher_detects_replacement(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.0\n")
+    watcher, changes, changed = watch(spec_file)
+    try:
+        # Editors often save by renaming a new file over the old one
+        replacement = tmp_path / "openapi.yaml.tmp"
+        replacement.write_text("openapi: 3.1.0\n")
+        os.replace(replacement, spec_file)
+        wait_for(changed)
+        assert str(spec_file) in changes[0]
+    finally:
+        watcher.stop()
+
+
+def test_file_watcher_debounces(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.0\n")
+    watcher, changes, changed = watch(spec_file)
+    try:
+        for i in range(5):
+            spec_file.write_text(f"openapi: 3.0.{i}\n")
+        wait_for(changed)
+        time.sleep(0.3)
+        assert len(changes) == 1
+    finally:
+        watcher.stop()
+
+
+def test_file_watcher_survives_failing_callbacks(tmp_path, caplog):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.0\n")
+    calls = []
+    called = threading.Event()
+
+    def on_change(paths):
+        calls.append(paths)
+        called.set()
+        raise ValueError("boom")
+
+    watcher = FileWatcher([str(spec_file)], on_change, debounce=0.05, poll_interval=0.05)
+    watcher.start()
+    time.sleep(0.1)
+    try:
+        for version in ("3.1.0", "3.1.1"):
+            called.clear()
+            spec_file.write_text(f"openapi: {version}\n")
+            wait_for(called)
+            time.sleep(0.1)
+        assert len(calls) == 2
+        assert [record.getMessage() for record in caplog.records] == ["Error handling file change"] * 2
+    finally:
+        watcher.stop()
+
+
+def test_file_watcher_switches_paths(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.0\n")
+    added = tmp_path / "other" / "orders.yaml"
+    added.parent.mkdir()
+    added.write_text("openapi: 3.0.0\n")
+    watcher, changes, changed = watch(spec_file)
+    try:
+        watcher.watch([str(added)])
+        time.sleep(0.2)
+        added.write_text("openapi: 3.1.0\n")
+        wait_for(changed)
+        assert changes[0] == {str(added)}
+    finally:
+        watcher.stop()
+
+
+def test_polling_source(tmp_path):
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.0\n")
+    source = _PollingSource({str(spec_file)}, interval=0.01)
+    assert source.wait(0.01) == set()
+
+    spec_file.write_text("openapi: 3.1.0 with a different size\n")
+    assert source.wait(0.01) == {str(spec_file)}
+    assert source.wait(0.01) == set()
+
+
+def test_broadcaster_wakes_all_listeners():
+    broadcaster = Broadcaster()
+    results = []
+
+    def listen():
+        results.append(broadcaster.wait(0, timeout=5))
+
+    listeners = [threading.Thread(target=listen) for _ in range(20)]
+    for listener in listeners:
+        listener.start()
+    broadcaster.publish("openapi.yaml")
+    for listener in listeners:
+        listener.join()
+
+    assert results == [(1, "openapi.yaml")] * 20
+    # Nothing new since version 1, so this times out
+    assert broadcaster.wait(1, timeout=0.01) == (1, "openapi.yaml")